@@ -0,0 +1,287 @@
+"""
+benchmark for BettensorValidator.insert_predictions
+
+builds a validator database with a synthetic prediction history, then ingests
+one step worth of predictions (by default 256 miners x 50 predictions) with the
+previous row-by-row implementation and with the batched implementation. both
+runs start from identical copies of the database and the accepted prediction
+ids are compared before the timings are reported.
+
+usage:
+    python -m benchmarks.insert_predictions --miners 256 --predictions 50
+"""
+
+import argparse
+import asyncio
+import concurrent.futures
+import os
+import random
+import shutil
+import sqlite3
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+from bettensor.protocol import TeamGamePrediction
+from bettensor.utils.sports_data import SportsData
+from bettensor.validator.bettensor_validator import BettensorValidator
+from bettensor.validator.storage import ValidatorStorage
+
+
+def legacy_insert_predictions(db_path, hotkeys, processed_uids, predictions):
+    """the row-by-row implementation insert_predictions replaced, kept as reference"""
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    current_time = datetime.utcnow().replace(tzinfo=timezone.utc).isoformat()
+
+    for uid, prediction_dict in predictions.items():
+        for predictionID, res in prediction_dict.items():
+            if int(uid) not in processed_uids:
+                continue
+
+            today_utc = datetime.now(timezone.utc).isoformat()
+            minerId = hotkeys[int(uid)]
+            predictionID = res.predictionID
+            teamGameID = res.teamGameID
+            predictedOutcome = res.predictedOutcome
+            wager = res.wager
+
+            cursor.execute(
+                "SELECT COUNT(*) FROM predictions WHERE predictionID = ?",
+                (predictionID,),
+            )
+            if cursor.fetchone()[0] > 0:
+                continue
+
+            cursor.execute(
+                "SELECT sport, league, eventStartDate, teamA, teamB, teamAodds, teamBodds, tieOdds, outcome FROM game_data WHERE externalId = ?",
+                (teamGameID,),
+            )
+            result = cursor.fetchone()
+            if not result:
+                continue
+
+            (
+                _,
+                _,
+                event_start_date,
+                teamA,
+                teamB,
+                teamAodds,
+                teamBodds,
+                tieOdds,
+                outcome,
+            ) = result
+
+            if predictedOutcome == teamA:
+                predictedOutcome = 0
+            elif predictedOutcome == teamB:
+                predictedOutcome = 1
+            elif predictedOutcome.lower() == "tie":
+                predictedOutcome = 2
+            else:
+                continue
+
+            if current_time >= event_start_date:
+                continue
+
+            cursor.execute(
+                """
+                SELECT SUM(wager) FROM predictions
+                WHERE minerID = ? AND DATE(predictionDate) = DATE(?)
+            """,
+                (minerId, today_utc),
+            )
+            total_wager = (cursor.fetchone()[0] or 0) + wager
+            if total_wager > 1000:
+                continue
+
+            cursor.execute(
+                """
+                INSERT INTO predictions (predictionID, teamGameID, minerID, predictionDate, predictedOutcome, teamA, teamB, wager, teamAodds, teamBodds, tieOdds, canOverwrite, outcome)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+                (
+                    predictionID,
+                    teamGameID,
+                    minerId,
+                    today_utc,
+                    predictedOutcome,
+                    teamA,
+                    teamB,
+                    wager,
+                    teamAodds,
+                    teamBodds,
+                    tieOdds,
+                    False,
+                    outcome,
+                ),
+            )
+
+    conn.commit()
+    conn.close()
+
+
+def build_database(db_path, hotkeys, games, history, seed):
+    """creates the validator tables and fills them with games and past predictions"""
+    rng = random.Random(seed)
+    SportsData(db_name=db_path)
+    validator = make_validator(db_path, hotkeys)
+    validator.create_table()
+
+    now = datetime.now(timezone.utc)
+    game_rows = []
+    for i in range(games):
+        start = now + timedelta(hours=rng.randint(-72, 144))
+        game_rows.append(
+            (
+                str(uuid.uuid4()),
+                f"team-a-{i}",
+                f"team-b-{i}",
+                "soccer",
+                "253",
+                str(100000 + i),
+                now.isoformat(),
+                now.isoformat(),
+                start.isoformat(),
+                0,
+                "Unfinished",
+                round(rng.uniform(1.1, 4.0), 2),
+                round(rng.uniform(1.1, 4.0), 2),
+                round(rng.uniform(2.5, 4.0), 2),
+                True,
+            )
+        )
+
+    prediction_rows = []
+    for _ in range(history):
+        game = rng.choice(game_rows)
+        prediction_date = now - timedelta(minutes=rng.randint(0, 8 * 24 * 60))
+        prediction_rows.append(
+            (
+                str(uuid.uuid4()),
+                game[5],
+                rng.choice(hotkeys),
+                prediction_date.isoformat(),
+                str(rng.randint(0, 2)),
+                game[1],
+                game[2],
+                float(rng.randint(1, 20)),
+                game[11],
+                game[12],
+                game[13],
+                False,
+                "Unfinished",
+            )
+        )
+
+    conn = sqlite3.connect(db_path)
+    conn.executemany(
+        "INSERT INTO game_data VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        game_rows,
+    )
+    conn.executemany(
+        """
+        INSERT INTO predictions (predictionID, teamGameID, minerID, predictionDate, predictedOutcome, teamA, teamB, wager, teamAodds, teamBodds, tieOdds, canOverwrite, outcome)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """,
+        prediction_rows,
+    )
+    conn.commit()
+    conn.close()
+    return game_rows
+
+
+def build_step(game_rows, miners, per_miner, seed):
+    """returns one step of miner responses keyed by uid"""
+    rng = random.Random(seed + 1)
+    predictions = {}
+    for uid in range(miners):
+        prediction_dict = {}
+        for _ in range(per_miner):
+            game = rng.choice(game_rows)
+            predicted = rng.choice([game[1], game[2], "Tie", "unknown team"])
+            prediction = TeamGamePrediction(
+                predictionID=str(uuid.uuid4()),
+                teamGameID=game[5],
+                minerID=str(uid),
+                predictionDate=datetime.now(timezone.utc).isoformat(),
+                predictedOutcome=predicted,
+                wager=float(rng.randint(1, 60)),
+                teamAodds=game[11],
+                teamBodds=game[12],
+                tieOdds=game[13],
+                outcome="Unfinished",
+                can_overwrite=True,
+            )
+            prediction_dict[prediction.predictionID] = prediction
+        predictions[uid] = prediction_dict
+    return predictions
+
+
+def make_validator(db_path, hotkeys):
+    """creates a validator instance without touching the chain or the cli arguments"""
+    validator = BettensorValidator.__new__(BettensorValidator)
+    validator.db_path = db_path
+    validator.metagraph = SimpleNamespace(hotkeys=hotkeys)
+    validator.thread_executor = concurrent.futures.ThreadPoolExecutor()
+    return validator
+
+
+def accepted_ids(db_path):
+    conn = sqlite3.connect(db_path)
+    ids = {row[0] for row in conn.execute("SELECT predictionID FROM predictions")}
+    conn.close()
+    return ids
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--miners", type=int, default=256)
+    parser.add_argument("--predictions", type=int, default=50)
+    parser.add_argument("--games", type=int, default=300)
+    parser.add_argument("--history", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    hotkeys = [f"hotkey-{uid}" for uid in range(args.miners)]
+    processed_uids = list(range(args.miners))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        base_db = os.path.join(tmp, "base.db")
+        game_rows = build_database(base_db, hotkeys, args.games, args.history, args.seed)
+        predictions = build_step(game_rows, args.miners, args.predictions, args.seed)
+
+        legacy_db = os.path.join(tmp, "legacy.db")
+        batched_db = os.path.join(tmp, "batched.db")
+        shutil.copy(base_db, legacy_db)
+        shutil.copy(base_db, batched_db)
+
+        start = time.perf_counter()
+        legacy_insert_predictions(legacy_db, hotkeys, processed_uids, predictions)
+        legacy_seconds = time.perf_counter() - start
+
+        validator = make_validator(batched_db, hotkeys)
+        validator.storage = ValidatorStorage(batched_db)
+        start = time.perf_counter()
+        asyncio.run(validator.insert_predictions(processed_uids, predictions))
+        batched_seconds = time.perf_counter() - start
+        validator.close_database()
+
+        legacy_ids = accepted_ids(legacy_db)
+        batched_ids = accepted_ids(batched_db)
+
+    received = args.miners * args.predictions
+    print(f"predictions received: {received} ({args.miners} miners x {args.predictions})")
+    print(f"history rows: {args.history}, games: {args.games}")
+    print(f"accepted (legacy/batched): {len(legacy_ids) - args.history} / {len(batched_ids) - args.history}")
+    print(f"identical accept/reject decisions: {legacy_ids == batched_ids}")
+    print(f"legacy:  {legacy_seconds:.3f}s")
+    print(f"batched: {batched_seconds:.3f}s")
+    print(f"speedup: {legacy_seconds / batched_seconds:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,263 @@
+"""
+benchmark of the miner forward under bursts of concurrent validator queries
+
+builds a miner database with synthetic games and predictions, then sends rounds
+of concurrent GameData requests, as validators that query the miner at the same
+time. every round changes the odds of some games, as the validators pick up new
+odds, so the response payload is rebuilt and the database maintained. the
+rounds are sent to both paths, each starting from a copy of the database:
+
+- sync: forward, run on a thread pool like the axon runs synchronous endpoints.
+  the database is maintained before the payload is rebuilt
+- async: forward_async on the event loop, the database work runs on the
+  executor of the miner and the database is maintained after the responses
+
+the p50/p95/p99 latency of a single forward is reported per path.
+
+usage:
+    python -m benchmarks.miner_forward --concurrency 16 --rounds 20
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import os
+import random
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import bittensor as bt
+import numpy as np
+
+from bettensor import __version__ as version
+from bettensor.miner import bettensor_miner
+from bettensor.miner.bettensor_miner import BettensorMiner
+from bettensor.miner.response_cache import ResponseCache
+from bettensor.protocol import GameData, Metadata, TeamGame
+from bettensor.utils.database_manager import DatabaseManager
+from bettensor.utils.miner_stats import MinerStatsHandler
+
+# threads of the pool synchronous endpoints run on, as in anyio
+SYNC_THREADS = 40
+
+
+def make_wallet():
+    return SimpleNamespace(hotkey=bt.Keypair.create_from_mnemonic(bt.Keypair.generate_mnemonic()))
+
+
+def make_games(count, seed):
+    """games from 3 days ago to the coming week, the past ones with a result"""
+    rng = random.Random(seed)
+    now = datetime.now(timezone.utc)
+    games = {}
+    for i in range(count):
+        start = now + timedelta(hours=rng.uniform(-72, 168))
+        game_id = str(uuid.UUID(int=rng.getrandbits(128)))
+        games[game_id] = TeamGame(
+            id=game_id,
+            teamA=f"team-{rng.randrange(200)}",
+            teamB=f"team-{rng.randrange(200)}",
+            sport="soccer",
+            league="253",
+            externalId=str(100000 + i),
+            createDate=(start - timedelta(days=7)).isoformat(),
+            lastUpdateDate=now.isoformat(),
+            eventStartDate=start.isoformat(),
+            active=start < now,
+            outcome=rng.choice(["0", "1"]) if start < now - timedelta(hours=3) else "Unfinished",
+            teamAodds=round(rng.uniform(1.2, 4.0), 2),
+            teamBodds=round(rng.uniform(1.2, 4.0), 2),
+            tieOdds=round(rng.uniform(2.5, 4.5), 2),
+            canTie=True,
+        )
+    return games
+
+
+def generate_database(db_path, games, predictions, seed):
+    miner = make_miner(db_path, make_wallet())
+    miner.add_game_data(games)
+    miner.stats.stop()
+
+    rng = random.Random(seed)
+    now = datetime.now(timezone.utc)
+    rows = []
+    for i in range(predictions):
+        game = rng.choice(list(games.values()))
+        start = datetime.fromisoformat(game.eventStartDate)
+        rows.append((
+            f"prediction-{i}",
+            game.externalId,
+            str(miner.miner_uid),
+            min(now, start - timedelta(hours=rng.uniform(1, 48))).isoformat(),
+            rng.choice([game.teamA, game.teamB]),
+            game.teamA,
+            game.teamB,
+            float(rng.randrange(1, 100)),
+            game.teamAodds,
+            game.teamBodds,
+            game.tieOdds,
+            1,
+            "Unfinished",
+        ))
+    with miner.db_manager.write_cursor() as cursor:
+        cursor.executemany(
+            "INSERT INTO predictions VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows
+        )
+    miner.db_manager.close()
+
+
+def make_miner(db_path, wallet):
+    """a miner on db_path without the network setup of __init__"""
+    miner = BettensorMiner.__new__(BettensorMiner)
+    miner.db_path = db_path
+    miner.db_manager = DatabaseManager(db_path)
+    miner.wallet = wallet
+    miner.hotkey = wallet.hotkey.ss58_address
+    miner.miner_uid = 7
+    miner.subnet_version = version
+    miner.validator_game_versions = {}
+    miner.stored_games = None
+    miner.game_data_lock = threading.Lock()
+    miner.initialize_database()
+    miner.stats = MinerStatsHandler(miner)
+    miner.stats.init_miner_row(miner.hotkey, miner.miner_uid)
+    miner.response_cache = ResponseCache(
+        db_path, miner.get_response_predictions, maintain=miner.maintain_database
+    )
+    miner.db_executor = ThreadPoolExecutor(
+        max_workers=miner.db_manager.max_readers, thread_name_prefix="miner-db"
+    )
+    miner.maintenance_pending = False
+    return miner
+
+
+def make_rounds(games, rounds, changed, seed):
+    """the game data of every round, with new odds for some games"""
+    rng = random.Random(seed)
+    current = dict(games)
+    result = []
+    for _ in range(rounds):
+        for game_id in rng.sample(list(current), changed):
+            current[game_id] = current[game_id].copy(
+                update={"teamAodds": round(rng.uniform(1.2, 4.0), 2)}
+            )
+        result.append(dict(current))
+    return result
+
+
+def make_synapse(wallet, games):
+    synapse = GameData(
+        metadata=Metadata.create(wallet, version, 0, "game_data"),
+        gamedata_dict=games,
+        prediction_dict=None,
+    )
+    synapse.dendrite.hotkey = wallet.hotkey.ss58_address
+    return synapse
+
+
+async def run_rounds(forward, rounds, concurrency, interval):
+    """sends every round as a burst of concurrent requests, returns the latencies"""
+    validators = [make_wallet() for _ in range(concurrency)]
+    latencies = []
+
+    async def timed_forward(synapse):
+        start = time.perf_counter()
+        await forward(synapse)
+        latencies.append(time.perf_counter() - start)
+
+    for games in rounds:
+        synapses = [make_synapse(wallet, games) for wallet in validators]
+        await asyncio.gather(*(timed_forward(synapse) for synapse in synapses))
+        await asyncio.sleep(interval)
+    return latencies
+
+
+def bench_sync(db_path, rounds, concurrency, interval):
+    miner = make_miner(db_path, make_wallet())
+    pool = ThreadPoolExecutor(max_workers=SYNC_THREADS)
+
+    async def forward(synapse):
+        return await asyncio.get_running_loop().run_in_executor(pool, miner.forward, synapse)
+
+    try:
+        return asyncio.run(run_rounds(forward, rounds, concurrency, interval))
+    finally:
+        pool.shutdown()
+        miner.db_executor.shutdown()
+        miner.stats.stop()
+        miner.db_manager.close()
+
+
+def bench_async(db_path, rounds, concurrency, interval):
+    miner = make_miner(db_path, make_wallet())
+    try:
+        return asyncio.run(run_rounds(miner.forward_async, rounds, concurrency, interval))
+    finally:
+        miner.db_executor.shutdown()
+        miner.stats.stop()
+        miner.db_manager.close()
+
+
+def summarize(latencies):
+    latencies = np.array(latencies) * 1000
+    return {
+        "requests": len(latencies),
+        "p50_ms": round(float(np.percentile(latencies, 50)), 3),
+        "p95_ms": round(float(np.percentile(latencies, 95)), 3),
+        "p99_ms": round(float(np.percentile(latencies, 99)), 3),
+        "max_ms": round(float(latencies.max()), 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--games", type=int, default=1000)
+    parser.add_argument("--predictions", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=16, help="requests per burst")
+    parser.add_argument("--rounds", type=int, default=20, help="bursts per path")
+    parser.add_argument("--changed", type=int, default=20, help="games with new odds per round")
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=bettensor_miner.MAINTENANCE_DELAY + 1.0,
+        help="seconds between two bursts",
+    )
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    bt.logging.off()
+    games = make_games(args.games, args.seed)
+    rounds = make_rounds(games, args.rounds, args.changed, args.seed)
+    benchmarks = {"sync": bench_sync, "async": bench_async}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "miner.db")
+        generate_database(db_path, games, args.predictions, args.seed)
+        print(
+            f"generated {args.games} games and {args.predictions} predictions, "
+            f"{args.rounds} bursts of {args.concurrency} requests per path"
+        )
+
+        print(f"{'path':<10}{'requests':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+        for name, bench in benchmarks.items():
+            path = os.path.join(tmp, f"{name}.db")
+            shutil.copy(db_path, path)
+            # forward prints the synapse versions of every request
+            with contextlib.redirect_stdout(io.StringIO()):
+                result = summarize(bench(path, rounds, args.concurrency, args.interval))
+            print(
+                f"{name:<10}{result['requests']:>10}{result['p50_ms']:>10.2f}"
+                f"{result['p95_ms']:>10.2f}{result['p99_ms']:>10.2f}{result['max_ms']:>10.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
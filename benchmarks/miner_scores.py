@@ -0,0 +1,157 @@
+"""
+micro benchmark for the validator scoring engine
+
+generates a synthetic scoring window (1M predictions by default) and scores it
+with the previous row-by-row loop of calculate_miner_scores and with the
+columnar engine in bettensor.validator.scoring. the resulting float32 earnings
+tensors are compared for exact equality before the timings are reported.
+
+usage:
+    python -m benchmarks.miner_scores --predictions 1000000
+"""
+
+import argparse
+import random
+import time
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import torch
+
+from bettensor.validator import scoring
+
+
+def legacy_calculate_earnings(rows, hotkeys, now):
+    """the row-by-row loop calculate_miner_scores used before, kept as reference"""
+    earnings = torch.zeros(len(hotkeys), dtype=torch.float32)
+    forty_eight_hours_ago = now - timedelta(hours=48)
+    miner_performance = {}
+    miner_id_to_index = {miner_id: idx for idx, miner_id in enumerate(hotkeys)}
+
+    for row in rows:
+        (
+            miner_id,
+            predicted_outcome,
+            outcome,
+            wager,
+            team_a_odds,
+            team_b_odds,
+            tie_odds,
+            prediction_date,
+            event_start_date,
+        ) = row
+
+        try:
+            prediction_datetime = datetime.fromisoformat(prediction_date).replace(tzinfo=timezone.utc)
+            event_start_datetime = datetime.fromisoformat(event_start_date).replace(tzinfo=timezone.utc)
+        except ValueError:
+            continue
+
+        if prediction_datetime > now:
+            continue
+        if prediction_datetime >= event_start_datetime:
+            continue
+        if event_start_datetime < forty_eight_hours_ago:
+            continue
+
+        if miner_id not in miner_performance:
+            miner_performance[miner_id] = 0.0
+
+        if predicted_outcome == outcome:
+            if predicted_outcome == "0":
+                earned = wager * team_a_odds
+            elif predicted_outcome == "1":
+                earned = wager * team_b_odds
+            elif predicted_outcome.lower() == "tie":
+                earned = wager * tie_odds
+            else:
+                continue
+            miner_performance[miner_id] += earned
+
+    for miner_id, total_earned in miner_performance.items():
+        if miner_id in miner_id_to_index:
+            earnings[miner_id_to_index[miner_id]] = total_earned
+
+    return earnings
+
+
+def columnar_calculate_earnings(rows, hotkeys, now):
+    columns = scoring.PredictionColumns.from_rows(rows, hotkeys)
+    earnings = torch.zeros(len(hotkeys), dtype=torch.float32)
+    miner_earnings = scoring.compute_earnings(columns, len(hotkeys), now)
+    earnings[:] = torch.from_numpy(miner_earnings.astype(np.float32))
+    return earnings
+
+
+def build_rows(predictions, miners, games, seed, now):
+    """returns synthetic rows in the shape of scoring.PREDICTION_WINDOW_QUERY"""
+    rng = random.Random(seed)
+    hotkeys = [f"hotkey-{uid}" for uid in range(miners)]
+    # a few deregistered miners that are no longer part of the metagraph
+    miner_ids = hotkeys + [f"old-hotkey-{i}" for i in range(8)]
+
+    game_rows = []
+    for _ in range(games):
+        start = now - timedelta(minutes=rng.randint(-3 * 24 * 60, 50 * 60))
+        outcome = rng.choice(["0", "1", "2", "Unfinished"])
+        odds = (round(rng.uniform(1.1, 4.0), 2), round(rng.uniform(1.1, 4.0), 2), round(rng.uniform(2.5, 4.0), 2))
+        game_rows.append((start, outcome, odds))
+
+    # predictions are made in batches per step, so prediction dates repeat
+    steps = [
+        (now - timedelta(seconds=18 * step)).isoformat()
+        for step in range(8 * 24 * 200)
+    ]
+
+    rows = []
+    for _ in range(predictions):
+        start, outcome, odds = rng.choice(game_rows)
+        prediction_date = rng.choice(steps)
+        if rng.random() < 0.001:
+            prediction_date = "not a date"
+        elif rng.random() < 0.001:
+            prediction_date = (now + timedelta(minutes=5)).isoformat()
+        rows.append(
+            (
+                rng.choice(miner_ids),
+                rng.choice(["0", "1", "2", "tie"]),
+                outcome,
+                float(rng.randint(1, 100)),
+                odds[0],
+                odds[1],
+                odds[2],
+                prediction_date,
+                start.isoformat(),
+            )
+        )
+    return rows, hotkeys
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--predictions", type=int, default=1_000_000)
+    parser.add_argument("--miners", type=int, default=256)
+    parser.add_argument("--games", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    now = datetime.now(timezone.utc)
+    rows, hotkeys = build_rows(args.predictions, args.miners, args.games, args.seed, now)
+
+    start = time.perf_counter()
+    legacy = legacy_calculate_earnings(rows, hotkeys, now)
+    legacy_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    columnar = columnar_calculate_earnings(rows, hotkeys, now)
+    columnar_seconds = time.perf_counter() - start
+
+    print(f"predictions: {len(rows)}, miners: {len(hotkeys)}")
+    print(f"identical earnings: {torch.equal(legacy, columnar)}")
+    print(f"row loop: {legacy_seconds:.3f}s")
+    print(f"columnar: {columnar_seconds:.3f}s")
+    print(f"speedup:  {legacy_seconds / columnar_seconds:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,239 @@
+"""
+local stand-in for the RapidAPI endpoints of api-football and api-baseball
+
+serves recorded fixture, odds and result payloads so SportsData and the outcome
+resolvers can be exercised without a RapidAPI key, e.g. in CI, on air-gapped
+machines or for load tests. point the validator at it with
+
+    RAPID_API_BASE_URL=http://127.0.0.1:8080
+
+requests are routed by the X-RapidAPI-Host header and the path, like RapidAPI
+does, and answered with the recorded response with the same query parameters.
+requests without a recording get an empty RapidAPI style response. recordings
+are replayed as if they were made today: all dates in the parameters and the
+payloads are shifted by the days between the first recorded date and today.
+
+latency and errors can be injected. in recorder mode every request is forwarded
+to the real api and the responses are saved to the fixture file when the server
+stops. the fixture file is json:
+
+    {"version": 1, "responses": [
+        {"host": ..., "path": ..., "params": {...}, "status": 200, "body": {...}}
+    ]}
+
+usage:
+    python -m benchmarks.rapid_api_server --fixtures benchmarks/fixtures/rapid_api_sample.json
+    python -m benchmarks.rapid_api_server --fixtures recorded.json --latency-ms 200 --error-rate 0.05
+    RAPID_API_KEY=... python -m benchmarks.rapid_api_server --fixtures recorded.json --record
+"""
+
+import argparse
+import asyncio
+import concurrent.futures
+import contextlib
+import json
+import os
+import random
+import re
+import threading
+from datetime import date, datetime, timedelta, timezone
+
+import aiohttp
+from aiohttp import web
+
+FIXTURE_VERSION = 1
+# query parameters holding dates
+DATE_PARAMS = ("date", "from", "to")
+EMPTY_RESPONSE = {"errors": [], "results": 0, "paging": {"current": 1, "total": 1}, "response": []}
+_DATE = re.compile(r"^\d{4}-\d{2}-\d{2}")
+
+
+def _key(host, path, params):
+    return host, path, tuple(sorted(params.items()))
+
+
+def shift_dates(value, days):
+    """returns value with every string starting with an iso date moved by days"""
+    if isinstance(value, dict):
+        return {key: shift_dates(item, days) for key, item in value.items()}
+    if isinstance(value, list):
+        return [shift_dates(item, days) for item in value]
+    if isinstance(value, str) and days and _DATE.match(value):
+        shifted = date.fromisoformat(value[:10]) + timedelta(days=days)
+        return shifted.isoformat() + value[10:]
+    return value
+
+
+class RapidApiStandIn:
+    """aiohttp application serving and recording RapidAPI responses"""
+
+    def __init__(
+        self,
+        fixtures_path,
+        latency=0.0,
+        jitter=0.0,
+        error_rate=0.0,
+        error_status=500,
+        record=False,
+        api_key=None,
+        seed=None,
+        shift=True,
+    ):
+        self.fixtures_path = fixtures_path
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.record = record
+        self.api_key = api_key or os.getenv("RAPID_API_KEY")
+        self.rng = random.Random(seed)
+
+        self.requests = 0
+        self.misses = 0
+        self.errors = 0
+
+        self.entries = []
+        if os.path.exists(fixtures_path):
+            with open(fixtures_path) as f:
+                fixtures = json.load(f)
+            if fixtures.get("version") != FIXTURE_VERSION:
+                raise ValueError(f"unsupported fixture version {fixtures.get('version')}")
+            self.entries = fixtures["responses"]
+        elif not record:
+            raise FileNotFoundError(fixtures_path)
+
+        recorded_dates = [
+            entry["params"][param][:10]
+            for entry in self.entries
+            for param in DATE_PARAMS
+            if _DATE.match(entry["params"].get(param, ""))
+        ]
+        self.shift_days = 0
+        if shift and not record and recorded_dates:
+            today = datetime.now(timezone.utc).date()
+            self.shift_days = (today - date.fromisoformat(min(recorded_dates))).days
+        self._index()
+
+    def _index(self):
+        self._responses = {}
+        for entry in self.entries:
+            params = shift_dates(entry["params"], self.shift_days)
+            self._responses[_key(entry["host"], entry["path"], params)] = entry
+
+    def lookup(self, host, path, params):
+        """returns (status, body) of the recorded response for a request"""
+        entry = self._responses.get(_key(host, path, params))
+        if entry is None:
+            self.misses += 1
+            return 200, EMPTY_RESPONSE
+        return entry.get("status", 200), shift_dates(entry["body"], self.shift_days)
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_get("/{path:.*}", self.handle)
+        if self.record:
+            app.on_cleanup.append(lambda app: asyncio.to_thread(self.save))
+        return app
+
+    async def handle(self, request):
+        self.requests += 1
+        host = request.headers.get("X-RapidAPI-Host", "")
+        params = dict(request.query)
+
+        delay = self.latency + self.rng.uniform(0, self.jitter)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if self.rng.random() < self.error_rate:
+            self.errors += 1
+            return web.json_response({"message": "injected error"}, status=self.error_status)
+
+        if self.record:
+            status, body = await self._forward(request, host, params)
+        else:
+            status, body = self.lookup(host, request.path, params)
+        return web.json_response(body, status=status)
+
+    async def _forward(self, request, host, params):
+        headers = {
+            "X-RapidAPI-Host": host,
+            "X-RapidAPI-Key": request.headers.get("X-RapidAPI-Key") or self.api_key or "",
+        }
+        async with aiohttp.ClientSession() as session:
+            async with session.get(f"https://{host}{request.path}", headers=headers, params=params) as response:
+                status = response.status
+                body = await response.json(content_type=None)
+
+        entry = {"host": host, "path": request.path, "params": params, "status": status, "body": body}
+        key = _key(host, request.path, params)
+        if key in self._responses:
+            self.entries.remove(self._responses[key])
+        self.entries.append(entry)
+        self._responses[key] = entry
+        return status, body
+
+    def save(self):
+        with open(self.fixtures_path, "w") as f:
+            json.dump({"version": FIXTURE_VERSION, "responses": self.entries}, f, indent=1)
+
+
+@contextlib.contextmanager
+def running(stand_in: RapidApiStandIn, host="127.0.0.1", port=0):
+    """runs the stand-in on a background thread and yields its base url"""
+    loop = asyncio.new_event_loop()
+    started = concurrent.futures.Future()
+
+    def run():
+        asyncio.set_event_loop(loop)
+        runner = web.AppRunner(stand_in.app())
+        try:
+            loop.run_until_complete(runner.setup())
+            loop.run_until_complete(web.TCPSite(runner, host, port).start())
+        except Exception as e:
+            started.set_exception(e)
+            return
+        started.set_result(runner.addresses[0])
+        loop.run_forever()
+        loop.run_until_complete(runner.cleanup())
+        loop.close()
+
+    thread = threading.Thread(target=run, name="rapid-api-stand-in", daemon=True)
+    thread.start()
+    address = started.result()
+    try:
+        yield f"http://{address[0]}:{address[1]}"
+    finally:
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--fixtures", required=True, help="fixture file to serve or record to")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--error-status", type=int, default=500)
+    parser.add_argument("--record", action="store_true", help="forward requests to RapidAPI and save the responses")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--no-shift", action="store_true", help="serve the recorded dates unchanged")
+    args = parser.parse_args()
+
+    stand_in = RapidApiStandIn(
+        args.fixtures,
+        latency=args.latency_ms / 1000,
+        jitter=args.jitter_ms / 1000,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        record=args.record,
+        seed=args.seed,
+        shift=not args.no_shift,
+    )
+    print(f"serving {len(stand_in.entries)} recorded responses on http://{args.host}:{args.port}")
+    web.run_app(stand_in.app(), host=args.host, port=args.port, print=None)
+    print(f"{stand_in.requests} requests, {stand_in.misses} without recording, {stand_in.errors} injected errors")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,383 @@
+"""
+benchmark suite for the hot paths of the validator database
+
+generates a validator.db at a configurable scale from a seed: games spread over
+the days of history and the coming week, and every miner placing a number of
+predictions per day. the outcomes of finished games are set and propagated, and
+the miner earnings are materialized, as on a validator that has been running
+for that long. then every hot path is timed over a number of iterations:
+
+- insert_predictions: one step of miner responses
+- calculate_miner_scores: full rescan of the scoring window
+- get_miner_earnings: read of the materialized earnings used by set_weights
+- update_recent_games: resolution of the unfinished games of the last 48 hours,
+  with an offline resolver that knows every result
+- fetch_game_data: the game window sent to miners, with a cold and a warm cache
+- fetch_predictions_from_db: the predictions not yet sent to the website
+
+paths that write start every iteration from a fresh copy of the database. the
+results (p50/p95 latency and rows per second at the median) are printed and can
+be saved as json to compare runs over time.
+
+usage:
+    python -m benchmarks.validator_db --games 2000 --miners 256 --days 8 --predictions-per-day 10
+    python -m benchmarks.validator_db --output results.json
+"""
+
+import argparse
+import asyncio
+import bisect
+import contextlib
+import json
+import os
+import platform
+import random
+import shutil
+import sqlite3
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import numpy as np
+import torch
+
+from benchmarks.insert_predictions import build_step, make_validator
+from bettensor.protocol import GameData
+from bettensor.utils import game_data_cache
+from bettensor.utils.website_handler import fetch_predictions_from_db
+from bettensor.validator import earnings, scoring
+from bettensor.validator.migrations import migrate
+from bettensor.validator.outcome_polling import OutcomePollScheduler
+from bettensor.validator.outcome_resolvers import OutcomeResolver
+from bettensor.validator.storage import ValidatorStorage
+
+LEAGUES = [("soccer", league) for league in ["253", "140", "78", "262", "71", "98"]]
+LEAGUES.append(("baseball", "1"))
+# games that started this long ago have a result
+GAME_DURATION = timedelta(hours=3)
+# unfinished games are only resolved within this window, see get_recent_games
+RESOLUTION_WINDOW = timedelta(hours=48)
+
+
+class KnownResultsResolver(OutcomeResolver):
+    """offline resolver that reports the results generated with the database"""
+
+    def __init__(self, sport, results):
+        super().__init__()
+        self.sport = sport
+        self.results = results
+
+    async def fetch(self, session, key):
+        return self.results
+
+    def outcomes(self, data):
+        return data
+
+
+def generate_database(db_path, games, miners, days, per_day, resolved_fraction, seed):
+    """
+    writes a synthetic validator database
+
+    Returns:
+        tuple: the game rows, and externalId -> outcome of the finished games of
+            the last 48 hours that are left unresolved
+    """
+    rng = random.Random(seed)
+    now = datetime.now(timezone.utc)
+    migrate(db_path)
+
+    game_rows = []
+    pending_results = {}
+    for i in range(games):
+        sport, league = rng.choice(LEAGUES)
+        start = now + timedelta(minutes=15 * rng.randint(-days * 96, 7 * 96))
+        external_id = str(1000000 + i)
+        outcome = "Unfinished"
+        if start < now - GAME_DURATION:
+            result = str(rng.choice([0, 1, 2] if sport == "soccer" else [0, 1]))
+            if start < now - RESOLUTION_WINDOW or rng.random() < resolved_fraction:
+                outcome = result
+            else:
+                pending_results[external_id] = int(result)
+        created = min(start, now) - timedelta(days=7)
+        game_rows.append(
+            (
+                str(uuid.uuid4()),
+                f"home-{i}",
+                f"away-{i}",
+                sport,
+                league,
+                external_id,
+                created.isoformat(),
+                created.isoformat(),
+                start.isoformat(),
+                int(start <= now),
+                outcome,
+                round(rng.uniform(1.1, 4.0), 2),
+                round(rng.uniform(1.1, 4.0), 2),
+                round(rng.uniform(2.5, 4.0), 2) if sport == "soccer" else 0,
+                sport == "soccer",
+            )
+        )
+    game_rows.sort(key=lambda row: row[8])
+    starts = [row[8] for row in game_rows]
+
+    prediction_rows = []
+    max_wager = max(1, min(100, 1000 // max(per_day, 1)))
+    for uid in range(miners):
+        hotkey = f"hotkey-{uid}"
+        for day in range(days):
+            for _ in range(per_day):
+                prediction_date = now - timedelta(days=day, seconds=rng.randint(0, 86399))
+                # predictions are placed on games that had not started yet
+                first = bisect.bisect_right(starts, prediction_date.isoformat())
+                if first == len(game_rows):
+                    continue
+                game = game_rows[rng.randrange(first, len(game_rows))]
+                prediction_rows.append(
+                    (
+                        str(uuid.uuid4()),
+                        game[5],
+                        hotkey,
+                        prediction_date.isoformat(),
+                        str(rng.choice([0, 1, 2] if game[14] else [0, 1])),
+                        game[1],
+                        game[2],
+                        float(rng.randint(1, max_wager)),
+                        game[11],
+                        game[12],
+                        game[13],
+                        False,
+                        game[10],
+                        int(prediction_date < now - timedelta(hours=1)),
+                    )
+                )
+
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    conn.execute("BEGIN")
+    conn.executemany(
+        "INSERT INTO game_data VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        game_rows,
+    )
+    conn.executemany(
+        """
+        INSERT INTO predictions (predictionID, teamGameID, minerID, predictionDate, predictedOutcome, teamA, teamB, wager, teamAodds, teamBodds, tieOdds, canOverwrite, outcome, sent_to_site)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """,
+        prediction_rows,
+    )
+    earnings.rebuild_earnings(conn.cursor(), now)
+    conn.execute("COMMIT")
+    conn.execute("ANALYZE")
+    conn.close()
+    return game_rows, pending_results
+
+
+@contextlib.contextmanager
+def open_validator(db_path, hotkeys, copy_to=None):
+    """a validator on db_path, or on a fresh copy of it if copy_to is given"""
+    if copy_to is not None:
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(copy_to + suffix):
+                os.remove(copy_to + suffix)
+        shutil.copy(db_path, copy_to)
+        db_path = copy_to
+    validator = make_validator(db_path, hotkeys)
+    validator.metagraph = SimpleNamespace(hotkeys=hotkeys, S=torch.zeros(len(hotkeys)))
+    validator.rapid_api_key = None
+    validator.storage = ValidatorStorage(db_path)
+    try:
+        yield validator
+    finally:
+        validator.close_database()
+        validator.thread_executor.shutdown()
+
+
+def summarize(timings, rows):
+    timings = np.array(timings)
+    p50 = float(np.percentile(timings, 50))
+    return {
+        "iterations": len(timings),
+        "rows": rows,
+        "p50_ms": round(p50 * 1000, 3),
+        "p95_ms": round(float(np.percentile(timings, 95)) * 1000, 3),
+        "mean_ms": round(float(timings.mean()) * 1000, 3),
+        "rows_per_sec": round(rows / p50, 1) if p50 > 0 else None,
+    }
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+
+def bench_insert_predictions(ctx, iterations):
+    timings = []
+    for i in range(iterations):
+        step = build_step(ctx.game_rows, ctx.miners, ctx.step_predictions, ctx.seed + i)
+        uids = list(range(ctx.miners))
+        with open_validator(ctx.db_path, ctx.hotkeys, ctx.scratch_path) as validator:
+            seconds, _ = timed(lambda: asyncio.run(validator.insert_predictions(uids, step)))
+        timings.append(seconds)
+    return summarize(timings, ctx.miners * ctx.step_predictions)
+
+
+def bench_calculate_miner_scores(ctx, iterations):
+    with open_validator(ctx.db_path, ctx.hotkeys) as validator:
+        rows = asyncio.run(
+            validator.storage.read(
+                lambda cursor: len(
+                    scoring.load_prediction_window(cursor, ctx.hotkeys, datetime.now(timezone.utc))
+                )
+            )
+        )
+        timings = [
+            timed(lambda: asyncio.run(validator.calculate_miner_scores()))[0]
+            for _ in range(iterations)
+        ]
+    return summarize(timings, rows)
+
+
+def bench_get_miner_earnings(ctx, iterations):
+    with open_validator(ctx.db_path, ctx.hotkeys) as validator:
+        rows = asyncio.run(
+            validator.storage.read(
+                lambda cursor: cursor.execute("SELECT COUNT(*) FROM miner_earnings").fetchone()[0]
+            )
+        )
+        timings = [
+            timed(lambda: asyncio.run(validator.get_miner_earnings()))[0]
+            for _ in range(iterations)
+        ]
+    return summarize(timings, rows)
+
+
+def bench_update_recent_games(ctx, iterations):
+    timings = []
+    for _ in range(iterations):
+        with open_validator(ctx.db_path, ctx.hotkeys, ctx.scratch_path) as validator:
+            validator.outcome_resolvers = {
+                sport: KnownResultsResolver(sport, ctx.pending_results)
+                for sport in ("soccer", "baseball")
+            }
+            validator.outcome_polls = OutcomePollScheduler(durations={
+                sport: GAME_DURATION for sport in ("soccer", "baseball")
+            })
+            seconds, _ = timed(lambda: asyncio.run(validator.update_recent_games()))
+        timings.append(seconds)
+    return summarize(timings, len(ctx.pending_results))
+
+
+def bench_fetch_game_data(ctx, iterations, cached):
+    timings = []
+    games = 0
+    for _ in range(iterations):
+        now = datetime.now(timezone.utc).isoformat()
+        if not cached:
+            game_data_cache.bump_generation(ctx.db_path)
+        seconds, result = timed(lambda: GameData.fetch_game_data(now, ctx.db_path))
+        timings.append(seconds)
+        games = len(result)
+    return summarize(timings, games)
+
+
+def bench_fetch_predictions_from_db(ctx, iterations):
+    timings = []
+    rows = 0
+    for _ in range(iterations):
+        seconds, result = timed(lambda: fetch_predictions_from_db(ctx.db_path))
+        timings.append(seconds)
+        rows = len(result)
+    return summarize(timings, rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--games", type=int, default=2000)
+    parser.add_argument("--miners", type=int, default=256)
+    parser.add_argument("--days", type=int, default=8, help="days of prediction history")
+    parser.add_argument("--predictions-per-day", type=int, default=10, help="per miner")
+    parser.add_argument("--step-predictions", type=int, default=50, help="per miner and insert_predictions step")
+    parser.add_argument("--resolved-fraction", type=float, default=0.5, help="of the finished games of the last 48 hours")
+    parser.add_argument("--iterations", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="write the results to this json file")
+    parser.add_argument("--keep-db", help="copy the generated database to this path")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "validator.db")
+        generate_seconds, (game_rows, pending_results) = timed(
+            lambda: generate_database(
+                db_path,
+                args.games,
+                args.miners,
+                args.days,
+                args.predictions_per_day,
+                args.resolved_fraction,
+                args.seed,
+            )
+        )
+        if args.keep_db:
+            shutil.copy(db_path, args.keep_db)
+
+        conn = sqlite3.connect(db_path)
+        predictions = conn.execute("SELECT COUNT(*) FROM predictions").fetchone()[0]
+        conn.close()
+        print(
+            f"generated {args.games} games, {predictions} predictions of {args.miners} miners "
+            f"in {generate_seconds:.1f}s, {len(pending_results)} finished games unresolved"
+        )
+
+        ctx = SimpleNamespace(
+            db_path=db_path,
+            scratch_path=os.path.join(tmp, "scratch.db"),
+            hotkeys=[f"hotkey-{uid}" for uid in range(args.miners)],
+            miners=args.miners,
+            step_predictions=args.step_predictions,
+            game_rows=game_rows,
+            pending_results=pending_results,
+            seed=args.seed,
+        )
+        benchmarks = {
+            "insert_predictions": lambda: bench_insert_predictions(ctx, args.iterations),
+            "calculate_miner_scores": lambda: bench_calculate_miner_scores(ctx, args.iterations),
+            "get_miner_earnings": lambda: bench_get_miner_earnings(ctx, args.iterations),
+            "update_recent_games": lambda: bench_update_recent_games(ctx, args.iterations),
+            "fetch_game_data_cold": lambda: bench_fetch_game_data(ctx, args.iterations, cached=False),
+            "fetch_game_data_cached": lambda: bench_fetch_game_data(ctx, args.iterations, cached=True),
+            "fetch_predictions_from_db": lambda: bench_fetch_predictions_from_db(ctx, args.iterations),
+        }
+
+        results = {}
+        print(f"{'path':<28}{'p50 ms':>10}{'p95 ms':>10}{'rows':>10}{'rows/s':>14}")
+        for name, bench in benchmarks.items():
+            result = results[name] = bench()
+            print(
+                f"{name:<28}{result['p50_ms']:>10.2f}{result['p95_ms']:>10.2f}"
+                f"{result['rows']:>10}{result['rows_per_sec'] or 0:>14.0f}"
+            )
+
+    if args.output:
+        report = {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "config": vars(args),
+            "environment": {
+                "python": platform.python_version(),
+                "sqlite": sqlite3.sqlite_version,
+                "platform": platform.platform(),
+                "cpus": os.cpu_count(),
+            },
+            "database": {"games": args.games, "predictions": predictions},
+            "results": results,
+        }
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
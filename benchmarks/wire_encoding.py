@@ -0,0 +1,131 @@
+"""
+size and speed benchmark for the compact GameData wire encoding
+
+builds a synthetic GameData response with games and predictions (500 games and
+1000 predictions by default) and compares the json shape of the dicts with the
+compact encoding of bettensor.utils.wire_encoding: payload size, encode time and
+decode time. the decoded dicts are checked for equality with the originals.
+
+usage:
+    python -m benchmarks.wire_encoding --games 500 --predictions 1000
+"""
+
+import argparse
+import json
+import random
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from bettensor.protocol import TeamGame, TeamGamePrediction
+from bettensor.utils import wire_encoding
+
+
+def build_games(count, rng, now):
+    leagues = [("soccer", league) for league in ["253", "140", "78", "262", "71", "98"]]
+    leagues.append(("baseball", "1"))
+    teams = [f"Team {i}" for i in range(120)]
+
+    games = {}
+    for _ in range(count):
+        game_id = str(uuid.uuid4())
+        sport, league = rng.choice(leagues)
+        created = (now - timedelta(days=rng.randint(0, 10), seconds=rng.randint(0, 86400))).isoformat()
+        games[game_id] = TeamGame(
+            id=game_id,
+            teamA=rng.choice(teams),
+            teamB=rng.choice(teams),
+            sport=sport,
+            league=league,
+            externalId=str(rng.randint(100000, 9999999)),
+            createDate=created,
+            lastUpdateDate=created,
+            # api start times are whole minutes
+            eventStartDate=(now + timedelta(minutes=15 * rng.randint(-1400, 700))).isoformat(),
+            active=rng.random() < 0.3,
+            outcome=rng.choice(["Unfinished", "0", "1", "2"]),
+            teamAodds=round(rng.uniform(1.05, 6.0), 2),
+            teamBodds=round(rng.uniform(1.05, 6.0), 2),
+            tieOdds=round(rng.uniform(2.5, 5.0), 2) if sport == "soccer" else 0.0,
+            canTie=sport == "soccer",
+        )
+    return games
+
+
+def build_predictions(count, games, rng, now):
+    game_list = list(games.values())
+    predictions = {}
+    for _ in range(count):
+        game = rng.choice(game_list)
+        prediction_id = str(uuid.uuid4())
+        predictions[prediction_id] = TeamGamePrediction(
+            predictionID=prediction_id,
+            teamGameID=game.externalId,
+            minerID="42",
+            predictionDate=(now - timedelta(seconds=rng.randint(0, 3 * 86400))).isoformat(),
+            predictedOutcome=rng.choice([game.teamA, game.teamB, "Tie"]),
+            wager=float(rng.randint(1, 100)),
+            teamAodds=game.teamAodds,
+            teamBodds=game.teamBodds,
+            tieOdds=game.tieOdds,
+            outcome="Unfinished",
+            can_overwrite=True,
+        )
+    return predictions
+
+
+def json_encode(models):
+    return json.dumps({key: model.dict() for key, model in models.items()})
+
+
+def json_decode(data, model_cls):
+    return {key: model_cls(**value) for key, value in json.loads(data).items()}
+
+
+def timed(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return result, (time.perf_counter() - start) / repeat
+
+
+def compare(name, models, model_cls, fields, repeat):
+    as_json, json_encode_seconds = timed(lambda: json_encode(models), repeat)
+    from_json, json_decode_seconds = timed(lambda: json_decode(as_json, model_cls), repeat)
+    compact, compact_encode_seconds = timed(lambda: wire_encoding.encode(models, fields), repeat)
+    from_compact, compact_decode_seconds = timed(
+        lambda: wire_encoding.decode(compact, model_cls, fields), repeat
+    )
+
+    print(f"{name}: {len(models)}")
+    print(f"  identical after round trip: {from_json == models and from_compact == models}")
+    print(f"  size json / compact:   {len(as_json):>9} / {len(compact):>9} bytes ({len(as_json) / len(compact):.1f}x)")
+    print(f"  encode json / compact: {json_encode_seconds * 1000:>9.2f} / {compact_encode_seconds * 1000:>9.2f} ms")
+    print(f"  decode json / compact: {json_decode_seconds * 1000:>9.2f} / {compact_decode_seconds * 1000:>9.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--games", type=int, default=500)
+    parser.add_argument("--predictions", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    now = datetime.now(timezone.utc)
+    games = build_games(args.games, rng, now)
+    predictions = build_predictions(args.predictions, games, rng, now)
+
+    compare("games", games, TeamGame, wire_encoding.GAME_FIELDS, args.repeat)
+    compare(
+        "predictions",
+        predictions,
+        TeamGamePrediction,
+        wire_encoding.PREDICTION_FIELDS,
+        args.repeat,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,17 +1,73 @@
 from argparse import ArgumentParser
 from typing import Tuple
+import asyncio
+import functools
 import sys
 import bittensor as bt
 import sqlite3
 from bettensor.base.neuron import BaseNeuron
 from bettensor.protocol import Metadata, GameData, TeamGame, TeamGamePrediction
 from bettensor.utils.sign_and_validate import verify_signature
+from bettensor.utils.wire_encoding import WIRE_ENCODING_VERSION
 from bettensor.utils.miner_stats import MinerStatsHandler
 import datetime
 import os
 import threading
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import contextmanager
 from bettensor.utils.database_manager import get_db_manager
+from bettensor.utils.sqlite_helpers import chunks, placeholders
+from bettensor.utils.metagraph_index import MetagraphIndex
+from bettensor.utils.metagraph_sync import METAGRAPH_SYNC_INTERVAL, MetagraphSync
+from bettensor.miner.response_cache import ResponseCache
+
+# seconds between a response of forward_async and the database maintenance it
+# schedules, the forwards of a burst of validator queries share one maintenance
+MAINTENANCE_DELAY = 1.0
+
+# predictions of the last 3 days on games that have not started yet, served by
+# idx_games_start and idx_predictions_game_date
+RESPONSE_PREDICTIONS_QUERY = """
+    SELECT predictionID, teamGameID, predictionDate, predictedOutcome, teamA, teamB,
+        wager, teamAodds, teamBodds, tieOdds, canOverwrite, outcome
+    FROM predictions
+    WHERE predictionDate > ?
+        AND teamGameID IN (SELECT externalID FROM games WHERE eventStartDate > ?)
+"""
+
+def game_content(game: TeamGame) -> tuple:
+    """the fields of a game that decide whether a stored game has to be rewritten"""
+    return (
+        game.teamA,
+        game.teamB,
+        game.teamAodds,
+        game.teamBodds,
+        game.tieOdds,
+        game.eventStartDate,
+        game.outcome,
+    )
+
+
+def game_row(game_id, game: TeamGame) -> tuple:
+    """values of a games row, in table order apart from gameID first"""
+    return (
+        game_id,
+        game.teamA,
+        game.teamAodds,
+        game.teamB,
+        game.teamBodds,
+        game.sport,
+        game.league,
+        game.externalId,
+        game.createDate,
+        game.lastUpdateDate,
+        game.eventStartDate,
+        game.active,
+        game.outcome,
+        game.tieOdds,
+        game.canTie,
+    )
+
 
 class BettensorMiner(BaseNeuron):
     """
@@ -74,10 +130,25 @@ class BettensorMiner(BaseNeuron):
         # Minimum stake for validator whitelist
         self.validator_min_stake = args.validator_min_stake
 
+        # Seconds between two metagraph syncs in the background
+        self.metagraph_sync_interval = getattr(
+            args, "metagraph_sync_interval", METAGRAPH_SYNC_INTERVAL
+        )
+        self.metagraph_sync = None
+        self.metagraph_version = None
+
         # Neuron setup
         self.wallet, self.subtensor, self.metagraph, self.miner_uid = self.setup()
+        self.refresh_metagraph_index()
         self.hotkey_blacklisted = False
         self.hotkey = self.wallet.hotkey.ss58_address
+
+        # game data version held per validator hotkey, see GameData
+        self.validator_game_versions = {}
+
+        # externalId -> game_content of the stored games, loaded on first use
+        self.stored_games = None
+        self.game_data_lock = threading.Lock()
         
         self.db_path = args.db_path
         os.environ[f'MINER_{self.miner_uid}_DB_PATH'] = self.db_path
@@ -91,6 +162,19 @@ class BettensorMiner(BaseNeuron):
         self.ensure_db_directory_exists()
         self.initialize_database()
 
+        # Prediction payload of forward, see ResponseCache
+        self.response_cache = ResponseCache(
+            self.db_manager.db_path,
+            self.get_response_predictions,
+            maintain=self.maintain_database,
+        )
+
+        # database work of the async axon functions, kept off the event loop
+        self.db_executor = ThreadPoolExecutor(
+            max_workers=self.db_manager.max_readers, thread_name_prefix="miner-db"
+        )
+        self.maintenance_pending = False
+
         # Ensure the data directory exists
         os.makedirs(os.path.dirname("data/miner_env.txt"), exist_ok=True)
 
@@ -126,7 +210,7 @@ class BettensorMiner(BaseNeuron):
             os.makedirs(db_dir)
 
     def print_table_schema(self):
-        with self.db_manager.get_cursor() as cursor:
+        with self.db_manager.read_cursor() as cursor:
             cursor.execute("PRAGMA table_info(games)")
             schema = cursor.fetchall()
             for column in schema:
@@ -172,6 +256,16 @@ class BettensorMiner(BaseNeuron):
                                    canTie BOOLEAN
                                    )"""
                 )
+                # indexes of the forward query, see RESPONSE_PREDICTIONS_QUERY
+                cursor.execute(
+                    "CREATE INDEX IF NOT EXISTS idx_predictions_game_date ON predictions (teamGameID, predictionDate)"
+                )
+                cursor.execute(
+                    "CREATE INDEX IF NOT EXISTS idx_games_start ON games (eventStartDate, externalID)"
+                )
+                cursor.execute(
+                    "CREATE INDEX IF NOT EXISTS idx_games_external_id ON games (externalID)"
+                )
         except sqlite3.Error as e:
             bt.logging.error(f"Failed to initialize local database: {e}")
             raise Exception("Failed to initialize local database")
@@ -232,6 +326,37 @@ class BettensorMiner(BaseNeuron):
 
         return wallet, subtensor, metagraph, miner_uid
 
+    def refresh_metagraph_index(self):
+        """rebuilds the hotkey lookups used by blacklist and priority, call after every metagraph sync"""
+        self.metagraph_index = MetagraphIndex.from_metagraph(self.metagraph)
+
+    def start_metagraph_sync(self):
+        """refreshes the metagraph on a background thread, see apply_metagraph_snapshot"""
+        self.metagraph_sync = MetagraphSync(
+            lambda: bt.subtensor(config=self.neuron_config),
+            self.neuron_config.netuid,
+            interval=self.metagraph_sync_interval,
+            initial=self.metagraph,
+        )
+        self.apply_metagraph_snapshot()
+        self.metagraph_sync.start()
+
+    def apply_metagraph_snapshot(self) -> bool:
+        """
+        swaps in the latest metagraph synced in the background, returns true if
+        it changed. blacklist and priority read the index with a single attribute
+        access, so a request sees either the old or the new one
+        """
+        if self.metagraph_sync is None:
+            return False
+        snapshot = self.metagraph_sync.newer_than(self.metagraph_version)
+        if snapshot is None:
+            return False
+        self.metagraph = snapshot.metagraph
+        self.metagraph_index = snapshot.index
+        self.metagraph_version = snapshot.version
+        return True
+
     def check_whitelist(self, hotkey):
         """
         Checks if a given validator hotkey has been whitelisted.
@@ -287,7 +412,9 @@ class BettensorMiner(BaseNeuron):
             return (False, f"Accepted whitelisted hotkey: {synapse.dendrite.hotkey}")
 
         # Blacklist entities that have not registered their hotkey
-        if synapse.dendrite.hotkey not in self.metagraph.hotkeys:
+        index = self.metagraph_index
+        uid = index.uid(synapse.dendrite.hotkey)
+        if uid is None:
             bt.logging.info(f"Blacklisted unknown hotkey: {synapse.dendrite.hotkey}")
             return (
                 True,
@@ -295,17 +422,14 @@ class BettensorMiner(BaseNeuron):
             )
 
         # Blacklist entities that are not validators
-        uid = self.metagraph.hotkeys.index(synapse.dendrite.hotkey)
-        print("uid:", uid)
-        print("metagraph", self.metagraph)
-        if not self.metagraph.validator_permit[uid]:
+        if not index.validator_permit[uid]:
             bt.logging.info(f"Blacklisted non-validator: {synapse.dendrite.hotkey}")
             return (True, f"Hotkey {synapse.dendrite.hotkey} is not a validator")
 
 
         bt.logging.info(f"validator_min_stake: {self.validator_min_stake}")
         # Blacklist entities that have insufficient stake
-        stake = float(self.metagraph.S[uid])
+        stake = float(index.stake[uid])
         if stake < self.validator_min_stake:
             bt.logging.info(
                 f"Blacklisted validator {synapse.dendrite.hotkey} with insufficient stake: {stake}"
@@ -330,15 +454,68 @@ class BettensorMiner(BaseNeuron):
         if self.check_whitelist(hotkey=synapse.dendrite.hotkey):
             return 10000000.0
 
-        # Otherwise prioritize validators based on their stake
-        uid = self.metagraph.hotkeys.index(synapse.dendrite.hotkey)
-        stake = float(self.metagraph.S[uid])
+        # Otherwise prioritize validators based on their stake, unknown hotkeys
+        # are rejected by the blacklist before this is called
+        index = self.metagraph_index
+        uid = index.uid(synapse.dendrite.hotkey)
+        stake = float(index.stake[uid]) if uid is not None else 0.0
 
-        print(f"Prioritized: {synapse.dendrite.hotkey} (UID: {uid} - Stake: {stake})")
+        bt.logging.trace(f"Prioritized: {synapse.dendrite.hotkey} (UID: {uid} - Stake: {stake})")
 
         return stake
 
+    async def blacklist_async(self, synapse: GameData) -> Tuple[bool, str]:
+        """blacklist for the event loop of the axon, it only reads the metagraph index"""
+        return self.blacklist(synapse)
+
+    async def priority_async(self, synapse: GameData) -> float:
+        """priority for the event loop of the axon, it only reads the metagraph index"""
+        return self.priority(synapse)
+
     def forward(self, synapse: GameData) -> GameData:
+        return self.respond(synapse)
+
+    async def forward_async(self, synapse: GameData) -> GameData:
+        """
+        forward for the event loop of the axon. the database work and the
+        signature run on db_executor, and the database is maintained after the
+        response instead of before it
+        """
+        loop = asyncio.get_running_loop()
+        synapse = await loop.run_in_executor(
+            self.db_executor, functools.partial(self.respond, synapse, maintain=False)
+        )
+        self.schedule_maintenance(loop)
+        return synapse
+
+    def schedule_maintenance(self, loop: asyncio.AbstractEventLoop):
+        """runs maintain_database on db_executor shortly after a response, if none is pending"""
+        if self.maintenance_pending:
+            return
+        self.maintenance_pending = True
+        loop.call_later(
+            MAINTENANCE_DELAY, loop.run_in_executor, self.db_executor, self.run_maintenance
+        )
+
+    def run_maintenance(self):
+        try:
+            if self.response_cache.run_maintenance(datetime.datetime.now(datetime.timezone.utc)):
+                bt.logging.debug("Database maintained after response")
+        except Exception as e:
+            bt.logging.error(f"Error maintaining database: {e}")
+        finally:
+            self.maintenance_pending = False
+
+    def respond(self, synapse: GameData, maintain: bool = True) -> GameData:
+        """
+        ingests the game data of the synapse and answers with the predictions
+
+        Arguments:
+            synapse:
+                The GameData synapse of the validator.
+            maintain:
+                Maintain the database before the predictions are rebuilt.
+        """
         bt.logging.info(f"Miner: Received synapse from {synapse.dendrite.hotkey}")
 
         # Print version information and perform version checks
@@ -358,161 +535,200 @@ class BettensorMiner(BaseNeuron):
 
         
 
-        # check if tables in db are initialized
-        # if not, initialize them
+        # respond in the compact wire encoding if the validator understands it
+        compact = (synapse.metadata.wire_encoding or 0) >= WIRE_ENCODING_VERSION
         try:
-            with self.db_manager.get_cursor() as cursor:
-                cursor.execute("SELECT * FROM games")
-                if not cursor.fetchone():
-                    bt.logging.info(f"Initializing database")
-                    self.initialize_database()
-        except Exception as e:
-            bt.logging.error(f"Error checking/initializing database: {e}")
-            return synapse  # Return early if there's a database error
-
-        game_data_dict = synapse.gamedata_dict
-        bt.logging.info(f"Forward() | Adding game data to local database: {len(game_data_dict)} games")
-        self.add_game_data(game_data_dict)
-
-        # clean up games table and set active field
-        self.update_games_data()
-
-        # Remove duplicate games
-        self.remove_duplicate_games()
-
-        # Get current time
-        current_time = datetime.datetime.now(datetime.timezone.utc).isoformat(
-            timespec="minutes"
-        )
+            synapse.decode_compact()
+        except ValueError as e:
+            bt.logging.error(f"Failed to decode game data: {e}")
+            return synapse
+
+        game_data_dict = synapse.gamedata_dict or {}
+        if synapse.is_not_modified():
+            bt.logging.info(f"Forward() | Game data not modified")
+            ingested = True
+        else:
+            bt.logging.info(f"Forward() | Adding game data to local database: {len(game_data_dict)} games")
+            ingested = self.add_game_data(game_data_dict) is not None
+        gamedata_version = self.held_game_data_version(synapse, ingested)
 
-        # Fetch games that have not started yet
+        # The predictions of the last 3 days on games that have not started yet,
+        # rebuilt only when the database or the minute changed
         try:
-            with self.db_manager.get_cursor() as cursor:
-                cursor.execute(
-                    "SELECT externalID FROM games WHERE eventStartDate > ?", (current_time,)
-                )
-                games = cursor.fetchall()
+            payload = self.response_cache.get(
+                datetime.datetime.now(datetime.timezone.utc), maintain=maintain
+            )
         except Exception as e:
-            bt.logging.error(f"Error fetching games: {e}")
+            bt.logging.error(f"Error fetching predictions: {e}")
             return synapse  # Return early if there's a database error
 
-        bt.logging.debug(f"Fetched {len(games)} games")
-
-        # Process the fetched games
-        bt.logging.info(f"Processing recent predictions")
-        prediction_dict = {}
-        for game in games:
-            bt.logging.trace(f" Processing Predictions: Game: {game}")
-            external_game_id = game[0]
-            bt.logging.trace(f"Processing Predictions: Game ID: {external_game_id}")
-
-            # Fetch predictions for the game from the last 3 days
-            three_days_ago = (datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(days=3)).isoformat(timespec="minutes")
-            with self.db_manager.get_cursor() as cursor:
-                cursor.execute(
-                    "SELECT * FROM predictions WHERE teamGameID = ? AND predictionDate > ?", 
-                    (external_game_id, three_days_ago)
-                )
-                predictions = cursor.fetchall()
-            bt.logging.trace(f"Predictions: {predictions}")
-
-            # Add predictions to prediction_dict
-            for prediction in predictions:
-                if len(prediction) >= 13:
-                    single_prediction = TeamGamePrediction(
-                        predictionID=prediction[0],
-                        teamGameID=prediction[1],
-                        minerID=str(self.miner_uid),
-                        predictionDate=prediction[3],
-                        predictedOutcome=prediction[4],
-                        teamA=prediction[5],
-                        teamB=prediction[6],
-                        wager=prediction[7],
-                        teamAodds=prediction[8],
-                        teamBodds=prediction[9],
-                        tieOdds=prediction[10],
-                        can_overwrite=prediction[11],
-                        outcome=prediction[12],
-                    )
-                    prediction_dict[prediction[0]] = single_prediction
-                else:
-                    bt.logging.warning(f"Skipping prediction due to insufficient data: {prediction}")
-
-        bt.logging.trace(f"prediction_dict: {prediction_dict}")
-        synapse.prediction_dict = prediction_dict
+        bt.logging.debug(f"Responding with {len(payload.predictions)} predictions")
         synapse.gamedata_dict = None
         synapse.metadata = Metadata.create(
             wallet=self.wallet,
             subnet_version=self.subnet_version,
             neuron_uid=self.miner_uid,
             synapse_type="prediction",
+            gamedata_version=gamedata_version,
         )
-        self.update_outcomes()
+        if compact:
+            synapse.prediction_blob = payload.blob
+        else:
+            synapse.prediction_dict = payload.predictions
         return synapse
 
-    def add_game_data(self, game_data_dict):
-        try:
-            bt.logging.trace(f"add_game_data() | Adding game data to local database")
-            number_of_games = len(game_data_dict)
-            bt.logging.trace(
-                f"add_game_data() | Number of games to add: {number_of_games}"
+    def maintain_database(self):
+        """
+        initializes missing tables, updates the games table and the prediction
+        outcomes. runs before every rebuild of the response payload
+        """
+        with self.db_manager.read_cursor() as cursor:
+            cursor.execute(
+                "SELECT COUNT(*) FROM sqlite_master WHERE type = 'table' AND name IN ('games', 'predictions')"
             )
-            with self.db_manager.get_cursor() as cursor:
-                for game_id, game_data in game_data_dict.items():
-                    external_id = game_data.externalId
-                    cursor.execute("SELECT * FROM games WHERE externalID = ?", (external_id,))
-                    if not cursor.fetchone():
-                        cursor.execute(
-                            """INSERT INTO games (
-                            gameID, teamA, teamAodds, teamB, teamBodds, sport, league, externalID, createDate, lastUpdateDate, 
-                            eventStartDate, active, outcome, tieOdds, canTie
-                        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
-                            (
-                                game_id,
-                                game_data.teamA,
-                                game_data.teamAodds,
-                                game_data.teamB,
-                                game_data.teamBodds,
-                                game_data.sport,
-                                game_data.league,
-                                game_data.externalId,
-                                game_data.createDate,
-                                game_data.lastUpdateDate,
-                                game_data.eventStartDate,
-                                game_data.active,
-                                game_data.outcome,
-                                game_data.tieOdds,
-                                game_data.canTie,
-                            ),
-                        )
-                        bt.logging.trace(f"add_game_data() | Game {external_id} added to the table.")
-                    else:
-                        bt.logging.trace(
-                            f"add_game_data() | Game {external_id} already in the table, updating."
-                        )
+            initialized = cursor.fetchone()[0] == 2
+        if not initialized:
+            bt.logging.info(f"Initializing database")
+            self.initialize_database()
+
+        # clean up games table and set active field
+        self.update_games_data()
+
+        # Remove duplicate games
+        self.remove_duplicate_games()
+
+        self.update_outcomes()
+
+    def get_response_predictions(self, now: datetime.datetime) -> dict:
+        """
+        returns the predictions of the last 3 days on games that have not started
+        yet, keyed by predictionID, in one query
+        """
+        current_time = now.isoformat(timespec="minutes")
+        three_days_ago = (now - datetime.timedelta(days=3)).isoformat(timespec="minutes")
+        with self.db_manager.read_cursor() as cursor:
+            cursor.execute(RESPONSE_PREDICTIONS_QUERY, (three_days_ago, current_time))
+            rows = cursor.fetchall()
+
+        miner_id = str(self.miner_uid)
+        return {
+            row[0]: TeamGamePrediction(
+                predictionID=row[0],
+                teamGameID=row[1],
+                minerID=miner_id,
+                predictionDate=row[2],
+                predictedOutcome=row[3],
+                teamA=row[4],
+                teamB=row[5],
+                wager=row[6],
+                teamAodds=row[7],
+                teamBodds=row[8],
+                tieOdds=row[9],
+                can_overwrite=row[10],
+                outcome=row[11],
+            )
+            for row in rows
+        }
+
+    def held_game_data_version(self, synapse: GameData, ingested: bool = True):
+        """
+        returns the game data version of the validator the miner holds once the
+        synapse is applied, None if it can't tell or the games of the synapse
+        were not ingested. reporting None makes the validator send all games
+        with the next request
+        """
+        validator_hotkey = synapse.dendrite.hotkey
+        version = synapse.metadata.gamedata_version
+        base_version = synapse.metadata.gamedata_base_version
+
+        if not ingested or version is None or (
+            base_version is not None
+            and base_version != self.validator_game_versions.get(validator_hotkey)
+        ):
+            self.validator_game_versions.pop(validator_hotkey, None)
+            return None
+
+        self.validator_game_versions[validator_hotkey] = version
+        return version
+
+    def load_stored_games(self, cursor):
+        """reads the content of the stored games, see game_content"""
+        cursor.execute(
+            "SELECT externalID, teamA, teamB, teamAodds, teamBodds, tieOdds, eventStartDate, outcome FROM games"
+        )
+        self.stored_games = {row[0]: tuple(row[1:]) for row in cursor.fetchall()}
+
+    def add_game_data(self, game_data_dict):
+        """
+        writes the games that are new or whose content changed, in one
+        transaction. every validator sends the same games, so most of them are
+        skipped without touching the database
+
+        Returns:
+            tuple: (inserted, updated, skipped) counts, None if the games could
+            not be written
+        """
+        with self.game_data_lock:
+            try:
+                bt.logging.trace(f"add_game_data() | Adding game data to local database")
+                # the last game per externalId wins
+                games = {game.externalId: (game_id, game) for game_id, game in game_data_dict.items()}
+                with self.db_manager.get_cursor() as cursor:
+                    if self.stored_games is None:
+                        self.load_stored_games(cursor)
+
+                    changed = {
+                        external_id: (game_id, game)
+                        for external_id, (game_id, game) in games.items()
+                        if self.stored_games.get(external_id) != game_content(game)
+                    }
+                    # games deleted by update_games_data once they are over stay
+                    # deleted until the validators send a changed version
+                    existing = set()
+                    for chunk in chunks(changed):
                         cursor.execute(
-                            """UPDATE games SET teamA = ?, teamAodds = ?, teamB = ?, teamBodds = ?, sport = ?, league = ?, externalID = ?, 
-                                       createDate = ?, lastUpdateDate = ?, eventStartDate = ?, active = ?, outcome = ?, tieOdds = ?, canTie = ? WHERE gameID = ?""",
-                            (
-                                game_data.teamA,
-                                game_data.teamAodds,
-                                game_data.teamB,
-                                game_data.teamBodds,
-                                game_data.sport,
-                                game_data.league,
-                                game_data.externalId,
-                                game_data.createDate,
-                                game_data.lastUpdateDate,
-                                game_data.eventStartDate,
-                                game_data.active,
-                                game_data.outcome,
-                                game_data.tieOdds,
-                                game_data.canTie,
-                                game_id,
-                            ),
+                            f"SELECT externalID FROM games WHERE externalID IN ({placeholders(chunk)})",
+                            chunk,
                         )
-        except Exception as e:
-            bt.logging.error(f"Failed to add game data: {e}")
+                        existing.update(row[0] for row in cursor.fetchall())
+
+                    inserts = [
+                        game_row(game_id, game)
+                        for external_id, (game_id, game) in changed.items()
+                        if external_id not in existing
+                    ]
+                    updates = [
+                        game_row(game_id, game)[1:] + (external_id,)
+                        for external_id, (game_id, game) in changed.items()
+                        if external_id in existing
+                    ]
+                    cursor.executemany(
+                        """INSERT INTO games (
+                        gameID, teamA, teamAodds, teamB, teamBodds, sport, league, externalID, createDate, lastUpdateDate,
+                        eventStartDate, active, outcome, tieOdds, canTie
+                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                        inserts,
+                    )
+                    cursor.executemany(
+                        """UPDATE games SET teamA = ?, teamAodds = ?, teamB = ?, teamBodds = ?, sport = ?, league = ?, externalID = ?,
+                                   createDate = ?, lastUpdateDate = ?, eventStartDate = ?, active = ?, outcome = ?, tieOdds = ?, canTie = ? WHERE externalID = ?""",
+                        updates,
+                    )
+            except Exception as e:
+                bt.logging.error(f"Failed to add game data: {e}")
+                # the database may not hold what the cache says anymore
+                self.stored_games = None
+                return None
+
+            # only remembered once committed
+            for external_id, (_, game) in changed.items():
+                self.stored_games[external_id] = game_content(game)
+
+        stats = (len(inserts), len(updates), len(games) - len(changed))
+        bt.logging.debug(
+            f"add_game_data() | {stats[0]} games inserted, {stats[1]} updated, {stats[2]} unchanged skipped"
+        )
+        return stats
 
     def update_games_data(self):
         bt.logging.trace(f"update_games_data() | Updating games data")
@@ -615,7 +831,7 @@ class BettensorMiner(BaseNeuron):
             bt.logging.error(f"Error removing duplicate games or predictions: {e}")
 
     def get_predictions(self):
-        with self.db_manager.get_cursor() as cursor:
+        with self.db_manager.read_cursor() as cursor:
             cursor.execute("SELECT * FROM predictions")
             predictions_raw = cursor.fetchall()
 
@@ -643,7 +859,7 @@ class BettensorMiner(BaseNeuron):
         return prediction_dict
 
     def get_games(self):
-        with self.db_manager.get_cursor() as cursor:
+        with self.db_manager.read_cursor() as cursor:
             cursor.execute("SELECT * FROM games")
             games_raw = cursor.fetchall()
 
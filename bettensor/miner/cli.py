@@ -134,7 +134,7 @@ class Application:
 
     def check_db_init(self):
         try:
-            with self.db_manager.get_cursor() as cursor:
+            with self.db_manager.read_cursor() as cursor:
                 cursor.execute("SELECT * FROM predictions")
         except Exception as e:
             print(e)
@@ -165,11 +165,10 @@ class Application:
                     )
                 except sqlite3.IntegrityError as e:
                     logging.warning(f"Failed to insert prediction {prediction['predictionID']}: {e}")
-            cursor.connection.commit()
 
     def get_predictions(self):
         predictions = {}
-        with self.db_manager.get_cursor() as cursor:
+        with self.db_manager.read_cursor() as cursor:
             cursor.execute("SELECT * FROM predictions")
             columns = [column[0] for column in cursor.description]
             for row in cursor.fetchall():
@@ -178,7 +177,7 @@ class Application:
 
     def get_game_data(self):
         game_data = {}
-        with self.db_manager.get_cursor() as cursor:
+        with self.db_manager.read_cursor() as cursor:
             cursor.execute("SELECT * FROM games WHERE active = 0")
             columns = [column[0] for column in cursor.description]
             for row in cursor.fetchall():
@@ -189,7 +188,7 @@ class Application:
         logging.info(f"Getting miner stats for uid: {uid}")
 
         if uid is not None:
-            with self.db_manager.get_cursor() as cursor:
+            with self.db_manager.read_cursor() as cursor:
                 cursor.execute("SELECT * FROM miner_stats WHERE miner_uid = ?", (str(uid),))
                 columns = [column[0] for column in cursor.description]
                 row = cursor.fetchone()
@@ -209,7 +208,6 @@ class Application:
         values = tuple(stats.values())
         with self.db_manager.get_cursor() as cursor:
             cursor.execute(f"INSERT INTO miner_stats ({columns}) VALUES ({placeholders})", values)
-            cursor.connection.commit()
 
     def update_miner_stats(self, wager, prediction_date, miner_uid):
         logging.info(f"Updating miner stats for miner_uid: {miner_uid}")
@@ -234,7 +232,6 @@ class Application:
                     miner_uid,
                 ),
             )
-            cursor.connection.commit()
         self.miner_stats = self.get_miner_stats(miner_uid)
         logging.info(f"Updated miner stats: {self.miner_stats}")
 
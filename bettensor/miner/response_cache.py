@@ -0,0 +1,146 @@
+"""
+cache of the prediction payload returned by forward.
+
+validators query a miner with essentially the same request, and the answer only
+depends on the database and on the current minute, which the forward query is
+cut at. the payload is built once and reused until either changes.
+
+changes are detected with PRAGMA data_version on a connection that never
+writes: its value changes whenever any other connection, in this process or in
+another one like the cli or the interface server, commits to the database. so
+writers don't have to report their writes.
+
+concurrent forwards that find the payload outdated share a single rebuild,
+the first one rebuilds and the others wait for it and reuse its result.
+payloads are shared between callers and must not be modified.
+
+maintenance runs before a rebuild by default. callers that answer first can
+skip it in get and call run_maintenance once the response is sent, it only
+runs if the database or the minute changed since the last maintenance.
+"""
+
+import datetime
+import sqlite3
+import threading
+from typing import Callable, Optional
+
+import bittensor as bt
+
+from bettensor.utils import wire_encoding
+
+
+class ResponsePayload:
+    """predictions of a forward response, with their compact encoding built on first use"""
+
+    def __init__(self, key, predictions: dict):
+        self.key = key
+        self.predictions = predictions
+        self._blob = None
+        self._blob_lock = threading.Lock()
+
+    @property
+    def blob(self) -> str:
+        if self._blob is None:
+            with self._blob_lock:
+                if self._blob is None:
+                    self._blob = wire_encoding.encode(
+                        self.predictions, wire_encoding.PREDICTION_FIELDS
+                    )
+        return self._blob
+
+
+class ResponseCache:
+    """prediction payload of forward, rebuilt when the database or the minute changed"""
+
+    def __init__(
+        self,
+        db_path,
+        build: Callable[[datetime.datetime], dict],
+        maintain: Optional[Callable[[], None]] = None,
+    ):
+        """
+        Args:
+            db_path: path to the miner database
+            build: returns the prediction dict for a time, see get_response_predictions
+            maintain: runs before every rebuild, e.g. to update the games table
+        """
+        self.db_path = db_path
+        self.build = build
+        self.maintain = maintain
+
+        self.hits = 0
+        self.rebuilds = 0
+        self._payload: Optional[ResponsePayload] = None
+        self._generation = 0
+        self._build_lock = threading.Lock()
+        self._maintain_lock = threading.Lock()
+        self._maintained_key = None
+        self._watcher_lock = threading.Lock()
+        self._watcher = None
+
+    def _data_version(self) -> int:
+        with self._watcher_lock:
+            if self._watcher is None:
+                self._watcher = sqlite3.connect(self.db_path, check_same_thread=False)
+            return self._watcher.execute("PRAGMA data_version").fetchone()[0]
+
+    def _key(self, now: datetime.datetime):
+        return (self._data_version(), self._generation, now.isoformat(timespec="minutes"))
+
+    def invalidate(self):
+        """forces a rebuild on the next get"""
+        self._generation += 1
+
+    def _maintain(self, now: datetime.datetime):
+        self.maintain()
+        # the writes of maintain don't call for another one
+        self._maintained_key = self._key(now)
+
+    def needs_maintenance(self, now: datetime.datetime) -> bool:
+        return self.maintain is not None and self._maintained_key != self._key(now)
+
+    def run_maintenance(self, now: datetime.datetime) -> bool:
+        """runs maintain outside of a rebuild if needed, returns whether it ran"""
+        with self._maintain_lock:
+            if not self.needs_maintenance(now):
+                return False
+            self._maintain(now)
+            return True
+
+    def get(self, now: datetime.datetime, maintain: bool = True) -> ResponsePayload:
+        """
+        Args:
+            now: time the predictions are cut at
+            maintain: run maintain before a rebuild, see run_maintenance
+        """
+        payload = self._payload
+        if payload is not None and payload.key == self._key(now):
+            self.hits += 1
+            return payload
+
+        with self._build_lock:
+            # another forward may have rebuilt while this one was waiting
+            payload = self._payload
+            if payload is not None and payload.key == self._key(now):
+                self.hits += 1
+                return payload
+
+            if maintain and self.maintain is not None:
+                with self._maintain_lock:
+                    self._maintain(now)
+            # read the key before building, a write that lands during the build
+            # changes the data version and triggers the next rebuild
+            key = self._key(now)
+            payload = ResponsePayload(key, self.build(now))
+            self._payload = payload
+            self.rebuilds += 1
+            bt.logging.debug(
+                f"Rebuilt response payload: {len(payload.predictions)} predictions, {self.rebuilds} rebuilds, {self.hits} hits"
+            )
+            return payload
+
+    def close(self):
+        with self._watcher_lock:
+            if self._watcher is not None:
+                self._watcher.close()
+                self._watcher = None
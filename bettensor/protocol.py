@@ -23,6 +23,8 @@ from typing import Optional, Dict
 import uuid
 import bittensor as bt
 import bettensor
+from bettensor.utils import game_data_cache, wire_encoding
+from bettensor.utils.wire_encoding import WIRE_ENCODING_VERSION
 from bettensor.utils.sign_and_validate import create_signature
 from uuid import UUID
 import time
@@ -100,15 +102,39 @@ class Metadata(BaseModel):
     synapse_type: str = Field(
         ..., description="Type of the synapse | 'prediction' or 'game_data'"
     )
+    gamedata_version: Optional[str] = Field(
+        None,
+        description="Version of the game data. Validator: version of its full game data | Miner: version it holds after the request",
+    )
+    gamedata_base_version: Optional[str] = Field(
+        None,
+        description="Version the gamedata_dict is a delta against, None if it holds all games. Equal to gamedata_version if nothing changed",
+    )
+    wire_encoding: Optional[int] = Field(
+        None,
+        description="Highest compact wire encoding version the sender understands, None for json only",
+    )
 
     @classmethod
-    def create(cls, wallet: bt.wallet, subnet_version, neuron_uid, synapse_type):
+    def create(
+        cls,
+        wallet: bt.wallet,
+        subnet_version,
+        neuron_uid,
+        synapse_type,
+        gamedata_version=None,
+        gamedata_base_version=None,
+        wire_encoding=WIRE_ENCODING_VERSION,
+    ):
         """
         Creates a new metadata object
         Args:
             neuron_id: UUID
             signature: str
             subnet_id: str
+            gamedata_version: str
+            gamedata_base_version: str
+            wire_encoding: int
         Returns:
             Metadata: A new metadata object to attach to a synapse
         """
@@ -126,6 +152,9 @@ class Metadata(BaseModel):
             signature=signature,
             subnet_version=subnet_version,
             synapse_type=synapse_type,
+            gamedata_version=gamedata_version,
+            gamedata_base_version=gamedata_base_version,
+            wire_encoding=wire_encoding,
         )
 
 
@@ -175,11 +204,20 @@ class TeamGame(BaseModel):
 class GameData(bt.Synapse):
     """
     This class defines the synapse object for game data, consisting of a dictionary of TeamGame objects with a UUID as key.
+
+    The game data carries a content version in metadata.gamedata_version. Miners that report
+    the version they hold in their response can be sent only the changed games, see
+    Metadata.gamedata_base_version. Peers that don't know about versions always get all games.
+
+    Between peers that both advertise Metadata.wire_encoding, the dicts travel in the compact
+    encoding of bettensor.utils.wire_encoding in gamedata_blob and prediction_blob instead.
     """
 
     metadata: Optional[Metadata]
     gamedata_dict: Optional[Dict[str, TeamGame]]
     prediction_dict: Optional[Dict[str, TeamGamePrediction]]
+    gamedata_blob: Optional[str] = None
+    prediction_blob: Optional[str] = None
 
     @classmethod
     def create(
@@ -200,7 +238,9 @@ class GameData(bt.Synapse):
         if synapse_type == "prediction":
             gamedata_dict = None
         else:
-            gamedata_dict = cls.fetch_game_data(metadata.timestamp, db_path)
+            snapshot = cls.game_data_snapshot(metadata.timestamp, db_path)
+            gamedata_dict = snapshot.games
+            metadata.gamedata_version = snapshot.version
         return cls(
             metadata=metadata,
             gamedata_dict=gamedata_dict,
@@ -210,19 +250,32 @@ class GameData(bt.Synapse):
 
     @staticmethod
     def fetch_game_data(current_timestamp, db_path) -> Dict[str, TeamGame]:
-        connection = sqlite3.connect(db_path)
-        cursor = connection.cursor()
+        """returns the games of the last 15 days and all future games. the dict is shared, don't modify it"""
+        return GameData.game_data_snapshot(current_timestamp, db_path).games
 
-        # Calculate timestamp for 5 days ago
+    @staticmethod
+    def game_data_snapshot(current_timestamp, db_path) -> game_data_cache.GameDataSnapshot:
+        """returns the cached snapshot of the games fetch_game_data selects"""
         fifteen_days_ago = (datetime.fromisoformat(current_timestamp) - timedelta(days=15)).isoformat()
+        return game_data_cache.get_snapshot(
+            db_path,
+            fifteen_days_ago,
+            lambda window_start: GameData._load_game_data(window_start, db_path),
+        )
+
+    @staticmethod
+    def _load_game_data(window_start, db_path) -> Dict[str, TeamGame]:
+        connection = sqlite3.connect(db_path)
+        cursor = connection.cursor()
 
         query = """
             SELECT id, teamA, teamB, sport, league, externalId, createDate, lastUpdateDate, eventStartDate, active, outcome, teamAodds, teamBodds, tieOdds, canTie
             FROM game_data
-            WHERE eventStartDate > ? OR (eventStartDate BETWEEN ? AND ?)
+            WHERE eventStartDate >= ?
+            ORDER BY rowid
         """
 
-        cursor.execute(query, (current_timestamp, fifteen_days_ago, current_timestamp))
+        cursor.execute(query, (window_start,))
         rows = cursor.fetchall()
 
         gamedata_dict = {}
@@ -249,5 +302,40 @@ class GameData(bt.Synapse):
         connection.close()
         return gamedata_dict
 
+    def is_not_modified(self) -> bool:
+        """true if the sender signals that the receiver already holds its game data"""
+        return (
+            self.metadata is not None
+            and self.metadata.gamedata_version is not None
+            and self.metadata.gamedata_base_version == self.metadata.gamedata_version
+        )
+
+    def encode_compact(self):
+        """moves the game and prediction dicts into the compact wire encoding"""
+        if self.gamedata_dict is not None:
+            self.gamedata_blob = wire_encoding.encode(
+                self.gamedata_dict, wire_encoding.GAME_FIELDS
+            )
+            self.gamedata_dict = None
+        if self.prediction_dict is not None:
+            self.prediction_blob = wire_encoding.encode(
+                self.prediction_dict, wire_encoding.PREDICTION_FIELDS
+            )
+            self.prediction_dict = None
+
+    def decode_compact(self):
+        """restores the game and prediction dicts from the compact wire encoding, if used"""
+        if self.gamedata_blob is not None:
+            self.gamedata_dict = wire_encoding.decode(
+                self.gamedata_blob, TeamGame, wire_encoding.GAME_FIELDS
+            )
+            self.gamedata_blob = None
+        if self.prediction_blob is not None:
+            self.prediction_dict = wire_encoding.decode(
+                self.prediction_blob, TeamGamePrediction, wire_encoding.PREDICTION_FIELDS
+            )
+            self.prediction_blob = None
+
     def deserialize(self):
+        self.decode_compact()
         return self.gamedata_dict, self.prediction_dict, self.metadata
\ No newline at end of file
@@ -1,56 +1,300 @@
+"""
+connection pool of the miner database.
+
+the database is shared by the axon threads of the miner, the stats handler,
+the cli and the interface server, the latter two in their own processes. every
+connection runs in WAL mode, so readers never block the writer and the writer
+never blocks readers, and waits busy_timeout for locks held by other processes.
+
+within a process there is one writer connection and a bounded set of reader
+connections:
+
+- write_cursor (and get_cursor) hands out the writer and opens the transaction
+  with BEGIN IMMEDIATE, so it takes the database write lock up front instead of
+  failing halfway when upgrading a read. the transaction commits when the block
+  exits and rolls back on an exception. a write cursor opened again on the same
+  thread joins the outer transaction with a savepoint
+- read_cursor hands out a query only reader connection, at most max_readers
+  at a time
+
+opening a transaction is retried with exponential backoff while the database is
+locked by another process. statements that fail inside the block are not
+retried, as the block can't be run again; use write(fn) to retry a whole
+transaction. wait times for connections are tracked, see stats().
+"""
+
+import os
+import queue
+import random
 import sqlite3
+import threading
+import time
 from contextlib import contextmanager
-from threading import Lock
-import os
-import bittensor as bt
 from sqlite3 import OperationalError
-import time
+
+import bittensor as bt
+
+MAX_READERS = 8
+# seconds sqlite waits on a lock held by another connection
+BUSY_TIMEOUT = 5.0
+# seconds to wait for a free connection of the pool
+ACQUIRE_TIMEOUT = 30.0
+# attempts to open a transaction or run write(fn) while the database is locked
+MAX_RETRIES = 5
+BACKOFF_BASE = 0.05
+BACKOFF_MAX = 2.0
+# page cache per connection, in KiB
+CACHE_SIZE_KIB = 16384
+
+
+class PoolTimeoutError(OperationalError):
+    """no connection of the pool became free within the acquire timeout"""
+
+
+def is_locked_error(error) -> bool:
+    message = str(error).lower()
+    return "database is locked" in message or "database is busy" in message
+
+
+class _WaitStats:
+    def __init__(self):
+        self.acquired = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.timeouts = 0
+
+    def record(self, wait):
+        self.acquired += 1
+        self.total_wait += wait
+        self.max_wait = max(self.max_wait, wait)
+
+    def as_dict(self) -> dict:
+        return {
+            "acquired": self.acquired,
+            "timeouts": self.timeouts,
+            "mean_wait_ms": round(self.total_wait / self.acquired * 1000, 3) if self.acquired else 0.0,
+            "max_wait_ms": round(self.max_wait * 1000, 3),
+        }
+
 
 class DatabaseManager:
     _instances = {}
+    _instances_lock = threading.Lock()
 
     @classmethod
     def get_instance(cls, db_path):
         bt.logging.trace(f"get_instance() | Getting instance for {db_path}")
-        if db_path not in cls._instances:
-            cls._instances[db_path] = cls(db_path)
-        return cls._instances[db_path]
+        with cls._instances_lock:
+            if db_path not in cls._instances:
+                cls._instances[db_path] = cls(db_path)
+            return cls._instances[db_path]
 
-    def __init__(self, db_path):
+    def __init__(
+        self,
+        db_path,
+        max_readers=MAX_READERS,
+        busy_timeout=BUSY_TIMEOUT,
+        acquire_timeout=ACQUIRE_TIMEOUT,
+        max_retries=MAX_RETRIES,
+    ):
         bt.logging.trace(f"__init__() | Initializing database manager for {db_path}")
         self.db_path = db_path
-        self.lock = Lock()
-        self.connection_pool = []
-
-    def get_connection(self):
-        bt.logging.trace(f"get_connection() | Getting connection for {self.db_path}")
-        with self.lock:
-            if self.connection_pool:
-                return self.connection_pool.pop()
+        self.max_readers = max_readers
+        self.busy_timeout = busy_timeout
+        self.acquire_timeout = acquire_timeout
+        self.max_retries = max_retries
+
+        self._writer = None
+        self._writer_lock = threading.Lock()
+        self._writer_owner = threading.local()
+        self._readers = queue.LifoQueue()
+        self._reader_slots = threading.BoundedSemaphore(max_readers)
+        self._stats_lock = threading.Lock()
+        self._read_stats = _WaitStats()
+        self._write_stats = _WaitStats()
+        self.retries = 0
+        self.connections_opened = 0
+
+    def _connect(self, read_only) -> sqlite3.Connection:
+        # transactions are managed explicitly, see write_cursor
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=self.busy_timeout,
+            isolation_level=None,
+            check_same_thread=False,
+        )
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+        except OperationalError as e:
+            # another process holds a lock, the mode is set by the next connection
+            bt.logging.debug(f"Unable to enable WAL for {self.db_path}: {e}")
+        conn.execute(f"PRAGMA busy_timeout={int(self.busy_timeout * 1000)}")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(f"PRAGMA cache_size=-{CACHE_SIZE_KIB}")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        if read_only:
+            conn.execute("PRAGMA query_only=ON")
+        with self._stats_lock:
+            self.connections_opened += 1
+        return conn
+
+    def _backoff(self, attempt):
+        time.sleep(min(BACKOFF_MAX, BACKOFF_BASE * 2**attempt) * random.uniform(0.5, 1.0))
+
+    def _record(self, stats, wait=None, timeout=False):
+        with self._stats_lock:
+            if timeout:
+                stats.timeouts += 1
             else:
-                return sqlite3.connect(self.db_path, check_same_thread=False)
+                stats.record(wait)
 
-    def release_connection(self, conn):
-        with self.lock:
-            self.connection_pool.append(conn)
+    def _begin(self, conn):
+        """opens a write transaction, retrying with backoff while another process holds the lock"""
+        for attempt in range(self.max_retries):
+            try:
+                conn.execute("BEGIN IMMEDIATE")
+                return
+            except OperationalError as e:
+                if not is_locked_error(e) or attempt == self.max_retries - 1:
+                    raise
+                with self._stats_lock:
+                    self.retries += 1
+                bt.logging.debug(f"Database locked, retrying ({attempt + 1}/{self.max_retries}): {e}")
+                self._backoff(attempt)
 
     @contextmanager
-    def get_cursor(self):
-        bt.logging.trace(f"get_cursor() | Getting cursor for {self.db_path}")
-        conn = self.get_connection()
+    def write_cursor(self):
+        """yields a cursor in a write transaction, committed when the block exits"""
+        if getattr(self._writer_owner, "depth", 0):
+            yield from self._nested_write()
+            return
+
+        start = time.monotonic()
+        if not self._writer_lock.acquire(timeout=self.acquire_timeout):
+            self._record(self._write_stats, timeout=True)
+            raise PoolTimeoutError(f"no write connection free after {self.acquire_timeout}s")
+        self._record(self._write_stats, time.monotonic() - start)
         try:
+            if self._writer is None:
+                self._writer = self._connect(read_only=False)
+            conn = self._writer
+            self._begin(conn)
+            self._writer_owner.depth = 1
             cursor = conn.cursor()
+            try:
+                yield cursor
+            except BaseException:
+                if conn.in_transaction:
+                    conn.execute("ROLLBACK")
+                raise
+            else:
+                if conn.in_transaction:
+                    conn.execute("COMMIT")
+            finally:
+                cursor.close()
+                self._writer_owner.depth = 0
+        finally:
+            self._writer_lock.release()
+
+    def _nested_write(self):
+        conn = self._writer
+        depth = self._writer_owner.depth
+        name = f"nested_{depth}"
+        # the outer block may have committed on its own, then statements autocommit
+        savepoint = conn.in_transaction
+        if savepoint:
+            conn.execute(f"SAVEPOINT {name}")
+        self._writer_owner.depth = depth + 1
+        cursor = conn.cursor()
+        try:
             yield cursor
-            conn.commit()
-        except OperationalError as e:
-            bt.logging.error(f"Database error: {e}. Retrying...")
-            time.sleep(1)  # Wait for a second before retrying
-            cursor = conn.cursor()
-            yield cursor
-            conn.commit()
+        except BaseException:
+            if savepoint and conn.in_transaction:
+                conn.execute(f"ROLLBACK TO {name}")
+                conn.execute(f"RELEASE {name}")
+            raise
+        else:
+            if savepoint and conn.in_transaction:
+                conn.execute(f"RELEASE {name}")
         finally:
             cursor.close()
-            self.release_connection(conn)
+            self._writer_owner.depth = depth
+
+    # the connections used to be handed out for both, most callers write
+    get_cursor = write_cursor
+
+    @contextmanager
+    def read_cursor(self):
+        """yields a cursor of a query only connection"""
+        start = time.monotonic()
+        if not self._reader_slots.acquire(timeout=self.acquire_timeout):
+            self._record(self._read_stats, timeout=True)
+            raise PoolTimeoutError(f"no read connection free after {self.acquire_timeout}s")
+        self._record(self._read_stats, time.monotonic() - start)
+        conn = None
+        try:
+            try:
+                conn = self._readers.get_nowait()
+            except queue.Empty:
+                conn = self._connect(read_only=True)
+            cursor = conn.cursor()
+            try:
+                yield cursor
+            finally:
+                cursor.close()
+                if conn.in_transaction:
+                    conn.execute("ROLLBACK")
+        finally:
+            if conn is not None:
+                self._readers.put(conn)
+            self._reader_slots.release()
+
+    def write(self, fn):
+        """
+        runs fn(cursor) in a write transaction and returns its result. the whole
+        transaction is retried with backoff while the database is locked
+        """
+        for attempt in range(self.max_retries):
+            try:
+                with self.write_cursor() as cursor:
+                    return fn(cursor)
+            except PoolTimeoutError:
+                raise
+            except OperationalError as e:
+                if not is_locked_error(e) or attempt == self.max_retries - 1:
+                    raise
+                with self._stats_lock:
+                    self.retries += 1
+                self._backoff(attempt)
+
+    def read(self, fn):
+        """runs fn(cursor) on a read connection and returns its result"""
+        with self.read_cursor() as cursor:
+            return fn(cursor)
+
+    def stats(self) -> dict:
+        """pool wait times and counters since the manager was created"""
+        with self._stats_lock:
+            return {
+                "read": self._read_stats.as_dict(),
+                "write": self._write_stats.as_dict(),
+                "retries": self.retries,
+                "connections_opened": self.connections_opened,
+                "idle_readers": self._readers.qsize(),
+            }
+
+    def close(self):
+        """closes the idle connections, connections in use are closed by the garbage collector"""
+        while True:
+            try:
+                self._readers.get_nowait().close()
+            except queue.Empty:
+                break
+        with self._writer_lock:
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
+
 
 def get_db_manager(miner_uid=None):
     '''
@@ -65,7 +309,7 @@ def get_db_manager(miner_uid=None):
 
     use_single_db = os.environ.get('USE_SINGLE_DB', 'True').lower() == 'true'
     bt.logging.trace(f"get_db_manager() | Using single database: {use_single_db}")
-    
+
     if use_single_db:
         db_path = os.environ.get('SINGLE_DB_PATH', './data/miner.db')
     else:
@@ -73,5 +317,5 @@ def get_db_manager(miner_uid=None):
             db_path = os.environ.get('DEFAULT_DB_PATH', './data/miner.db')
         else:
             db_path = os.environ.get(f'MINER_{miner_uid}_DB_PATH', f'./data/miner_{miner_uid}.db')
-    
-    return DatabaseManager.get_instance(db_path)
\ No newline at end of file
+
+    return DatabaseManager.get_instance(db_path)
@@ -0,0 +1,123 @@
+"""
+process wide snapshot cache of the game data window sent to miners.
+
+building the game dict means querying game_data and validating hundreds of
+TeamGame models, while the result only changes when SportsData writes games or
+odds, or when a game outcome is set. every writer of game_data calls
+bump_generation after its commit, which drops the snapshot of that database.
+as long as the generation is unchanged the snapshot is reused; when games leave
+the 15 day window the cached snapshot is narrowed without touching the database.
+
+snapshots are shared between callers and must not be modified.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Optional
+
+_lock = threading.Lock()
+_generations: Dict[str, int] = {}
+_snapshots: Dict[str, "GameDataSnapshot"] = {}
+
+
+def _key(db_path) -> str:
+    return os.path.abspath(db_path)
+
+
+def bump_generation(db_path):
+    """invalidates the snapshot of db_path, call after committing a write to game_data"""
+    key = _key(db_path)
+    with _lock:
+        _generations[key] = _generations.get(key, 0) + 1
+        _snapshots.pop(key, None)
+
+
+def get_generation(db_path) -> int:
+    with _lock:
+        return _generations.get(_key(db_path), 0)
+
+
+def game_data_version(games) -> str:
+    """returns a hash of the content of a game dict"""
+    content = json.dumps(
+        {game_id: game.dict() for game_id, game in games.items()}, sort_keys=True
+    )
+    return hashlib.sha256(content.encode()).hexdigest()
+
+
+@dataclass
+class GameDataSnapshot:
+    """the games starting at or after window_start, in rowid order"""
+
+    generation: int
+    window_start: str
+    games: dict  # game id -> TeamGame
+    by_external_id: dict = field(init=False)  # externalId -> first TeamGame with that id
+    oldest_start: Optional[str] = field(init=False)
+    _version: Optional[str] = field(default=None, init=False, repr=False)
+
+    def __post_init__(self):
+        self.by_external_id = {}
+        for game in self.games.values():
+            self.by_external_id.setdefault(game.externalId, game)
+        self.oldest_start = min(
+            (game.eventStartDate for game in self.games.values()), default=None
+        )
+
+    @property
+    def version(self) -> str:
+        if self._version is None:
+            self._version = game_data_version(self.games)
+        return self._version
+
+    def narrow(self, window_start) -> "GameDataSnapshot":
+        """returns the snapshot for a later window start, self if no game left the window"""
+        if self.oldest_start is None or self.oldest_start >= window_start:
+            return self
+        return GameDataSnapshot(
+            self.generation,
+            window_start,
+            {
+                game_id: game
+                for game_id, game in self.games.items()
+                if game.eventStartDate >= window_start
+            },
+        )
+
+
+def get_snapshot(
+    db_path, window_start: str, load: Callable[[str], dict]
+) -> GameDataSnapshot:
+    """
+    returns the games of db_path starting at or after window_start
+
+    Args:
+        db_path: path to the database
+        window_start: iso timestamp of the start of the window
+        load: called with window_start on a cache miss, returns the game dict
+    """
+    key = _key(db_path)
+    with _lock:
+        generation = _generations.get(key, 0)
+        snapshot = _snapshots.get(key)
+
+    if (
+        snapshot is not None
+        and snapshot.generation == generation
+        and snapshot.window_start <= window_start
+    ):
+        narrowed = snapshot.narrow(window_start)
+        if narrowed is snapshot:
+            return snapshot
+        snapshot = narrowed
+    else:
+        snapshot = GameDataSnapshot(generation, window_start, load(window_start))
+
+    with _lock:
+        # a write that happened while loading already bumped the generation
+        if _generations.get(key, 0) == generation:
+            _snapshots[key] = snapshot
+    return snapshot
@@ -0,0 +1,74 @@
+"""
+lookup tables of a metagraph snapshot.
+
+finding the uid of a hotkey with metagraph.hotkeys.index is a linear scan, and
+the query filters were built with a python loop over every neuron. the index
+is built once per metagraph sync: a hotkey -> uid dict and numpy masks indexed
+by uid, so target selection and the per request checks of the miner are dict
+lookups and vectorized mask operations.
+"""
+
+from typing import Iterable, Optional
+
+import numpy as np
+
+# ip of neurons that don't serve an axon
+UNSERVED_IP = "0.0.0.0"
+
+
+def _to_numpy(values, dtype) -> np.ndarray:
+    if hasattr(values, "detach"):
+        values = values.detach().cpu().numpy()
+    return np.asarray(values, dtype=dtype)
+
+
+class MetagraphIndex:
+    """hotkey -> uid and per uid masks of one metagraph snapshot"""
+
+    def __init__(self, hotkeys, stake, serving, validator_permit, blacklisted_hotkeys: Iterable[str] = ()):
+        self.hotkeys = list(hotkeys)
+        self.uids = {hotkey: uid for uid, hotkey in enumerate(self.hotkeys)}
+        self.stake = _to_numpy(stake, np.float64)
+        self.serving = _to_numpy(serving, bool)
+        self.validator_permit = _to_numpy(validator_permit, bool)
+
+        self.blacklisted_hotkeys = tuple(blacklisted_hotkeys)
+        self.blacklisted = np.zeros(len(self.hotkeys), dtype=bool)
+        # uids in the order of the blacklist, hotkeys that are not registered are skipped
+        self.blacklisted_uids = []
+        self.unknown_blacklisted_hotkeys = []
+        for hotkey in self.blacklisted_hotkeys:
+            uid = self.uids.get(hotkey)
+            if uid is None:
+                self.unknown_blacklisted_hotkeys.append(hotkey)
+            else:
+                self.blacklisted_uids.append(uid)
+                self.blacklisted[uid] = True
+
+    @classmethod
+    def from_metagraph(cls, metagraph, blacklisted_hotkeys: Iterable[str] = ()) -> "MetagraphIndex":
+        return cls(
+            metagraph.hotkeys,
+            metagraph.S,
+            [axon.ip != UNSERVED_IP for axon in metagraph.axons],
+            metagraph.validator_permit,
+            blacklisted_hotkeys,
+        )
+
+    def __len__(self):
+        return len(self.hotkeys)
+
+    def __contains__(self, hotkey):
+        return hotkey in self.uids
+
+    def uid(self, hotkey) -> Optional[int]:
+        """returns the uid of the hotkey, None if it is not registered"""
+        return self.uids.get(hotkey)
+
+    def queryable(self) -> np.ndarray:
+        """mask of the uids that serve an axon, have a stake and are not blacklisted"""
+        return self.serving & (self.stake >= 0.0) & ~self.blacklisted
+
+    def stake_of(self, hotkey) -> Optional[float]:
+        uid = self.uids.get(hotkey)
+        return None if uid is None else float(self.stake[uid])
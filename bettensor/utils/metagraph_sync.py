@@ -0,0 +1,158 @@
+"""
+background refresh of the metagraph.
+
+syncing the metagraph is a round trip to the chain that takes seconds on a slow
+endpoint, and both neurons used to do it on their main loop. MetagraphSync
+fetches a new metagraph on a daemon thread with its own subtensor connection,
+builds its index there and publishes both as one immutable snapshot. readers
+pick up the current snapshot with a single attribute read: they never wait on
+the chain and never pair a metagraph with the index of another one.
+"""
+
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Optional
+
+import bittensor as bt
+
+from bettensor.utils.metagraph_index import MetagraphIndex
+
+# seconds between two syncs
+METAGRAPH_SYNC_INTERVAL = 120.0
+
+
+@dataclass(frozen=True)
+class MetagraphSnapshot:
+    metagraph: Any
+    index: MetagraphIndex
+    version: int
+    synced_at: float  # time.time() of the end of the sync
+    block: Optional[int]
+
+
+def _block(metagraph) -> Optional[int]:
+    try:
+        return int(metagraph.block)
+    except (AttributeError, TypeError, ValueError):
+        return None
+
+
+class MetagraphSync:
+    """refreshes a metagraph and its index on a background thread"""
+
+    def __init__(
+        self,
+        subtensor_factory: Callable[[], Any],
+        netuid: int,
+        interval: float = METAGRAPH_SYNC_INTERVAL,
+        build_index: Callable[[Any], MetagraphIndex] = MetagraphIndex.from_metagraph,
+        initial=None,
+        lite: bool = True,
+    ):
+        """
+        Args:
+            subtensor_factory: creates the subtensor connection of the sync thread,
+                connections are not shared with the main thread
+            netuid: subnet of the metagraph
+            interval: seconds between two syncs
+            build_index: builds the index of a new metagraph, runs on the sync thread
+            initial: metagraph to publish as the first snapshot, if any
+            lite: sync without the weights and bonds
+        """
+        self.subtensor_factory = subtensor_factory
+        self.netuid = netuid
+        self.interval = interval
+        self.build_index = build_index
+        self.lite = lite
+
+        self.snapshot: Optional[MetagraphSnapshot] = None
+        self.syncs = 0
+        self.failures = 0
+        self.last_duration = None
+        self.last_error = None
+
+        self._subtensor = None
+        self._stop = threading.Event()
+        self._thread = None
+        if initial is not None:
+            self._publish(initial, build_index(initial))
+
+    def _publish(self, metagraph, index) -> MetagraphSnapshot:
+        version = self.snapshot.version + 1 if self.snapshot is not None else 0
+        # a single reference assignment, readers see the old or the new snapshot
+        self.snapshot = MetagraphSnapshot(metagraph, index, version, time.time(), _block(metagraph))
+        return self.snapshot
+
+    def sync_once(self) -> MetagraphSnapshot:
+        """fetches and publishes a new snapshot on the calling thread"""
+        start = time.monotonic()
+        try:
+            if self._subtensor is None:
+                self._subtensor = self.subtensor_factory()
+            metagraph = self._subtensor.metagraph(self.netuid, lite=self.lite)
+            index = self.build_index(metagraph)
+        except Exception:
+            # reconnect on the next attempt
+            self._subtensor = None
+            raise
+        finally:
+            self.last_duration = time.monotonic() - start
+        self.syncs += 1
+        self.last_error = None
+        return self._publish(metagraph, index)
+
+    def _run(self):
+        wait = self.interval if self.snapshot is not None else 0
+        while not self._stop.wait(wait):
+            wait = self.interval
+            try:
+                snapshot = self.sync_once()
+                bt.logging.debug(
+                    f"Metagraph synced in {self.last_duration:.2f}s, block {snapshot.block}, {len(snapshot.index)} uids"
+                )
+            except Exception as e:
+                self.failures += 1
+                self.last_error = repr(e)
+                bt.logging.warning(
+                    f"Metagraph sync failed after {self.last_duration:.2f}s, {self.staleness():.0f}s stale: {e!r}"
+                )
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="metagraph-sync", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def newer_than(self, version) -> Optional[MetagraphSnapshot]:
+        """returns the current snapshot if it is not the given version"""
+        snapshot = self.snapshot
+        if snapshot is None or snapshot.version == version:
+            return None
+        return snapshot
+
+    def staleness(self, now=None) -> float:
+        """seconds since the current snapshot was synced, inf without a snapshot"""
+        snapshot = self.snapshot
+        if snapshot is None:
+            return float("inf")
+        return (time.time() if now is None else now) - snapshot.synced_at
+
+    def stats(self) -> dict:
+        snapshot = self.snapshot
+        return {
+            "version": snapshot.version if snapshot else None,
+            "block": snapshot.block if snapshot else None,
+            "staleness_seconds": round(self.staleness(), 1),
+            "syncs": self.syncs,
+            "failures": self.failures,
+            "last_sync_seconds": round(self.last_duration, 3) if self.last_duration is not None else None,
+            "last_error": self.last_error,
+        }
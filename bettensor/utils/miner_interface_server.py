@@ -75,7 +75,6 @@ def submit_prediction():
                 data['canOverwrite'],
             ),
         )
-        cursor.connection.commit()
     
     return jsonify({'message': 'Prediction submitted successfully'}), 200
 
@@ -91,7 +90,7 @@ def get_games():
     db_manager = get_db_manager(miner_uid)
     games = {}
     
-    with db_manager.get_cursor() as cursor:
+    with db_manager.read_cursor() as cursor:
         cursor.execute("SELECT * FROM games WHERE active = 0")
         columns = [column[0] for column in cursor.description]
         for row in cursor.fetchall():
@@ -111,7 +110,7 @@ def get_predictions():
     db_manager = get_db_manager(miner_uid)
     predictions = {}
     
-    with db_manager.get_cursor() as cursor:
+    with db_manager.read_cursor() as cursor:
         cursor.execute("SELECT * FROM predictions")
         columns = [column[0] for column in cursor.description]
         for row in cursor.fetchall():
@@ -70,7 +70,6 @@ class MinerStatsHandler:
                 miner_status TEXT
             )
             """)
-            cursor.connection.commit()
         bt.logging.info("miner_stats table created or already exists")
 
     def update_miner_row(self, miner_stats: MinerStats):
@@ -104,7 +103,6 @@ class MinerStatsHandler:
                     miner_stats.miner_status,
                     miner_stats.miner_hotkey
                 ))
-                cursor.connection.commit()
             bt.logging.info(f"Updated miner stats for {miner_stats.miner_hotkey}")
             return True
         except Exception as e:
@@ -121,7 +119,6 @@ class MinerStatsHandler:
             UPDATE miner_stats
             SET miner_cash = 1000
             """)
-            cursor.connection.commit()
         bt.logging.info("Daily cash reset for all miners")
 
     def reset_daily_cash_on_startup(self):
@@ -148,7 +145,6 @@ class MinerStatsHandler:
                         """, (miner_hotkey,)
                     )
                     bt.logging.info(f"Daily cash reset for miner {miner_hotkey}")
-            cursor.connection.commit()
 
         # TODO: trigger miner_stats update query
 
@@ -195,7 +191,6 @@ class MinerStatsHandler:
                         """,
                         (miner_uid, miner_hotkey),
                         )
-                cursor.connection.commit()
                 return True
             else:
                 pass
@@ -221,7 +216,6 @@ class MinerStatsHandler:
                     miner_status,
                 ),
             )
-            cursor.connection.commit()
 
         return True
     
@@ -0,0 +1,90 @@
+"""
+cache of the averaged bookmaker odds of upcoming games.
+
+SportsData refreshes every hour and used to fetch the odds of every fixture on
+every refresh, including games a week away whose odds rarely move. the cache
+keeps the odds of a game for a time that depends on how far away its start is:
+games far from their start are refetched rarely, games close to their start on
+every refresh.
+
+it also remembers the odds last written to the database per game, so a refresh
+only writes the games whose odds actually changed.
+"""
+
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Dict, Optional, Tuple
+
+# (minimum time to start, ttl), the first matching tier wins. games starting
+# sooner than the last tier are refetched on every refresh
+ODDS_TTLS = [
+    (timedelta(days=3), timedelta(hours=12)),
+    (timedelta(days=1), timedelta(hours=6)),
+    (timedelta(hours=6), timedelta(hours=2)),
+]
+
+# entries of games that started this long ago are dropped
+RETENTION = timedelta(days=1)
+
+
+@dataclass
+class _Entry:
+    odds: dict
+    start: datetime
+    expires: datetime
+
+
+class OddsCache:
+    """averaged odds of upcoming games, keyed by (sport, game_id)"""
+
+    def __init__(self, ttls=ODDS_TTLS):
+        self.ttls = ttls
+        self.hits = 0
+        self.misses = 0
+        self._entries: Dict[Tuple[str, str], _Entry] = {}
+        self._stored: Dict[Tuple[str, str], dict] = {}
+
+    def ttl(self, start: datetime, now: datetime) -> timedelta:
+        """how long odds fetched at now stay valid for a game starting at start"""
+        time_to_start = start - now
+        for minimum, ttl in self.ttls:
+            if time_to_start >= minimum:
+                return ttl
+        return timedelta(0)
+
+    def get(self, sport, game_id, now: datetime) -> Optional[dict]:
+        """returns the cached odds of the game, None if they have to be fetched"""
+        entry = self._entries.get((sport, str(game_id)))
+        if entry is None or entry.expires <= now:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return dict(entry.odds)
+
+    def put(self, sport, game_id, start: datetime, odds: dict, now: datetime):
+        """caches odds fetched at now, games without complete odds are not cached"""
+        if odds.get("average_home_odds") is None or odds.get("average_away_odds") is None:
+            return
+        self._entries[(sport, str(game_id))] = _Entry(
+            dict(odds), start, now + self.ttl(start, now)
+        )
+
+    def is_stored(self, sport, game_id, odds: dict) -> bool:
+        """true if these odds are the ones last written to the database for the game"""
+        return self._stored.get((sport, str(game_id))) == odds
+
+    def mark_stored(self, sport, game_id, odds: dict):
+        self._stored[(sport, str(game_id))] = dict(odds)
+
+    def take_stats(self) -> Tuple[int, int]:
+        """returns (hits, misses) since the last call"""
+        stats = (self.hits, self.misses)
+        self.hits = self.misses = 0
+        return stats
+
+    def prune(self, now: datetime):
+        """drops the games that started more than RETENTION ago"""
+        expired = [key for key, entry in self._entries.items() if entry.start < now - RETENTION]
+        for key in expired:
+            del self._entries[key]
+            self._stored.pop(key, None)
@@ -1,4 +1,5 @@
-import requests
+import asyncio
+import aiohttp
 import json
 import time
 import uuid
@@ -7,16 +8,67 @@ from dateutil import parser
 import sqlite3
 import bittensor as bt
 import os
+from bettensor.utils import game_data_cache
+from bettensor.utils.odds_cache import OddsCache
+from bettensor.utils.sqlite_helpers import chunks, placeholders
+
+API_HOSTS = {
+    "baseball": "api-baseball.p.rapidapi.com",
+    "soccer": "api-football-v1.p.rapidapi.com",
+}
+# base url all RapidAPI calls are sent to instead of https://<api host>, e.g. a
+# local stand-in server (benchmarks/rapid_api_server.py). the X-RapidAPI-Host
+# header still names the api
+API_BASE_URL_ENV = "RAPID_API_BASE_URL"
+
+
+def api_base_url(host, base_url=None) -> str:
+    return base_url.rstrip("/") if base_url else f"https://{host}"
+
+
+# bounds of the concurrent RapidAPI calls of a refresh
+MAX_CONCURRENT_REQUESTS = 16
+MAX_REQUESTS_PER_HOST = 8
+REQUEST_TIMEOUT_SECONDS = 30
+
+# inserts new games, known games only get their odds updated and only if they changed.
+# games without tie odds keep the stored ones
+UPSERT_GAME_QUERY = """
+    INSERT INTO game_data (id, teamA, teamB, sport, league, externalId, createDate, lastUpdateDate, eventStartDate, active, outcome, teamAodds, teamBodds, tieOdds, canTie)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT (externalId) DO UPDATE SET
+        teamAodds = excluded.teamAodds,
+        teamBodds = excluded.teamBodds,
+        tieOdds = COALESCE(excluded.tieOdds, game_data.tieOdds),
+        lastUpdateDate = excluded.lastUpdateDate
+    WHERE game_data.teamAodds IS NOT excluded.teamAodds
+        OR game_data.teamBodds IS NOT excluded.teamBodds
+        OR game_data.tieOdds IS NOT COALESCE(excluded.tieOdds, game_data.tieOdds)
+"""
+
+NO_ODDS = {
+    "average_home_odds": None,
+    "average_away_odds": None,
+    "average_tie_odds": None,
+}
 
 
 class SportsData:
-    def __init__(self, db_name="data/validator.db"):
+    def __init__(
+        self,
+        db_name="data/validator.db",
+        max_concurrent_requests=MAX_CONCURRENT_REQUESTS,
+        max_requests_per_host=MAX_REQUESTS_PER_HOST,
+        api_hosts=None,
+        api_base_url=None,
+    ):
         self.db_name = db_name
+        self.max_concurrent_requests = max_concurrent_requests
+        self.max_requests_per_host = max_requests_per_host
         self.rapid_api_key = os.getenv("RAPID_API_KEY")
-        self.api_hosts = {
-            "baseball": "api-baseball.p.rapidapi.com",
-            "soccer": "api-football-v1.p.rapidapi.com",
-        }
+        self.api_hosts = dict(api_hosts or API_HOSTS)
+        self.api_base_url = api_base_url or os.getenv(API_BASE_URL_ENV)
+        self.odds_cache = OddsCache()
         self.create_database()
         self.all_games = []
 
@@ -42,98 +94,113 @@ class SportsData:
                         canTie BOOLEAN
                     )"""
         )
-        conn.commit()
-        conn.close()
-
-    def insert_into_database(self, game_data):
-        conn = sqlite3.connect(self.db_name)
-        c = conn.cursor()
-        c.execute(
-            """INSERT INTO game_data (id, teamA, teamB, sport, league, externalId, createDate, lastUpdateDate, eventStartDate, active, outcome, teamAodds, teamBodds, tieOdds, canTie)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
-            game_data,
-        )
-        conn.commit()
-        conn.close()
-
-    def update_odds_in_database(self, externalId, teamAodds, teamBodds, tieOdds=None):
-        conn = sqlite3.connect(self.db_name)
-        c = conn.cursor()
-        if tieOdds is not None:
-            c.execute(
-                """UPDATE game_data
-                         SET teamAodds = ?, teamBodds = ?, tieOdds = ?, lastUpdateDate = ?
-                         WHERE externalId = ?""",
-                (
-                    teamAodds,
-                    teamBodds,
-                    tieOdds,
-                    datetime.utcnow().replace(tzinfo=timezone.utc).isoformat(),
-                    externalId,
-                ),
-            )
-        else:
+        # upsert_games conflicts on externalId. databases with duplicated games
+        # are deduplicated by the validator migrations
+        try:
             c.execute(
-                """UPDATE game_data
-                         SET teamAodds = ?, teamBodds = ?, lastUpdateDate = ?
-                         WHERE externalId = ?""",
-                (
-                    teamAodds,
-                    teamBodds,
-                    datetime.utcnow().replace(tzinfo=timezone.utc).isoformat(),
-                    externalId,
-                ),
+                "CREATE UNIQUE INDEX IF NOT EXISTS idx_game_data_external_id ON game_data (externalId)"
             )
+        except sqlite3.IntegrityError as e:
+            bt.logging.warning(f"game_data holds duplicated games, not adding the unique index: {e}")
         conn.commit()
         conn.close()
 
-    def external_id_exists(self, externalId):
-        conn = sqlite3.connect(self.db_name)
-        c = conn.cursor()
-        c.execute(
-            """SELECT 1 FROM game_data WHERE externalId = ? LIMIT 1""", (externalId,)
-        )
-        exists = c.fetchone() is not None
-        conn.close()
-        return exists
-
     def get_multiple_game_data(self, sports_config):
         bt.logging.info("Fetching games frmo RapidAPI")
-        all_games = []
-        for sport, leagues in sports_config.items():
-            for league_info in leagues:
-                league = league_info['id']
-                season = league_info.get('season', '2024')
-                games = self.get_game_data(sport=sport, league=league, season=season)
-                all_games.extend(games)
-        return all_games
+        fetch_start = time.perf_counter()
+        self.odds_cache.prune(datetime.now(timezone.utc))
+        leagues = asyncio.run(self.fetch_multiple_game_data(sports_config))
+        odds_hits, odds_misses = self.odds_cache.take_stats()
+        bt.logging.info(
+            f"Fetched {sum(len(games) for _, _, games in leagues)} games of {len(leagues)} leagues "
+            f"from RapidAPI in {time.perf_counter() - fetch_start:.1f}s, "
+            f"odds of {odds_hits} games cached, {odds_misses} fetched"
+        )
+
+        leagues = [(sport, league, self._filter_games(games)) for sport, league, games in leagues]
+        self._store_games(leagues)
+        return [game for _, _, games in leagues for game in games]
 
     def get_game_data(self, sport, league="1", season="2024"):
         bt.logging.trace(f"Getting game data for sport: {sport}, league: {league}, season: {season}")
-        
+
+        async def fetch():
+            async with self._client_session() as session:
+                return await self._fetch_league(session, sport, league, season)
+
+        all_games = self._filter_games(asyncio.run(fetch()))
+        self._store_games([(sport, league, all_games)])
+        return all_games
+
+    async def fetch_multiple_game_data(self, sports_config):
+        """
+        fetches the fixtures and odds of every league in sports_config concurrently
+
+        all requests share one pooled client session, so the refresh takes about as
+        long as the slowest chain of fixture and odds calls instead of their sum.
+
+        Returns:
+            list of (sport, league, games) tuples, in the order of sports_config
+        """
+        async with self._client_session() as session:
+            leagues = [
+                (sport, league_info['id'], league_info.get('season', '2024'))
+                for sport, league_infos in sports_config.items()
+                for league_info in league_infos
+            ]
+            results = await asyncio.gather(
+                *(self._fetch_league(session, sport, league, season) for sport, league, season in leagues)
+            )
+        return [(sport, league, games) for (sport, league, _), games in zip(leagues, results)]
+
+    def _base_url(self, sport):
+        return api_base_url(self.api_hosts[sport], self.api_base_url)
+
+    def _client_session(self):
+        # the connector keeps connections alive across requests and bounds how many
+        # requests run at once, overall and per api host. only the socket operations
+        # are timed out, requests waiting for a free connection are not
+        connector = aiohttp.TCPConnector(
+            limit=self.max_concurrent_requests,
+            limit_per_host=self.max_requests_per_host,
+        )
+        headers = {"X-RapidAPI-Key": self.rapid_api_key} if self.rapid_api_key else None
+        return aiohttp.ClientSession(
+            connector=connector,
+            headers=headers,
+            timeout=aiohttp.ClientTimeout(
+                sock_connect=REQUEST_TIMEOUT_SECONDS, sock_read=REQUEST_TIMEOUT_SECONDS
+            ),
+        )
+
+    async def _fetch_league(self, session, sport, league, season):
         start_date = datetime.utcnow().date()
         end_date = start_date + timedelta(days=6)  # 7 days total
-        all_games = []
+        querystrings = []
 
         if sport == "soccer":
-            url = f"https://{self.api_hosts[sport]}/v3/fixtures"
-            querystring = {
+            url = f"{self._base_url(sport)}/v3/fixtures"
+            querystrings.append({
                 "league": league,
                 "season": season,
                 "from": start_date.strftime("%Y-%m-%d"),
                 "to": end_date.strftime("%Y-%m-%d")
-            }
-            all_games.extend(self._fetch_games(url, querystring, sport))
+            })
         elif sport == "baseball":
-            url = f"https://{self.api_hosts[sport]}/games"
+            url = f"{self._base_url(sport)}/games"
             for single_date in (start_date + timedelta(n) for n in range(7)):
-                querystring = {
+                querystrings.append({
                     "league": league,
                     "season": season,
                     "date": single_date.strftime("%Y-%m-%d")
-                }
-                all_games.extend(self._fetch_games(url, querystring, sport))
+                })
 
+        results = await asyncio.gather(
+            *(self._fetch_games(session, url, querystring, sport) for querystring in querystrings)
+        )
+        return [game for games in results for game in games]
+
+    def _filter_games(self, all_games):
         bt.logging.debug(f"Initially fetched {len(all_games)} games")
 
         # Filter games with odds less than 1.05; ensure odds are not None; exclude false odds of 1.5/3.0/1.5
@@ -157,92 +224,174 @@ class SportsData:
 
         # Append the fetched games to the overall all_games list
         self.all_games.extend(all_games)
+        return all_games
 
-        # Insert or update the data in the database
-        for game in all_games:
-            try:
-                externalId = game["game_id"]
-                teamAodds = game["odds"]["average_home_odds"]
-                teamBodds = game["odds"]["average_away_odds"]
-                tieOdds = game["odds"].get("average_tie_odds") if sport == "soccer" else None
-
-                if self.external_id_exists(externalId):
-                    self.update_odds_in_database(externalId, teamAodds, teamBodds, tieOdds)
-                else:
-                    game_id = str(uuid.uuid4())
-                    teamA = game["home"]
-                    teamB = game["away"]
-                    sport_type = sport
-                    createDate = datetime.utcnow().replace(tzinfo=timezone.utc).isoformat()
-                    lastUpdateDate = createDate
-                    eventStartDate = game["date"]
-                    active = 0 if parser.isoparse(eventStartDate) > datetime.utcnow().replace(tzinfo=timezone.utc) else 1
-                    outcome = "Unfinished"
-                    canTie = sport == "soccer"
-
-                    game_data = (
-                        game_id, teamA, teamB, sport_type, league, externalId, createDate, lastUpdateDate,
-                        eventStartDate, active, outcome, teamAodds, teamBodds, tieOdds if canTie else 0, canTie,
+    def _game_row(self, sport, league, game, now):
+        """the game_data row of a new game"""
+        teamAodds = game["odds"]["average_home_odds"]
+        teamBodds = game["odds"]["average_away_odds"]
+        tieOdds = game["odds"].get("average_tie_odds") if sport == "soccer" else None
+        createDate = now.isoformat()
+        eventStartDate = game["date"]
+        active = 0 if parser.isoparse(eventStartDate) > now else 1
+        canTie = sport == "soccer"
+        return (
+            str(uuid.uuid4()), game["home"], game["away"], sport, league, str(game["game_id"]), createDate, createDate,
+            eventStartDate, active, "Unfinished", teamAodds, teamBodds, tieOdds if canTie else 0, canTie,
+        )
+
+    def _store_games(self, leagues):
+        """writes the games of a list of (sport, league, games) with a single upsert"""
+        now = datetime.now(timezone.utc)
+        rows = []
+        pending = []
+        for sport, league, games in leagues:
+            for game in games:
+                try:
+                    if self.odds_cache.is_stored(sport, game["game_id"], game["odds"]):
+                        # already in the database with these odds
+                        continue
+                    rows.append(self._game_row(sport, league, game, now))
+                    pending.append((sport, game["game_id"], game["odds"]))
+                except KeyError as e:
+                    bt.logging.error(f"Key Error during database insertion: {e} in game data: {game}")
+                except (TypeError, ValueError) as e:
+                    bt.logging.error(f"Invalid game data: {e} in game data: {game}")
+
+        try:
+            inserted, updated, unchanged = self.upsert_games(rows)
+        except sqlite3.Error as e:
+            bt.logging.error(f"Unexpected error during database insertion: {e}")
+            return
+
+        for sport, game_id, odds in pending:
+            self.odds_cache.mark_stored(sport, game_id, odds)
+        bt.logging.info(
+            f"Stored games: {inserted} inserted, {updated} updated, {unchanged} unchanged"
+        )
+
+    def upsert_games(self, rows):
+        """
+        inserts new games and updates the odds of known games in one transaction
+
+        Args:
+            rows: game_data rows in column order. for games that already exist only
+                the odds and lastUpdateDate are used
+
+        Returns:
+            tuple: number of games inserted, updated and unchanged
+        """
+        # one row per game, the last one wins
+        rows = list({row[5]: row for row in rows}.values())
+        if not rows:
+            return 0, 0, 0
+
+        conn = sqlite3.connect(self.db_name, isolation_level=None)
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            existing = set()
+            for chunk in chunks(row[5] for row in rows):
+                existing.update(
+                    external_id
+                    for (external_id,) in conn.execute(
+                        f"SELECT externalId FROM game_data WHERE externalId IN ({placeholders(chunk)})",
+                        chunk,
                     )
-                    self.insert_into_database(game_data)
-            except KeyError as e:
-                bt.logging.error(f"Key Error during database insertion: {e} in game data: {game}")
-            except Exception as e:
-                bt.logging.error(f"Unexpected error during database insertion: {e}")
+                )
+            changes = conn.total_changes
+            conn.executemany(UPSERT_GAME_QUERY, rows)
+            changed = conn.total_changes - changes
+            conn.execute("COMMIT")
+        except Exception:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
 
-        return all_games
+        if changed:
+            game_data_cache.bump_generation(self.db_name)
+        inserted = sum(1 for row in rows if row[5] not in existing)
+        return inserted, changed - inserted, len(rows) - changed
 
-    def _fetch_games(self, url, querystring, sport):
-        headers = {
-            "X-RapidAPI-Key": self.rapid_api_key,
-            "X-RapidAPI-Host": self.api_hosts[sport],
-        }
+    async def _fetch_games(self, session, url, querystring, sport):
+        games = await self._get_json(session, url, querystring, sport)
+        if games is None:
+            return []
+        if "response" not in games:
+            bt.logging.warning(f"Unexpected response format: {games}")
+            return []
 
         try:
-            response = requests.get(url, headers=headers, params=querystring)
-            response.raise_for_status()
-            games = response.json()
-            
-            if "response" in games:
-                games_list = [
-                    {
-                        "home": i["teams"]["home"]["name"],
-                        "away": i["teams"]["away"]["name"],
-                        "game_id": i["fixture"]["id"] if sport == "soccer" else i["id"],
-                        "date": i["fixture"]["date"] if sport == "soccer" else i["date"],
-                        "odds": self.get_game_odds(i["fixture"]["id"] if sport == "soccer" else i["id"], sport)
-                    }
-                    for i in games["response"]
-                ]
-                return games_list
-            else:
-                bt.logging.warning(f"Unexpected response format: {games}")
-                return []
-        except requests.exceptions.RequestException as e:
-            bt.logging.error(f"HTTP Request failed: {e}")
+            fixtures = [
+                {
+                    "home": i["teams"]["home"]["name"],
+                    "away": i["teams"]["away"]["name"],
+                    "game_id": i["fixture"]["id"] if sport == "soccer" else i["id"],
+                    "date": i["fixture"]["date"] if sport == "soccer" else i["date"],
+                }
+                for i in games["response"]
+            ]
+        except (KeyError, TypeError) as e:
+            bt.logging.error(f"Unexpected fixture format: {e}")
             return []
+
+        now = datetime.now(timezone.utc)
+        to_fetch = []
+        for fixture in fixtures:
+            fixture["odds"] = self.odds_cache.get(sport, fixture["game_id"], now)
+            if fixture["odds"] is None:
+                to_fetch.append(fixture)
+
+        odds = await asyncio.gather(
+            *(self._fetch_game_odds(session, fixture["game_id"], sport) for fixture in to_fetch)
+        )
+        for fixture, game_odds in zip(to_fetch, odds):
+            fixture["odds"] = game_odds
+            try:
+                start = parser.isoparse(fixture["date"])
+            except (TypeError, ValueError):
+                continue
+            if start.tzinfo is None:
+                start = start.replace(tzinfo=timezone.utc)
+            self.odds_cache.put(sport, fixture["game_id"], start, game_odds, now)
+        return fixtures
+
+    async def _fetch_game_odds(self, session, game_id, sport):
+        url, querystring = self._odds_request(game_id, sport)
+        odds_data = await self._get_json(session, url, querystring, sport)
+        if odds_data is None:
+            return dict(NO_ODDS)
+        try:
+            return self._average_odds(odds_data, sport)
+        except (KeyError, TypeError, ValueError, StopIteration) as e:
+            bt.logging.error(f"Unexpected odds format for game {game_id}: {e}")
+            return dict(NO_ODDS)
+
+    async def _get_json(self, session, url, querystring, sport):
+        """returns the decoded json body of a RapidAPI call, None if the call failed"""
+        headers = {"X-RapidAPI-Host": self.api_hosts[sport]}
+        params = {key: str(value) for key, value in querystring.items()}
+        try:
+            async with session.get(url, headers=headers, params=params) as response:
+                response.raise_for_status()
+                return await response.json(content_type=None)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            bt.logging.error(f"HTTP Request failed: {url} {params}: {e!r}")
         except json.JSONDecodeError as e:
             bt.logging.error(f"JSON Decode Error: {e}")
-            return []
+        return None
 
-    def get_game_odds(self, game_id, sport):
+    def _odds_request(self, game_id, sport):
         if sport == "soccer":
-            url = f"https://{self.api_hosts[sport]}/v3/odds"
+            url = f"{self._base_url(sport)}/v3/odds"
             querystring = {"fixture": game_id}
         elif sport == "baseball":
-            url = f"https://{self.api_hosts[sport]}/odds"
+            url = f"{self._base_url(sport)}/odds"
             querystring = {"game": game_id}
+        return url, querystring
 
-        headers = {
-            "X-RapidAPI-Key": self.rapid_api_key,
-            "X-RapidAPI-Host": self.api_hosts[sport],
-        }
-
-        response = requests.get(url, headers=headers, params=querystring)
-        response.raise_for_status()  # Ensure we handle HTTP errors properly
-
-        odds_data = response.json()
-
+    def _average_odds(self, odds_data, sport):
         # Initialize totals and count
         total_home_odds = 0
         total_away_odds = 0
@@ -291,8 +440,4 @@ class SportsData:
                 }
 
         # Return None values if no data is available
-        return {
-            "average_home_odds": None,
-            "average_away_odds": None,
-            "average_tie_odds": None,
-        }
\ No newline at end of file
+        return dict(NO_ODDS)
\ No newline at end of file
@@ -0,0 +1,18 @@
+"""
+small helpers shared by the sqlite code paths
+"""
+
+# sqlite limits the number of bound parameters per statement
+SQLITE_MAX_PARAMS = 900
+
+
+def chunks(values, size=SQLITE_MAX_PARAMS):
+    """splits a list into chunks that fit into a single sqlite statement"""
+    values = list(values)
+    for i in range(0, len(values), size):
+        yield values[i : i + size]
+
+
+def placeholders(values) -> str:
+    """returns the '?, ?, ...' placeholder list for an IN clause"""
+    return ", ".join("?" for _ in values)
@@ -6,9 +6,15 @@ import bittensor as bt
 from bettensor.validator.bettensor_validator import BettensorValidator
 from argparse import ArgumentParser
 
-# Initialize the parser and validator
-parser = ArgumentParser()
-validator = BettensorValidator(parser=parser)
+# created on first use, constructing a validator parses the command line
+validator = None
+
+
+def get_validator():
+    global validator
+    if validator is None:
+        validator = BettensorValidator(parser=ArgumentParser())
+    return validator
 
 def create_keys_table(db_path: str):
     """
@@ -29,6 +35,7 @@ def get_or_update_coldkey(db_path: str, hotkey: str) -> str:
     """
     Retrieves coldkey from metagraph if it doesn't exist in keys table
     """
+    validator = get_validator()
     validator.initialize_connection()  # Ensure subtensor is initialized
 
     conn = sqlite3.connect(db_path)
@@ -0,0 +1,258 @@
+"""
+compact wire encoding of the game and prediction dicts of GameData.
+
+as json every game or prediction repeats its field names, team names, iso
+timestamps and float odds. the compact encoding stores the dict column by
+column instead:
+
+- strings (team and league names, outcomes) go into a string table and the
+  columns hold indexes into it
+- uuids are packed as 16 bytes, other ids fall back to the string table. the
+  dict keys are omitted when they equal the first field, i.e. the id
+- timestamps are stored as packed int64 microseconds plus the utc offset in
+  minutes. timestamps that would not round trip to the exact same string fall
+  back to the string table
+- floats are packed as little endian float64, booleans as one byte each
+
+the columns are packed with msgpack and sent as a base64 string, since synapse
+fields travel as json. the encoding is only used with peers that advertise
+support for it through Metadata.wire_encoding, see GameData.encode_compact.
+"""
+
+import base64
+import struct
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import msgpack
+
+# version of the encoding, raise it for incompatible changes
+WIRE_ENCODING_VERSION = 1
+
+_ID = "id"
+_STRING = "string"
+_TIME = "time"
+_FLOAT = "float"
+_BOOL = "bool"
+
+GAME_FIELDS = [
+    ("id", _ID),
+    ("teamA", _STRING),
+    ("teamB", _STRING),
+    ("sport", _STRING),
+    ("league", _STRING),
+    ("externalId", _STRING),
+    ("createDate", _TIME),
+    ("lastUpdateDate", _TIME),
+    ("eventStartDate", _TIME),
+    ("active", _BOOL),
+    ("outcome", _STRING),
+    ("teamAodds", _FLOAT),
+    ("teamBodds", _FLOAT),
+    ("tieOdds", _FLOAT),
+    ("canTie", _BOOL),
+]
+
+PREDICTION_FIELDS = [
+    ("predictionID", _ID),
+    ("teamGameID", _STRING),
+    ("minerID", _STRING),
+    ("predictionDate", _TIME),
+    ("predictedOutcome", _STRING),
+    ("wager", _FLOAT),
+    ("teamAodds", _FLOAT),
+    ("teamBodds", _FLOAT),
+    ("tieOdds", _FLOAT),
+    ("outcome", _STRING),
+    ("can_overwrite", _BOOL),
+]
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_MICROSECOND = timedelta(microseconds=1)
+_MINUTE = timedelta(minutes=1)
+_NO_TIME = -(2**63)
+_UTC_OFFSETS = {0: timezone.utc}
+
+
+class _StringTable:
+    def __init__(self):
+        self.strings = []
+        self._index = {}
+
+    def add(self, value) -> int:
+        index = self._index.get(value)
+        if index is None:
+            index = self._index[value] = len(self.strings)
+            self.strings.append(value)
+        return index
+
+
+def _pack(fmt, values) -> bytes:
+    return struct.pack(f"<{len(values)}{fmt}", *values)
+
+
+def _unpack(fmt, data, count):
+    return struct.unpack(f"<{count}{fmt}", data)
+
+
+def _encode_ids(values, strings: _StringTable):
+    packed, fallback = [], []
+    for value in values:
+        try:
+            parsed = uuid.UUID(value)
+        except (TypeError, ValueError, AttributeError):
+            parsed = None
+
+        if parsed is not None and str(parsed) == value:
+            packed.append(parsed.bytes)
+            fallback.append(-1)
+        else:
+            packed.append(bytes(16))
+            fallback.append(strings.add(value))
+    return [b"".join(packed), fallback]
+
+
+def _decode_ids(column, strings, count):
+    packed, fallback = column
+    if len(packed) != 16 * count:
+        raise ValueError("malformed compact encoding of ids")
+    return [
+        strings[index] if index >= 0 else str(uuid.UUID(bytes=packed[16 * i : 16 * i + 16]))
+        for i, index in enumerate(fallback)
+    ]
+
+
+def _utc_offset(minutes):
+    tz = _UTC_OFFSETS.get(minutes)
+    if tz is None:
+        tz = _UTC_OFFSETS[minutes] = timezone(minutes * _MINUTE)
+    return tz
+
+
+def _encode_times(values, strings: _StringTable):
+    micros, offsets, fallback = [], [], []
+    for value in values:
+        try:
+            parsed = datetime.fromisoformat(value)
+        except (TypeError, ValueError):
+            parsed = None
+
+        if (
+            parsed is not None
+            and parsed.tzinfo is not None
+            and parsed.utcoffset() % _MINUTE == timedelta(0)
+            and parsed.isoformat() == value
+        ):
+            micros.append((parsed - _EPOCH) // _MICROSECOND)
+            offsets.append(parsed.utcoffset() // _MINUTE)
+            fallback.append(-1)
+        else:
+            micros.append(_NO_TIME)
+            offsets.append(0)
+            fallback.append(strings.add(value))
+    return [_pack("q", micros), _pack("h", offsets), fallback]
+
+
+def _decode_times(column, strings, count):
+    micros, offsets, fallback = column
+    values = []
+    for us, offset, index in zip(
+        _unpack("q", micros, count), _unpack("h", offsets, count), fallback
+    ):
+        if us == _NO_TIME:
+            if not 0 <= index < len(strings):
+                raise ValueError("malformed compact encoding of times")
+            values.append(strings[index])
+        else:
+            values.append(
+                (_EPOCH + us * _MICROSECOND).astimezone(_utc_offset(offset)).isoformat()
+            )
+    return values
+
+
+def encode(models, fields) -> str:
+    """
+    returns the compact encoding of a dict of pydantic models
+
+    Args:
+        models: dict of models, e.g. GameData.gamedata_dict
+        fields: GAME_FIELDS or PREDICTION_FIELDS
+    """
+    strings = _StringTable()
+    values = list(models.values())
+    first_field = fields[0][0]
+    if all(key == getattr(model, first_field) for key, model in models.items()):
+        keys = None
+    else:
+        keys = [strings.add(key) for key in models]
+
+    columns = []
+    for name, kind in fields:
+        column = [getattr(model, name) for model in values]
+        if kind == _ID:
+            columns.append(_encode_ids(column, strings))
+        elif kind == _STRING:
+            columns.append([strings.add(value) for value in column])
+        elif kind == _TIME:
+            columns.append(_encode_times(column, strings))
+        elif kind == _FLOAT:
+            columns.append(_pack("d", column))
+        else:
+            columns.append(bytes(bool(value) for value in column))
+
+    packed = msgpack.packb(
+        [WIRE_ENCODING_VERSION, len(values), strings.strings, keys, columns],
+        use_bin_type=True,
+    )
+    return base64.b64encode(packed).decode("ascii")
+
+
+def decode(data: str, model_cls, fields) -> dict:
+    """
+    decodes the output of encode back into a dict of model_cls
+
+    Raises:
+        ValueError: if the data is not a compact encoding this version understands
+    """
+    try:
+        return _decode(data, model_cls, fields)
+    except (struct.error, IndexError, TypeError, OverflowError) as e:
+        raise ValueError(f"malformed compact encoding: {e}") from e
+
+
+def _decode(data, model_cls, fields):
+    version, count, strings, keys, columns = msgpack.unpackb(
+        base64.b64decode(data), raw=False
+    )
+    if version != WIRE_ENCODING_VERSION:
+        raise ValueError(f"unsupported wire encoding version {version}")
+    if (keys is not None and len(keys) != count) or len(columns) != len(fields):
+        raise ValueError("malformed compact encoding")
+    # every decoded value has the type of its field, so the models can be built
+    # without validation as long as the string table only holds strings
+    if not all(isinstance(value, str) for value in strings):
+        raise ValueError("malformed compact encoding of the string table")
+
+    decoded = {}
+    for (name, kind), column in zip(fields, columns):
+        if kind == _ID:
+            decoded[name] = _decode_ids(column, strings, count)
+        elif kind == _STRING:
+            decoded[name] = [strings[index] for index in column]
+            if any(index < 0 for index in column):
+                raise ValueError(f"malformed compact encoding of {name}")
+        elif kind == _TIME:
+            decoded[name] = _decode_times(column, strings, count)
+        elif kind == _FLOAT:
+            decoded[name] = _unpack("d", column, count)
+        else:
+            decoded[name] = [bool(value) for value in column]
+        if len(decoded[name]) != count:
+            raise ValueError(f"malformed compact encoding of {name}")
+
+    names = [name for name, _ in fields]
+    keys = decoded[names[0]] if keys is None else [strings[key] for key in keys]
+    return {
+        key: model_cls.construct(**dict(zip(names, row)))
+        for key, row in zip(keys, zip(*(decoded[name] for name in names)))
+    }
@@ -7,19 +7,30 @@ import sqlite3
 import os
 import sys
 import torch
+import numpy as np
 from copy import deepcopy
 import copy
 from datetime import datetime, timedelta, timezone
-from bettensor.protocol import TeamGamePrediction
+from bettensor.protocol import GameData, TeamGamePrediction
+from bettensor.utils import game_data_cache
+from bettensor.utils.metagraph_index import MetagraphIndex
+from bettensor.utils.metagraph_sync import METAGRAPH_SYNC_INTERVAL, MetagraphSync
+from bettensor.utils.sqlite_helpers import chunks, placeholders
+from bettensor.utils.sports_data import API_BASE_URL_ENV
+from bettensor.validator import earnings, scoring
+from bettensor.validator.outcome_polling import OutcomePollScheduler
+from bettensor.validator.outcome_resolvers import default_resolvers, resolve_outcomes
+from bettensor.validator.game_data_versions import GameDataVersions
+from bettensor.validator.migrations import migrate
+from bettensor.validator.storage import ValidatorStorage
 import uuid
 from pathlib import Path
 from os import path, rename
-import requests
-import time
 from dotenv import load_dotenv
 import os
 import asyncio
 import concurrent.futures
+from collections import Counter
 
 # Get the current file's directory
 current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -38,7 +49,6 @@ sys.path.append(parent_dir)
 sys.path.append(grandparent_dir)
 sys.path.append(great_grandparent_dir)
 from base.neuron import BaseNeuron
-from dotenv import load_dotenv
 
 
 class BettensorValidator(BaseNeuron):
@@ -77,6 +87,10 @@ class BettensorValidator(BaseNeuron):
         self.subtensor = None
         self.dendrite = None
         self.metagraph = None
+        self.metagraph_index = None
+        self.metagraph_sync = None
+        self.metagraph_version = None
+        self.metagraph_sync_interval = METAGRAPH_SYNC_INTERVAL
         self.scores = None
         self.hotkeys = None
         self.subtensor_connection = None
@@ -89,10 +103,13 @@ class BettensorValidator(BaseNeuron):
         self.uid = None
         self.loop = asyncio.get_event_loop()
         self.thread_executor = concurrent.futures.ThreadPoolExecutor(thread_name_prefix='asyncio')
+        self.game_data_versions = GameDataVersions()
+        self.outcome_polls = OutcomePollScheduler()
         self.axon_port = getattr(args, 'axon.port', None) 
 
         load_dotenv()  # take environment variables from .env.
         self.rapid_api_key = os.getenv("RAPID_API_KEY")
+        self.outcome_resolvers = default_resolvers(os.getenv(API_BASE_URL_ENV))
 
     def apply_config(self, bt_classes) -> bool:
         """applies the configuration to specified bittensor classes"""
@@ -125,8 +142,37 @@ class BettensorValidator(BaseNeuron):
     async def sync_metagraph(self):
         subtensor = await self.get_subtensor()
         self.metagraph.sync(subtensor=subtensor, lite=True)
+        self.metagraph_index = MetagraphIndex.from_metagraph(
+            self.metagraph, self.blacklisted_miner_hotkeys or ()
+        )
         return self.metagraph
 
+    def start_metagraph_sync(self):
+        """refreshes the metagraph on a background thread, see apply_metagraph_snapshot"""
+        self.metagraph_sync = MetagraphSync(
+            lambda: bt.subtensor(config=self.neuron_config),
+            self.neuron_config.netuid,
+            interval=self.metagraph_sync_interval,
+            build_index=lambda metagraph: MetagraphIndex.from_metagraph(
+                metagraph, self.blacklisted_miner_hotkeys or ()
+            ),
+            initial=self.metagraph,
+        )
+        self.apply_metagraph_snapshot()
+        self.metagraph_sync.start()
+
+    def apply_metagraph_snapshot(self) -> bool:
+        """swaps in the latest metagraph synced in the background, returns true if it changed"""
+        if self.metagraph_sync is None:
+            return False
+        snapshot = self.metagraph_sync.newer_than(self.metagraph_version)
+        if snapshot is None:
+            return False
+        self.metagraph = snapshot.metagraph
+        self.metagraph_index = snapshot.index
+        self.metagraph_version = snapshot.version
+        return True
+
     def check_vali_reg(self, metagraph, wallet, subtensor) -> bool:
         """validates the validator has registered correctly"""
         if wallet.hotkey.ss58_address not in metagraph.hotkeys:
@@ -205,6 +251,7 @@ class BettensorValidator(BaseNeuron):
         self.subtensor = subtensor
         self.dendrite = dendrite
         self.metagraph = metagraph
+        self.metagraph_index = None
 
         # read command line arguments and perform actions based on them
         args = self._parse_args(parser=self.parser)
@@ -224,6 +271,8 @@ class BettensorValidator(BaseNeuron):
                 self.max_targets = args.max_targets
             else:
                 self.max_targets = 256
+            if getattr(args, "metagraph_sync_interval", None):
+                self.metagraph_sync_interval = args.metagraph_sync_interval
             self.db_path = args.db
         else:
             # setup initial scoring weights
@@ -234,7 +283,7 @@ class BettensorValidator(BaseNeuron):
         self.target_group = 0
 
         # self.miner_stats = MinerStatsHandler(self.db_path, "validator")
-        self.create_table()
+        self.initialize_database()
         return True
 
     def _parse_args(self, parser):
@@ -271,136 +320,192 @@ class BettensorValidator(BaseNeuron):
 
         return True
 
-    def insert_predictions(self, processed_uids, predictions):
+    async def insert_predictions(self, processed_uids, predictions):
         """
         Inserts new predictions into the database
 
+        The referenced games come from the game data snapshot shared with the
+        GameData synapse. The already stored prediction ids and the daily
+        wager totals of the miners are fetched once for the whole batch, after
+        which every prediction is validated in memory and all accepted rows are
+        written with a single executemany. The whole batch runs as one job of the
+        storage writer, see bettensor.validator.storage.
+
         Args:
         processed_uids: list of uids that have been processed
         predictions: a dictionary with uids as keys and TeamGamePrediction objects as values
         """
-        conn = self.connect_db()
-        cursor = conn.cursor()
-        current_time = datetime.utcnow().replace(tzinfo=timezone.utc).isoformat()
-
-        # Get today's date in UTC
-        today_utc = datetime.now(timezone.utc).date().isoformat()
+        current_time = datetime.now(timezone.utc).isoformat()
+        processed = {int(uid) for uid in processed_uids}
 
+        # collect the predictions of the processed uids together with the miner hotkey
+        candidates = []
         for uid, prediction_dict in predictions.items():
-            for predictionID, res in prediction_dict.items():
-                if int(uid) not in processed_uids:
-                    bt.logging.info(f"UID {uid} not processed, skipping")
-                    continue
-
-                # Get today's date in UTC
-                today_utc = datetime.now(timezone.utc).isoformat()
-
-                hotkey = self.metagraph.hotkeys[int(uid)]
-                predictionID = res.predictionID
-                teamGameID = res.teamGameID
-                minerId = hotkey
-                predictionDate = today_utc
-                predictedOutcome = res.predictedOutcome
-                wager = res.wager
-
-                # Check if the predictionID already exists
-                cursor.execute(
-                    "SELECT COUNT(*) FROM predictions WHERE predictionID = ?",
-                    (predictionID,),
+            if not prediction_dict:
+                continue
+            if int(uid) not in processed:
+                bt.logging.info(f"UID {uid} not processed, skipping")
+                continue
+
+            hotkey = self.metagraph.hotkeys[int(uid)]
+            candidates.extend((hotkey, res) for res in prediction_dict.values())
+
+        if not candidates:
+            return
+
+        snapshot = await self.run_sync_in_async(
+            lambda: GameData.game_data_snapshot(current_time, self.db_path)
+        )
+        inserted = await self.storage.write(
+            lambda cursor: self._insert_prediction_rows(
+                cursor, candidates, current_time, snapshot.by_external_id
+            )
+        )
+        bt.logging.debug(
+            f"Inserted {inserted} of {len(candidates)} received predictions"
+        )
+
+    def _insert_prediction_rows(self, cursor, candidates, current_time, games) -> int:
+        """
+        validates the (hotkey, prediction) candidates against the games, keyed by
+        externalId, and inserts the accepted ones
+        """
+        prediction_date = current_time
+        existing_ids = self._fetch_existing_prediction_ids(
+            cursor, {res.predictionID for _, res in candidates}
+        )
+        daily_wagers = self._fetch_daily_wager_totals(
+            cursor, {hotkey for hotkey, _ in candidates}, prediction_date
+        )
+
+        rows = []
+        for minerId, res in candidates:
+            predictionID = res.predictionID
+            teamGameID = res.teamGameID
+            predictedOutcome = res.predictedOutcome
+            wager = res.wager
+
+            # Check if the predictionID already exists
+            if predictionID in existing_ids:
+                bt.logging.debug(
+                    f"Prediction {predictionID} already exists, skipping."
                 )
-                if cursor.fetchone()[0] > 0:
-                    bt.logging.debug(
-                        f"Prediction {predictionID} already exists, skipping."
-                    )
-                    continue
+                continue
+
+            game = games.get(teamGameID)
+            if game is None:
+                continue
 
-                query = "SELECT sport, league, eventStartDate, teamA, teamB, teamAodds, teamBodds, tieOdds, outcome FROM game_data WHERE externalId = ?"
-                cursor.execute(query, (teamGameID,))
-                result = cursor.fetchone()
+            event_start_date = game.eventStartDate
+            teamA = game.teamA
+            teamB = game.teamB
+            teamAodds = game.teamAodds
+            teamBodds = game.teamBodds
+            tieOdds = game.tieOdds
+            outcome = game.outcome
+
+            # Convert predictedOutcome to numeric value
+            if predictedOutcome == teamA:
+                predictedOutcome = 0
+            elif predictedOutcome == teamB:
+                predictedOutcome = 1
+            elif predictedOutcome.lower() == "tie":
+                predictedOutcome = 2
+            else:
+                bt.logging.debug(
+                    f"Invalid predictedOutcome: {predictedOutcome}. Skipping this prediction."
+                )
+                continue
 
-                if not result:
-                    continue
+            # Check if the game has already started
+            if current_time >= event_start_date:
+                bt.logging.debug(
+                    f"Prediction not inserted: game {teamGameID} has already started."
+                )
+                continue
 
+            # Check the total wager for the date, including the predictions accepted above
+            total_wager = daily_wagers.get(minerId, 0) + wager
+            if total_wager > 1000:
+                bt.logging.debug(
+                    f"Total wager for the date exceeds $1000. Skipping this prediction."
+                )
+                continue
+
+            daily_wagers[minerId] = total_wager
+            existing_ids.add(predictionID)
+            rows.append(
                 (
-                    sport,
-                    league,
-                    event_start_date,
+                    predictionID,
+                    teamGameID,
+                    minerId,
+                    prediction_date,
+                    predictedOutcome,
                     teamA,
                     teamB,
+                    wager,
                     teamAodds,
                     teamBodds,
                     tieOdds,
+                    False,
                     outcome,
-                ) = result
-
-                # Convert predictedOutcome to numeric value
-                if predictedOutcome == teamA:
-                    predictedOutcome = 0
-                elif predictedOutcome == teamB:
-                    predictedOutcome = 1
-                elif predictedOutcome.lower() == "tie":
-                    predictedOutcome = 2
-                else:
-                    bt.logging.debug(
-                        f"Invalid predictedOutcome: {predictedOutcome}. Skipping this prediction."
-                    )
-                    continue
-
-                # Check if the game has already started
-                if current_time >= event_start_date:
-                    bt.logging.debug(
-                        f"Prediction not inserted: game {teamGameID} has already started."
-                    )
-                    continue
-
-                # Calculate total wager for the date
-                cursor.execute(
-                    """
-                    SELECT SUM(wager) FROM predictions
-                    WHERE minerID = ? AND DATE(predictionDate) = DATE(?)
-                """,
-                    (minerId, predictionDate),
-                )
-                total_wager = cursor.fetchone()[0] or 0
-                total_wager += wager
-
-                if total_wager > 1000:
-                    bt.logging.debug(
-                        f"Total wager for the date exceeds $1000. Skipping this prediction."
-                    )
-                    continue
-
-                # Insert new prediction
-                cursor.execute(
-                    """
-                    INSERT INTO predictions (predictionID, teamGameID, minerID, predictionDate, predictedOutcome, teamA, teamB, wager, teamAodds, teamBodds, tieOdds, canOverwrite, outcome)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """,
-                    (
-                        predictionID,
-                        teamGameID,
-                        minerId,
-                        predictionDate,
-                        predictedOutcome,
-                        teamA,
-                        teamB,
-                        wager,
-                        teamAodds,
-                        teamBodds,
-                        tieOdds,
-                        False,
-                        outcome,
-                    ),
                 )
+            )
 
-        # Commit changes and close the connection
-        conn.commit()
-        conn.close()
+        cursor.executemany(
+            """
+            INSERT INTO predictions (predictionID, teamGameID, minerID, predictionDate, predictedOutcome, teamA, teamB, wager, teamAodds, teamBodds, tieOdds, canOverwrite, outcome)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+            rows,
+        )
+        return len(rows)
+
+    def _fetch_existing_prediction_ids(self, cursor, prediction_ids) -> set:
+        """returns the subset of the given prediction ids that is already stored"""
+        existing_ids = set()
+        for chunk in chunks(prediction_ids):
+            cursor.execute(
+                f"SELECT predictionID FROM predictions WHERE predictionID IN ({placeholders(chunk)})",
+                chunk,
+            )
+            existing_ids.update(row[0] for row in cursor.fetchall())
+        return existing_ids
+
+    def _fetch_daily_wager_totals(self, cursor, miner_ids, prediction_date) -> dict:
+        """returns the total wager per miner for the date of prediction_date"""
+        totals = {}
+        for chunk in chunks(miner_ids):
+            cursor.execute(
+                f"""
+                SELECT minerId, SUM(wager) FROM predictions
+                WHERE minerId IN ({placeholders(chunk)}) AND DATE(predictionDate) = DATE(?)
+                GROUP BY minerId
+            """,
+                (*chunk, prediction_date),
+            )
+            totals.update(
+                (miner_id, total or 0) for miner_id, total in cursor.fetchall()
+            )
+        return totals
 
     def connect_db(self):
         """connects to the sqlite database"""
         return sqlite3.connect(self.db_path)
 
+    def initialize_database(self):
+        """creates the database tables and upgrades the schema to the latest version.
+        runs once at startup"""
+        version = migrate(self.db_path)
+        bt.logging.info(f"validator database {self.db_path} is at schema version {version}")
+        self.storage = ValidatorStorage(self.db_path)
+
+    def close_database(self):
+        """waits for the pending writes and closes the database connections"""
+        storage = getattr(self, "storage", None)
+        if storage is not None:
+            storage.close()
+
     def create_table(self):
         """creates the predictions table if it doesn't exist"""
         conn = self.connect_db()
@@ -432,7 +537,7 @@ class BettensorValidator(BaseNeuron):
         conn.commit()
         conn.close()
 
-    def process_prediction(
+    async def process_prediction(
         self, processed_uids: torch.tensor, predictions: list
     ) -> list:
         """
@@ -446,33 +551,120 @@ class BettensorValidator(BaseNeuron):
         predictions_dict = {}
 
         for synapse in predictions:
-            # ensure synapse has at least 3 elements
-            if len(synapse) >= 3:
-                prediction_data = synapse[0]
-                prediction_dict: TeamGamePrediction = synapse[1]
-                metadata = synapse[2]
-
-                if metadata and hasattr(metadata, "neuron_uid"):
-                    uid = metadata.neuron_uid
-
-                    # ensure prediction_dict is not none before adding it to predictions_dict
-                    if prediction_dict is not None and any(prediction_dict.values()):
-                        predictions_dict[uid] = prediction_dict
-                    else:
-                        bt.logging.trace(
-                            f"prediction from miner {uid} is none and will be skipped."
-                        )
-                else:
-                    bt.logging.warning(
-                        "metadata is missing or does not contain neuron_uid."
-                    )
-            else:
-                bt.logging.warning(
-                    "synapse data is incomplete or not in the expected format."
+            response = self._response_predictions(synapse)
+            if response is not None:
+                uid, prediction_dict = response
+                predictions_dict[uid] = prediction_dict
+
+        await self.insert_predictions(processed_uids, predictions_dict)
+
+    async def query_and_process(self, axons, processed_uids, synapse) -> int:
+        """
+        queries the axons concurrently and ingests every response as soon as it
+        arrives, instead of waiting for the slowest miner before processing. the
+        inserts of responses that arrive together share a commit of the storage
+        writer, and each response is released once it has been ingested.
+        every miner is sent only the games it doesn't hold yet, see
+        bettensor.validator.game_data_versions
+
+        Args:
+            axons: axons to query
+            processed_uids: uids whose predictions are accepted
+            synapse: the GameData synapse with all games
+
+        Returns:
+            int: number of miners that responded with predictions
+        """
+        processed_uids = {int(uid) for uid in processed_uids}
+        sent = Counter()
+
+        async def query_and_ingest(axon):
+            request, kind = self.game_data_versions.synapse_for(axon.hotkey, synapse)
+            sent[kind] += 1
+            if self.game_data_versions.accepts_compact(axon.hotkey):
+                request.encode_compact()
+            # the dendrite doesn't raise on timeouts and errors, it returns the
+            # request with the status set
+            response = await self.dendrite.call(
+                target_axon=axon,
+                synapse=request,
+                timeout=self.timeout,
+                deserialize=False,
+            )
+            if not self._answered_by_miner(request, response):
+                # the next request carries all games, as json
+                self.game_data_versions.forget(axon.hotkey)
+                bt.logging.trace(
+                    f"No answer from miner {axon.hotkey}: {response.dendrite.status_code} {response.dendrite.status_message}"
                 )
+                return 0
+            try:
+                response = response.deserialize()
+            except ValueError:
+                self.game_data_versions.forget(axon.hotkey)
+                raise
+            self.game_data_versions.acknowledge(axon.hotkey, response[2])
+
+            response = self._response_predictions(response)
+            if response is None:
+                return 0
+            uid, prediction_dict = response
+            await self.insert_predictions(processed_uids, {uid: prediction_dict})
+            return 1
+
+        responded = 0
+        for ingested in asyncio.as_completed([query_and_ingest(axon) for axon in axons]):
+            try:
+                responded += await ingested
+            except Exception as e:
+                bt.logging.error(f"Error processing miner response: {e}")
+
+        bt.logging.debug(
+            f"Sent game data to {len(axons)} miners ({', '.join(f'{kind}: {count}' for kind, count in sent.items())})"
+        )
+        bt.logging.debug(f"Processed predictions of {responded} of {len(axons)} queried miners")
+        return responded
 
-        self.create_table()
-        self.insert_predictions(processed_uids, predictions_dict)
+    def _answered_by_miner(self, request, response) -> bool:
+        """
+        true if the response holds the answer of the miner, and not the request
+        echoed back with the metadata of this validator
+        """
+        metadata = response.metadata
+        return (
+            response.dendrite.status_code == 200
+            and metadata is not None
+            and metadata.synapse_id != request.metadata.synapse_id
+            and str(metadata.neuron_uid) != str(self.uid)
+        )
+
+    def _response_predictions(self, synapse):
+        """
+        returns the (uid, prediction_dict) of a deserialized synapse, or None if
+        it carries no predictions
+        """
+        # ensure synapse has at least 3 elements
+        if len(synapse) < 3:
+            bt.logging.warning(
+                "synapse data is incomplete or not in the expected format."
+            )
+            return None
+
+        prediction_dict: TeamGamePrediction = synapse[1]
+        metadata = synapse[2]
+
+        if not (metadata and hasattr(metadata, "neuron_uid")):
+            bt.logging.warning("metadata is missing or does not contain neuron_uid.")
+            return None
+
+        uid = metadata.neuron_uid
+
+        # ensure prediction_dict is not none before adding it to predictions_dict
+        if prediction_dict is None or not any(prediction_dict.values()):
+            bt.logging.trace(f"prediction from miner {uid} is none and will be skipped.")
+            return None
+
+        return uid, prediction_dict
 
     def add_new_miners(self):
         """
@@ -525,6 +717,30 @@ class BettensorValidator(BaseNeuron):
         self.scores = torch.zeros_like(self.metagraph.S, dtype=torch.float32)
         bt.logging.info(f"validation weights have been initialized: {self.scores}")
 
+    def decay_scores(self, uids) -> int:
+        """
+        blends the scores of the given uids towards 0 with the moving average
+        alpha, in one tensor operation. a uid listed n times is decayed n times
+
+        Returns:
+            int: number of distinct uids that were decayed
+        """
+        uids = [int(uid) for uid in uids if uid is not None]
+        if not uids:
+            return 0
+
+        alpha = float(self.neuron_config.alpha)
+        counts = torch.bincount(
+            torch.tensor(uids, dtype=torch.long), minlength=len(self.scores)
+        )[: len(self.scores)]
+        self.scores *= torch.full_like(self.scores, alpha).pow(counts)
+
+        decayed = int(torch.count_nonzero(counts))
+        bt.logging.debug(
+            f"Decayed the scores of {decayed} uids with alpha {alpha}, new total: {float(self.scores.sum()):.6f}"
+        )
+        return decayed
+
     def evaluate_miner(self, minerId):
         """evaluates the performance of a miner
 
@@ -653,93 +869,44 @@ class BettensorValidator(BaseNeuron):
 
         return []
 
+    def get_metagraph_index(self) -> MetagraphIndex:
+        """returns the index of the current metagraph, rebuilt when the blacklist changed"""
+        blacklist = tuple(self.blacklisted_miner_hotkeys or ())
+        if self.metagraph_index is None or self.metagraph_index.blacklisted_hotkeys != blacklist:
+            self.metagraph_index = MetagraphIndex.from_metagraph(self.metagraph, blacklist)
+        return self.metagraph_index
+
     def get_uids_to_query(self, all_axons) -> list:
         """returns the list of uids to query"""
+        index = self.get_metagraph_index()
 
-        # get uids with a positive stake
-        uids_with_stake = self.metagraph.total_stake >= 0.0
-        bt.logging.trace(f"uids with a positive stake: {uids_with_stake}")
-
-        # get uids with an ip address of 0.0.0.0
-        invalid_uids = torch.tensor(
-            [
-                bool(value)
-                for value in [
-                    ip != "0.0.0.0"
-                    for ip in [
-                        self.metagraph.neurons[uid].axon_info.ip
-                        for uid in self.metagraph.uids.tolist()
-                    ]
-                ]
-            ],
-            dtype=torch.bool,
-        )
-        bt.logging.trace(f"uids with 0.0.0.0 as an ip address: {invalid_uids}")
-
-        # get uids that have their hotkey blacklisted
-        blacklisted_uids = []
-        if self.blacklisted_miner_hotkeys:
-            for hotkey in self.blacklisted_miner_hotkeys:
-                if hotkey in self.metagraph.hotkeys:
-                    blacklisted_uids.append(self.metagraph.hotkeys.index(hotkey))
-                else:
-                    bt.logging.trace(
-                        f"blacklisted hotkey {hotkey} was not found from metagraph"
-                    )
-
+        for hotkey in index.unknown_blacklisted_hotkeys:
+            bt.logging.trace(f"blacklisted hotkey {hotkey} was not found from metagraph")
+        blacklisted_uids = list(index.blacklisted_uids)
+        if blacklisted_uids:
             bt.logging.debug(f"blacklisted the following uids: {blacklisted_uids}")
 
-        # convert blacklisted uids to tensor
-        blacklisted_uids_tensor = torch.tensor(
-            [uid not in blacklisted_uids for uid in self.metagraph.uids.tolist()],
-            dtype=torch.bool,
-        )
-
-        bt.logging.trace(f"blacklisted uids: {blacklisted_uids_tensor}")
-
-        # determine the uids to filter
-        uids_to_filter = torch.logical_not(
-            ~blacklisted_uids_tensor | ~invalid_uids | ~uids_with_stake
-        )
-
-        bt.logging.trace(f"uids to filter: {uids_to_filter}")
-
-        # define uids to query
-        uids_to_query = [
-            axon
-            for axon, keep_flag in zip(all_axons, uids_to_filter)
-            if keep_flag.item()
-        ]
-
-        # define uids to filter
-        final_axons_to_filter = [
-            axon
-            for axon, keep_flag in zip(all_axons, uids_to_filter)
-            if not keep_flag.item()
-        ]
-
-        uids_not_to_query = [
-            self.metagraph.hotkeys.index(axon.hotkey) for axon in final_axons_to_filter
-        ]
-
-        bt.logging.trace(f"final axons to filter: {final_axons_to_filter}")
+        # uids that serve an axon, have a positive stake and are not blacklisted
+        keep = index.queryable()
+        query_uids = np.flatnonzero(keep).tolist()
+        uids_not_to_query = np.flatnonzero(~keep).tolist()
         bt.logging.debug(f"filtered uids: {uids_not_to_query}")
 
         # reduce the number of simultaneous uids to query
         if self.max_targets < 256:
             start_idx = self.max_targets * self.target_group
             end_idx = min(
-                len(uids_to_query), self.max_targets * (self.target_group + 1)
+                len(query_uids), self.max_targets * (self.target_group + 1)
             )
             if start_idx == end_idx:
-                return [], []
-            if start_idx >= len(uids_to_query):
+                return [], [], blacklisted_uids, uids_not_to_query
+            if start_idx >= len(query_uids):
                 raise IndexError(
                     "starting index for querying the miners is out-of-bounds"
                 )
 
-            if end_idx >= len(uids_to_query):
-                end_idx = len(uids_to_query)
+            if end_idx >= len(query_uids):
+                end_idx = len(query_uids)
                 self.target_group = 0
             else:
                 self.target_group += 1
@@ -747,289 +914,178 @@ class BettensorValidator(BaseNeuron):
             bt.logging.debug(
                 f"list indices for uids to query starting from: '{start_idx}' ending with: '{end_idx}'"
             )
-            uids_to_query = uids_to_query[start_idx:end_idx]
+            query_uids = query_uids[start_idx:end_idx]
 
-        list_of_uids = [
-            self.metagraph.hotkeys.index(axon.hotkey) for axon in uids_to_query
-        ]
+        uids_to_query = [all_axons[uid] for uid in query_uids]
 
         list_of_hotkeys = [axon.hotkey for axon in uids_to_query]
 
         bt.logging.trace(f"sending query to the following hotkeys: {list_of_hotkeys}")
 
-        return uids_to_query, list_of_uids, blacklisted_uids, uids_not_to_query
+        return uids_to_query, query_uids, blacklisted_uids, uids_not_to_query
 
-    def update_game_outcome(self, game_id, numeric_outcome):
-        """updates the outcome of a game in the database"""
-        conn = self.connect_db()
-        cursor = conn.cursor()
-        try:
-            cursor.execute(
-                "UPDATE game_data SET outcome = ?, active = 0 WHERE externalId = ?",
-                (numeric_outcome, game_id),
+    async def update_game_outcomes(self, outcomes):
+        """
+        sets the outcomes of externalId -> numeric outcome and copies them to the
+        unfinished predictions of the games, in one transaction
+
+        Returns:
+            dict: externalId -> number of predictions that received the outcome
+        """
+        rows = [(outcome, external_id) for external_id, outcome in outcomes.items()]
+
+        def update(cursor):
+            cursor.executemany(
+                "UPDATE game_data SET outcome = ?, active = 0 WHERE externalId = ? AND outcome = 'Unfinished'",
+                rows,
             )
-            if cursor.rowcount == 0:
-                bt.logging.trace(f"No game updated for externalId {game_id}")
-            else:
-                bt.logging.trace(
-                    f"Updated game {game_id} with outcome: {numeric_outcome}"
-                )
-            conn.commit()
-        except Exception as e:
-            bt.logging.trace(f"Error updating game outcome: {e}")
-            conn.rollback()
-        finally:
-            conn.close()
+            return self._resolve_game_predictions(cursor, list(outcomes))
 
-    def get_recent_games(self):
-        """retrieves recent games from the database"""
-        conn = self.connect_db()
-        cursor = conn.cursor()
+        if not rows:
+            return {}
+        resolved = await self.storage.write(update)
+        game_data_cache.bump_generation(self.db_path)
+        return resolved
+
+    async def get_recent_games(self):
+        """retrieves the unfinished games that started in the last 48 hours"""
         two_days_ago = (
             datetime.utcnow().replace(tzinfo=timezone.utc) - timedelta(hours=48)
         ).isoformat()
-        cursor.execute(
-            "SELECT id, teamA, teamB, externalId FROM game_data WHERE eventStartDate >= ? AND outcome = 'Unfinished'",
-            (two_days_ago,),
-        )
-        return cursor.fetchall()
-
-    def determine_winner(self, game_info):
-        """determines the winner of a game using an external api"""
-        game_id, teamA, teamB, externalId = game_info
-
-        url = "https://api-baseball.p.rapidapi.com/games"
-        headers = {
-            "x-rapidapi-host": "api-baseball.p.rapidapi.com",
-            "x-rapidapi-key": self.rapid_api_key,
-        }
-        querystring = {"id": str(externalId)}
-
-        response = requests.get(url, headers=headers, params=querystring)
 
-        if response.status_code == 200:
-            data = response.json()
-            game_responses = data.get("response", [])
+        def select(cursor):
+            cursor.execute(
+                "SELECT externalId, sport, league, eventStartDate FROM game_data WHERE eventStartDate >= ? AND outcome = 'Unfinished'",
+                (two_days_ago,),
+            )
+            return cursor.fetchall()
 
-            if not game_responses:
-                return
+        return await self.storage.read(select)
 
-            game_response = game_responses[0]
+    async def update_recent_games(self):
+        """Updates the outcomes of recent games and corresponding predictions"""
+        recent_games = await self.get_recent_games()
+        now = datetime.now(timezone.utc)
+        due_games = await self.storage.read(
+            lambda cursor: self.outcome_polls.due_games(cursor, recent_games, now)
+        )
+        outcomes, failed = await resolve_outcomes(
+            due_games, self.outcome_resolvers, self.rapid_api_key
+        )
 
-            status = game_response["status"]["long"]
-            if status != "Finished":
-                bt.logging.trace(
-                    f"Game {externalId} is not finished yet. Current status: {status}"
+        try:
+            resolved = await self.update_game_outcomes(outcomes)
+            await self.storage.write(
+                lambda cursor: self.outcome_polls.record_polls(
+                    cursor, due_games, outcomes, now, failed
                 )
-                return
-
-            home_team = game_response["teams"]["home"]["name"]
-            away_team = game_response["teams"]["away"]["name"]
-            home_score = game_response["scores"]["home"]["total"]
-            away_score = game_response["scores"]["away"]["total"]
-            # Ensure home_score and away_score are not None
-            if home_score is None or away_score is None:
-                bt.logging.trace(f"Score data is incomplete for game {externalId}")
-                return
-
-            if home_score != None and away_score != None:
-                if home_score > away_score:
-                    numeric_outcome = 0
-                elif away_score > home_score:
-                    numeric_outcome = 1
-                else:
-                    numeric_outcome = 2
-            else:
-                numeric_outcome = 2
-                home_score = 0
-                away_score = 0
-
-            bt.logging.trace(
-                f"Game {externalId} result: {home_team} {home_score} - {away_score} {away_team}"
             )
-            bt.logging.trace(f"Numeric outcome: {numeric_outcome}")
+        except Exception as e:
+            bt.logging.error(f"Error updating game outcomes: {e}")
+            return
 
-            self.update_game_outcome(externalId, numeric_outcome)
-        else:
-            bt.logging.error(
-                f"Failed to fetch game data for {externalId}. Status code: {response.status_code}"
+        for externalId, count in resolved.items():
+            bt.logging.info(
+                f"Updated {count} predictions for game {externalId} with outcome {outcomes[externalId]}"
             )
+        bt.logging.info(
+            f"Resolved {len(outcomes)} of {len(due_games)} polled games "
+            f"({len(recent_games)} unfinished recent games), "
+            f"{sum(resolved.values())} predictions updated"
+        )
 
-    def update_recent_games(self):
-        """Updates the outcomes of recent games and corresponding predictions"""
-        recent_games = self.get_recent_games()
-
-        for game_info in recent_games:
-            game_id, teamA, teamB, externalId = game_info
-
-            self.determine_winner(game_info)
-
-            max_retries = 5
-            for attempt in range(max_retries):
-                try:
-                    conn = self.connect_db()
-                    cursor = conn.cursor()
+        await self.expire_miner_earnings()
+        bt.logging.info("Recent games and predictions update process completed")
 
-                    try:
-                        # Fetch the updated outcome from game_data
-                        cursor.execute(
-                            "SELECT outcome FROM game_data WHERE externalId = ?",
-                            (externalId,),
-                        )
-                        result = cursor.fetchone()
-
-                        if result is None:
-                            bt.logging.warning(
-                                f"No game found with externalId {externalId}"
-                            )
-                            break
-
-                        new_outcome = result[0]
-
-                        if new_outcome == "Unfinished":
-                            break
-
-                        # Update predictions table where outcome is 'Unfinished' and matches teamGameID
-                        cursor.execute(
-                            """
-                            UPDATE predictions
-                            SET outcome = ?
-                            WHERE teamGameID = ? AND outcome = 'Unfinished'
-                        """,
-                            (new_outcome, externalId),
-                        )
+    def _resolve_game_predictions(self, cursor, game_ids):
+        """
+        copies the outcomes of the finished games among game_ids to their unfinished
+        predictions and materializes their earnings
 
-                        conn.commit()
-                        bt.logging.info(
-                            f"Updated predictions for game {externalId} with outcome {new_outcome}"
-                        )
-                        break  # If successful, break the retry loop
-
-                    except sqlite3.OperationalError as e:
-                        if "database is locked" in str(e) and attempt < max_retries - 1:
-                            bt.logging.warning(
-                                f"Database locked, retrying in 1 second... (Attempt {attempt + 1})"
-                            )
-                            time.sleep(1)
-                        else:
-                            bt.logging.error(
-                                f"Error updating predictions for game {externalId}: {e}"
-                            )
-                            break
-                    except Exception as e:
-                        bt.logging.error(
-                            f"Error updating predictions for game {externalId}: {e}"
-                        )
-                        break
-                    finally:
-                        conn.close()
-
-                except Exception as e:
-                    bt.logging.error(f"Error connecting to database: {e}")
-                    if attempt < max_retries - 1:
-                        time.sleep(1)
-                    else:
-                        break
+        Returns:
+            dict: externalId -> number of predictions that received the outcome
+        """
+        # Add the earnings of the games before their predictions are resolved
+        earnings.add_resolved_game_earnings(cursor, game_ids, datetime.now(timezone.utc))
 
-        bt.logging.info("Recent games and predictions update process completed")
+        counts = {}
+        for chunk in chunks(game_ids):
+            finished = f"SELECT externalId FROM game_data WHERE externalId IN ({placeholders(chunk)}) AND outcome != 'Unfinished'"
+            cursor.execute(
+                f"""
+                SELECT teamGameID, COUNT(*) FROM predictions
+                WHERE outcome = 'Unfinished' AND teamGameID IN ({finished})
+                GROUP BY teamGameID
+                """,
+                chunk,
+            )
+            counts.update(cursor.fetchall())
+            cursor.execute(
+                f"""
+                UPDATE predictions
+                SET outcome = (SELECT g.outcome FROM game_data g WHERE g.externalId = predictions.teamGameID)
+                WHERE outcome = 'Unfinished' AND teamGameID IN ({finished})
+                """,
+                chunk,
+            )
+        return counts
 
     async def run_sync_in_async(self, fn):
-        return await self.loop.run_in_executor(self.thread_executor, fn)
+        return await asyncio.get_running_loop().run_in_executor(self.thread_executor, fn)
 
-    def calculate_miner_scores(self):
+    async def calculate_miner_scores(self):
         """
         Calculates the scores for miners based on their performance for games that started in the last 48 hours, 
         considering only predictions submitted in the last 8 days and excluding future predictions.
         All times are in UTC.
         """
-        earnings = torch.zeros_like(self.metagraph.S, dtype=torch.float32)
-
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-
+        miner_earnings = torch.zeros_like(self.metagraph.S, dtype=torch.float32)
+        hotkeys = self.metagraph.hotkeys
         now = datetime.now(timezone.utc)
-        forty_eight_hours_ago = now - timedelta(hours=48)
-        eight_days_ago = now - timedelta(days=8)
 
-        cursor.execute(
-            """
-            SELECT p.predictionID, p.teamGameID, p.minerId, p.predictedOutcome, p.outcome, 
-                p.teamA, p.teamB, p.wager, p.teamAodds, p.teamBodds, p.tieOdds, 
-                p.predictionDate, g.eventStartDate
-            FROM predictions p
-            JOIN game_data g ON p.teamGameID = g.externalId
-            WHERE p.predictionDate >= ? AND p.predictionDate <= ? AND g.eventStartDate >= ?
-            """,
-            (eight_days_ago.isoformat(), now.isoformat(), forty_eight_hours_ago.isoformat())
+        columns = await self.storage.read(
+            lambda cursor: scoring.load_prediction_window(cursor, hotkeys, now)
         )
-        prediction_rows = cursor.fetchall()
 
-        conn.close()
+        totals = scoring.compute_earnings(columns, len(hotkeys), now)
+        miner_earnings[: len(totals)] = torch.from_numpy(totals.astype(np.float32))
 
-        miner_performance = {}
-        miner_id_to_index = {miner_id: idx for idx, miner_id in enumerate(self.metagraph.hotkeys)}
+        bt.logging.trace(
+            f"Miner performance calculated from {len(columns)} predictions"
+        )
+        bt.logging.trace(miner_earnings)
 
-        for row in prediction_rows:
-            (
-                prediction_id, team_game_id, miner_id, predicted_outcome, outcome,
-                team_a, team_b, wager, team_a_odds, team_b_odds, tie_odds,
-                prediction_date, event_start_date
-            ) = row
+        return miner_earnings
 
-            try:
-                prediction_datetime = datetime.fromisoformat(prediction_date).replace(tzinfo=timezone.utc)
-                event_start_datetime = datetime.fromisoformat(event_start_date).replace(tzinfo=timezone.utc)
-            except ValueError:
-                bt.logging.warning(f"Invalid date format for prediction {prediction_id}. Skipping.")
-                continue
+    async def get_miner_earnings(self):
+        """
+        returns the miner earnings over the scoring window from the materialized
+        miner_earnings table, see calculate_miner_scores for the full rescan
+        """
+        miner_earnings = torch.zeros_like(self.metagraph.S, dtype=torch.float32)
+        hotkeys = self.metagraph.hotkeys
 
-            # Skip future predictions
-            if prediction_datetime > now:
-                bt.logging.warning(f"Future prediction date detected for prediction {prediction_id}. Skipping.")
-                continue
+        now = datetime.now(timezone.utc)
+        totals = await self.storage.read(
+            lambda cursor: earnings.load_miner_earnings(cursor, hotkeys, now)
+        )
 
-            # Ensure the prediction was made before the game started
-            if prediction_datetime >= event_start_datetime:
-                bt.logging.warning(f"Prediction {prediction_id} was made after the game started. Skipping.")
-                continue
+        miner_earnings[: len(totals)] = torch.from_numpy(totals.astype(np.float32))
+        return miner_earnings
 
-            # Check if the event started within the last 48 hours
-            if event_start_datetime < forty_eight_hours_ago:
-                bt.logging.debug(f"Game {team_game_id} started more than 48 hours ago. Skipping.")
-                continue
+    async def expire_miner_earnings(self):
+        """removes materialized earnings of games that left the scoring window"""
+        now = datetime.now(timezone.utc)
+        expired = await self.storage.write(
+            lambda cursor: earnings.expire_earnings(cursor, now)
+        )
+        bt.logging.debug(f"expired {expired} miner earnings buckets")
 
-            if miner_id not in miner_performance:
-                miner_performance[miner_id] = 0.0
-
-            if predicted_outcome == outcome:
-                if predicted_outcome == "0":
-                    earned = wager * team_a_odds
-                elif predicted_outcome == "1":
-                    earned = wager * team_b_odds
-                elif predicted_outcome.lower() == "tie":
-                    earned = wager * tie_odds
-                else:
-                    bt.logging.warning(
-                        f"Unexpected outcome {predicted_outcome} for {team_game_id}. Please notify Bettensor Developers, as this is likely a larger API issue."
-                    )
-                    continue
-                miner_performance[miner_id] += earned
-
-        for miner_id, total_earned in miner_performance.items():
-            if miner_id in miner_id_to_index:
-                idx = miner_id_to_index[miner_id]
-                earnings[idx] = total_earned
-
-        bt.logging.trace("Miner performance calculated")
-        bt.logging.trace(miner_performance)
-
-        return earnings
-        
     async def set_weights(self):
         bt.logging.info("Entering set_weights method")
-        # Calculate miner scores and normalize weights as before
-        earnings = self.calculate_miner_scores()
-        weights = torch.nn.functional.normalize(earnings, p=1.0, dim=0)
+        # Read the materialized miner earnings and normalize them into weights
+        miner_earnings = await self.get_miner_earnings()
+        weights = torch.nn.functional.normalize(miner_earnings, p=1.0, dim=0)
         bt.logging.info(f"Normalized weights: {weights}")
 
         # Check stake
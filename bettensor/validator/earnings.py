@@ -0,0 +1,126 @@
+"""
+materialized miner earnings.
+
+instead of rescanning eight days of predictions on every weight update, the
+earnings of the correct predictions of a game are added to the miner_earnings
+table when the game outcome is propagated to its predictions. rows are keyed by
+miner hotkey and game start time and are expired once the game leaves the 48
+hour scoring window, so reading the weights only aggregates the buckets of the
+games resolved in that window.
+
+the rules of bettensor.validator.scoring are applied at the time the outcome
+lands, which means the 8 day prediction window is measured from the resolution
+time rather than from the time the weights are set.
+"""
+
+from collections import defaultdict
+from datetime import datetime
+
+import numpy as np
+
+from bettensor.utils.sqlite_helpers import chunks, placeholders
+from bettensor.validator import scoring
+
+# predictions of the given games that are about to receive the outcome stored in game_data
+_RESOLVING_PREDICTIONS_QUERY = """
+    SELECT p.minerId, p.predictedOutcome, g.outcome, p.wager,
+        p.teamAodds, p.teamBodds, p.tieOdds, p.predictionDate, g.eventStartDate
+    FROM predictions p
+    JOIN game_data g ON p.teamGameID = g.externalId
+    WHERE p.teamGameID IN ({}) AND p.outcome = 'Unfinished' AND g.outcome != 'Unfinished'
+        AND p.predictionDate >= ? AND p.predictionDate <= ? AND g.eventStartDate >= ?
+"""
+
+# predictions of the scoring window that already have an outcome
+_RESOLVED_PREDICTIONS_QUERY = (
+    scoring.PREDICTION_WINDOW_QUERY + " AND p.outcome != 'Unfinished'"
+)
+
+
+def _window_params(now: datetime):
+    return (
+        (now - scoring.PREDICTION_WINDOW).isoformat(),
+        now.isoformat(),
+        (now - scoring.SCORING_WINDOW).isoformat(),
+    )
+
+
+def _add_earnings(cursor, rows, now: datetime) -> int:
+    """scores the rows and adds the earnings to the (miner, game start) buckets"""
+    if not rows:
+        return 0
+
+    miner_ids = sorted({row[0] for row in rows if row[0] is not None})
+    columns = scoring.PredictionColumns.from_rows(rows, miner_ids)
+    scored, earned = scoring.scored_predictions(columns, now)
+
+    buckets = defaultdict(float)
+    for position, amount in zip(scored.tolist(), earned.tolist()):
+        row = rows[position]
+        buckets[(row[0], row[8])] += amount
+
+    cursor.executemany(
+        """
+        INSERT INTO miner_earnings (minerId, eventStartDate, earnings) VALUES (?, ?, ?)
+        ON CONFLICT (minerId, eventStartDate) DO UPDATE SET earnings = earnings + excluded.earnings
+        """,
+        [(miner_id, start, amount) for (miner_id, start), amount in buckets.items()],
+    )
+    return len(buckets)
+
+
+def add_resolved_game_earnings(cursor, game_ids, now: datetime) -> int:
+    """
+    materializes the earnings of the given games. must run in the same transaction
+    as, and before, the update that copies the game outcome to the predictions
+
+    Returns:
+        int: number of (miner, game start) buckets that were updated
+    """
+    updated = 0
+    for chunk in chunks(game_ids):
+        cursor.execute(
+            _RESOLVING_PREDICTIONS_QUERY.format(placeholders(chunk)),
+            (*chunk, *_window_params(now)),
+        )
+        updated += _add_earnings(cursor, cursor.fetchall(), now)
+    return updated
+
+
+def expire_earnings(cursor, now: datetime) -> int:
+    """removes the buckets of games that left the scoring window"""
+    cursor.execute(
+        "DELETE FROM miner_earnings WHERE eventStartDate < ?",
+        ((now - scoring.SCORING_WINDOW).isoformat(),),
+    )
+    return cursor.rowcount
+
+
+def rebuild_earnings(cursor, now: datetime) -> int:
+    """recomputes miner_earnings from the already resolved predictions"""
+    cursor.execute("DELETE FROM miner_earnings")
+    cursor.execute(_RESOLVED_PREDICTIONS_QUERY, _window_params(now))
+    return _add_earnings(cursor, cursor.fetchall(), now)
+
+
+def load_miner_earnings(cursor, hotkeys, now: datetime) -> np.ndarray:
+    """
+    returns the earnings of every miner over the scoring window
+
+    Returns:
+        np.ndarray: float64 array of length len(hotkeys), indexed by uid
+    """
+    cursor.execute(
+        """
+        SELECT minerId, SUM(earnings) FROM miner_earnings
+        WHERE eventStartDate >= ?
+        GROUP BY minerId
+        """,
+        ((now - scoring.SCORING_WINDOW).isoformat(),),
+    )
+    miner_id_to_index = {miner_id: idx for idx, miner_id in enumerate(hotkeys)}
+    totals = np.zeros(len(hotkeys), dtype=np.float64)
+    for miner_id, total in cursor.fetchall():
+        if miner_id in miner_id_to_index:
+            totals[miner_id_to_index[miner_id]] = total
+    return totals
@@ -0,0 +1,92 @@
+"""
+per-miner game data versions.
+
+the game data only changes when SportsData refreshes the games or an outcome
+lands, yet it used to be sent in full to every miner on every step. miners that
+understand versions report the version they hold in their response metadata. the
+validator remembers it per hotkey and sends such a miner only the games that
+changed since that version, or an empty "not modified" dict if nothing changed.
+
+miners that never report a version (older miners) and miners whose version is
+no longer in the snapshot history get all games, as before.
+
+the compact wire encoding a miner advertises is tracked the same way, miners
+that don't advertise one get json.
+"""
+
+from collections import OrderedDict
+
+from bettensor.protocol import GameData
+from bettensor.utils.wire_encoding import WIRE_ENCODING_VERSION
+
+# number of past game data snapshots deltas can be computed against
+SNAPSHOT_HISTORY = 16
+
+FULL = "full"
+DELTA = "delta"
+NOT_MODIFIED = "not_modified"
+
+
+class GameDataVersions:
+    """tracks the game data version and wire encoding every miner acknowledged"""
+
+    def __init__(self, history=SNAPSHOT_HISTORY):
+        self.history = history
+        self._snapshots = OrderedDict()
+        self._acknowledged = {}
+        self._wire_encodings = {}
+
+    def synapse_for(self, hotkey, synapse: GameData):
+        """
+        returns a copy of the full game data synapse with the games the miner is
+        missing, together with FULL, DELTA or NOT_MODIFIED
+        """
+        version = synapse.metadata.gamedata_version
+        games = synapse.gamedata_dict
+        if version is None or games is None:
+            return synapse.copy(), FULL
+
+        self._remember(version, games)
+        acknowledged = self._acknowledged.get(hotkey)
+
+        if acknowledged == version:
+            kind, base_version, games = NOT_MODIFIED, version, {}
+        elif acknowledged in self._snapshots:
+            base = self._snapshots[acknowledged]
+            kind, base_version = DELTA, acknowledged
+            games = {
+                game_id: game
+                for game_id, game in games.items()
+                if base.get(game_id) != game
+            }
+        else:
+            kind, base_version = FULL, None
+
+        metadata = synapse.metadata.copy(update={"gamedata_base_version": base_version})
+        return synapse.copy(update={"metadata": metadata, "gamedata_dict": games}), kind
+
+    def accepts_compact(self, hotkey) -> bool:
+        """true if the miner advertised the compact wire encoding of this version"""
+        return (self._wire_encodings.get(hotkey) or 0) >= WIRE_ENCODING_VERSION
+
+    def acknowledge(self, hotkey, metadata):
+        """records the version and wire encoding a miner reported in its response metadata"""
+        version = getattr(metadata, "gamedata_version", None)
+        if version is None:
+            self._acknowledged.pop(hotkey, None)
+        else:
+            self._acknowledged[hotkey] = version
+        self._wire_encodings[hotkey] = getattr(metadata, "wire_encoding", None)
+
+    def forget(self, hotkey):
+        """the next request to the miner carries all games"""
+        self._acknowledged.pop(hotkey, None)
+        self._wire_encodings.pop(hotkey, None)
+
+    def _remember(self, version, games):
+        if version in self._snapshots:
+            self._snapshots.move_to_end(version)
+            return
+        self._snapshots[version] = games
+        while len(self._snapshots) > self.history:
+            self._snapshots.popitem(last=False)
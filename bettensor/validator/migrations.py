@@ -0,0 +1,261 @@
+"""
+versioned schema migrations for the validator database.
+
+the schema version of a database file is stored in PRAGMA user_version. every
+migration runs in its own transaction together with the version bump, so an
+interrupted upgrade leaves the database at the last completed version and the
+next startup continues from there. existing production databases are upgraded
+in place; migrations must never be edited once released, add a new one instead.
+"""
+
+import sqlite3
+from datetime import datetime, timedelta, timezone
+
+import bittensor as bt
+
+
+def _migration_1(cursor):
+    """tables as created by the validator and SportsData, plus hot path indexes"""
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS predictions (
+            predictionID TEXT,
+            teamGameID TEXT,
+            minerId TEXT,
+            predictionDate TEXT,
+            predictedOutcome TEXT,
+            teamA TEXT,
+            teamB TEXT,
+            wager REAL,
+            teamAodds REAL,
+            teamBodds REAL,
+            tieOdds REAL,
+            canOverwrite BOOLEAN,
+            outcome TEXT,
+            sent_to_site INTEGER DEFAULT 0
+        )
+        """
+    )
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS game_data (
+            id TEXT PRIMARY KEY,
+            teamA TEXT,
+            teamB TEXT,
+            sport TEXT,
+            league TEXT,
+            externalId TEXT,
+            createDate TEXT,
+            lastUpdateDate TEXT,
+            eventStartDate TEXT,
+            active INTEGER,
+            outcome TEXT,
+            teamAodds REAL,
+            teamBodds REAL,
+            tieOdds REAL,
+            canTie BOOLEAN
+        )
+        """
+    )
+
+    # older databases can hold duplicated prediction ids, keep the first copy
+    cursor.execute(
+        """
+        DELETE FROM predictions
+        WHERE rowid NOT IN (SELECT MIN(rowid) FROM predictions GROUP BY predictionID)
+        """
+    )
+    if cursor.rowcount > 0:
+        bt.logging.info(f"removed {cursor.rowcount} duplicated predictions")
+
+    # insert_predictions: duplicate check
+    cursor.execute(
+        "CREATE UNIQUE INDEX IF NOT EXISTS idx_predictions_prediction_id ON predictions (predictionID)"
+    )
+    # update_recent_games: outcome propagation per game
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_predictions_game_outcome ON predictions (teamGameID, outcome)"
+    )
+    # insert_predictions: daily wager total per miner (covering)
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_predictions_miner_date ON predictions (minerId, predictionDate, wager)"
+    )
+    # calculate_miner_scores: prediction window
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_predictions_date ON predictions (predictionDate)"
+    )
+    # fetch_predictions_from_db: predictions not yet sent to the website
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_predictions_unsent ON predictions (sent_to_site) WHERE sent_to_site = 0"
+    )
+    # insert_predictions, update_game_outcome, calculate_miner_scores: game lookups
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_game_data_external_id ON game_data (externalId)"
+    )
+    # GameData.fetch_game_data: game window
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_game_data_start ON game_data (eventStartDate)"
+    )
+    # get_recent_games: unfinished games of the last 48 hours
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_game_data_outcome_start ON game_data (outcome, eventStartDate)"
+    )
+
+
+def _migration_2(cursor):
+    """materialized earnings per miner and game start, see bettensor.validator.earnings"""
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS miner_earnings (
+            minerId TEXT NOT NULL,
+            eventStartDate TEXT NOT NULL,
+            earnings REAL NOT NULL DEFAULT 0,
+            PRIMARY KEY (minerId, eventStartDate)
+        )
+        """
+    )
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_miner_earnings_start ON miner_earnings (eventStartDate)"
+    )
+
+    # backfill with the scoring rules as released with this migration: correct
+    # predictions of games that started within 48 hours, made in the last 8 days
+    # and before the game started, earn wager * odds of the predicted outcome.
+    # dates are compared at their wall clock time
+    now = datetime.now(timezone.utc)
+    window_start = now - timedelta(hours=48)
+    cursor.execute(
+        """
+        INSERT INTO miner_earnings (minerId, eventStartDate, earnings)
+        SELECT minerId, eventStartDate, SUM(earned) FROM (
+            SELECT p.minerId, g.eventStartDate,
+                p.wager * CASE p.predictedOutcome
+                    WHEN '0' THEN p.teamAodds
+                    WHEN '1' THEN p.teamBodds
+                    ELSE p.tieOdds
+                END AS earned,
+                julianday(substr(p.predictionDate, 1, 19)) AS predicted_at,
+                julianday(substr(g.eventStartDate, 1, 19)) AS starts_at
+            FROM predictions p
+            JOIN game_data g ON p.teamGameID = g.externalId
+            WHERE p.predictionDate >= ? AND p.predictionDate <= ? AND g.eventStartDate >= ?
+                AND p.outcome != 'Unfinished'
+                AND p.minerId IS NOT NULL
+                AND p.predictedOutcome = p.outcome
+                AND (p.predictedOutcome IN ('0', '1') OR lower(p.predictedOutcome) = 'tie')
+        )
+        WHERE earned IS NOT NULL
+            AND predicted_at < starts_at
+            AND predicted_at <= julianday(?)
+            AND starts_at >= julianday(?)
+        GROUP BY minerId, eventStartDate
+        """,
+        (
+            (now - timedelta(days=8)).isoformat(),
+            now.isoformat(),
+            window_start.isoformat(),
+            now.strftime("%Y-%m-%dT%H:%M:%S"),
+            window_start.strftime("%Y-%m-%dT%H:%M:%S"),
+        ),
+    )
+    bt.logging.info(f"materialized {cursor.rowcount} miner earnings buckets")
+
+
+def _migration_3(cursor):
+    """unique game_data.externalId, SportsData upserts games on it"""
+    # keep one row per game: the first one with an outcome, else the first one
+    cursor.execute(
+        """
+        DELETE FROM game_data WHERE rowid IN (
+            SELECT rowid FROM (
+                SELECT rowid, ROW_NUMBER() OVER (
+                    PARTITION BY externalId ORDER BY outcome = 'Unfinished', rowid
+                ) AS position
+                FROM game_data
+                WHERE externalId IS NOT NULL
+            )
+            WHERE position > 1
+        )
+        """
+    )
+    if cursor.rowcount > 0:
+        bt.logging.info(f"removed {cursor.rowcount} duplicated games")
+
+    cursor.execute("DROP INDEX IF EXISTS idx_game_data_external_id")
+    cursor.execute(
+        "CREATE UNIQUE INDEX idx_game_data_external_id ON game_data (externalId)"
+    )
+
+
+def _migration_4(cursor):
+    """poll state of unfinished games, see bettensor.validator.outcome_polling"""
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS outcome_polls (
+            externalId TEXT PRIMARY KEY,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            lastPollDate TEXT,
+            nextPollDate TEXT,
+            gaveUp INTEGER NOT NULL DEFAULT 0
+        )
+        """
+    )
+
+
+# ordered list of (version, description, migration)
+MIGRATIONS = [
+    (1, "create tables and hot path indexes", _migration_1),
+    (2, "materialized miner earnings", _migration_2),
+    (3, "unique game external ids", _migration_3),
+    (4, "outcome poll state", _migration_4),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+def get_schema_version(conn) -> int:
+    """returns the schema version stored in the database file"""
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(db_path) -> int:
+    """
+    upgrades the database at db_path to the latest schema version
+
+    Args:
+        db_path: path to the validator database
+
+    Returns:
+        int: the schema version of the database after the upgrade
+    """
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    try:
+        version = get_schema_version(conn)
+        if version > LATEST_VERSION:
+            bt.logging.warning(
+                f"database {db_path} has schema version {version}, newer than the supported version {LATEST_VERSION}. skipping migrations"
+            )
+            return version
+
+        for target_version, description, migration in MIGRATIONS:
+            if target_version <= version:
+                continue
+
+            bt.logging.info(
+                f"migrating {db_path} to schema version {target_version}: {description}"
+            )
+            cursor = conn.cursor()
+            cursor.execute("BEGIN IMMEDIATE")
+            try:
+                migration(cursor)
+                cursor.execute(f"PRAGMA user_version = {int(target_version)}")
+                cursor.execute("COMMIT")
+            except Exception:
+                cursor.execute("ROLLBACK")
+                raise
+            version = target_version
+
+        conn.execute("PRAGMA optimize")
+        return version
+    finally:
+        conn.close()
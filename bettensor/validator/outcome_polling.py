@@ -0,0 +1,178 @@
+"""
+scheduling of the outcome polls of unfinished games.
+
+a game is first polled once it could plausibly be over, i.e. after the expected
+duration of its sport or league. every poll that does not find a result doubles
+the interval to the next poll, up to MAX_INTERVAL. after MAX_ATTEMPTS polls the
+game is given up on and flagged in the log, it is no longer polled.
+
+polls whose results could not be fetched, e.g. during an api outage, are not
+counted as attempts, the games stay due.
+
+the state lives in the outcome_polls table, so restarts don't reset the backoff.
+rows of games that got an outcome or left the 48 hour window are dropped.
+"""
+
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Set
+
+import bittensor as bt
+from dateutil import parser
+
+from bettensor.utils.sqlite_helpers import chunks, placeholders
+
+# typical time from kickoff until a result is available
+EXPECTED_DURATIONS = {
+    "baseball": timedelta(hours=3),
+    "soccer": timedelta(minutes=115),
+}
+# leagues with knockout games that can go to extra time and penalties
+LEAGUE_DURATIONS = {
+    ("soccer", "4"): timedelta(minutes=150),  # Euro Cup
+    ("soccer", "9"): timedelta(minutes=150),  # Copa America
+    ("soccer", "480"): timedelta(minutes=150),  # Olympics mens
+    ("soccer", "524"): timedelta(minutes=150),  # Olympics womens
+}
+DEFAULT_DURATION = timedelta(hours=3)
+
+BASE_INTERVAL = timedelta(minutes=15)
+MAX_INTERVAL = timedelta(hours=4)
+MAX_ATTEMPTS = 10
+
+# games that started before this are no longer resolved, see get_recent_games
+WINDOW = timedelta(hours=48)
+
+
+class OutcomePollScheduler:
+    """decides which unfinished games are worth polling for their outcome"""
+
+    def __init__(
+        self,
+        durations=EXPECTED_DURATIONS,
+        league_durations=LEAGUE_DURATIONS,
+        base_interval=BASE_INTERVAL,
+        max_interval=MAX_INTERVAL,
+        max_attempts=MAX_ATTEMPTS,
+    ):
+        self.durations = durations
+        self.league_durations = league_durations
+        self.base_interval = base_interval
+        self.max_interval = max_interval
+        self.max_attempts = max_attempts
+
+    def expected_duration(self, sport, league) -> timedelta:
+        duration = self.league_durations.get((sport, str(league)))
+        if duration is None:
+            duration = self.durations.get(sport, DEFAULT_DURATION)
+        return duration
+
+    def interval(self, attempts) -> timedelta:
+        """time to the next poll after the given number of unsuccessful polls"""
+        return min(self.base_interval * 2 ** max(attempts - 1, 0), self.max_interval)
+
+    def due_games(self, cursor, games, now: datetime):
+        """
+        returns the games that should be polled now
+
+        Args:
+            cursor: database cursor
+            games: (externalId, sport, league, eventStartDate) tuples
+            now: current time, timezone aware
+        """
+        state = {}
+        external_ids = [str(game[0]) for game in games]
+        for chunk in chunks(external_ids):
+            cursor.execute(
+                f"SELECT externalId, nextPollDate, gaveUp FROM outcome_polls WHERE externalId IN ({placeholders(chunk)})",
+                chunk,
+            )
+            state.update((row[0], row[1:]) for row in cursor.fetchall())
+
+        due = []
+        for game in games:
+            external_id, sport, league, start = game
+            try:
+                start = parser.isoparse(start)
+            except (TypeError, ValueError):
+                # let the resolver report the invalid date
+                due.append(game)
+                continue
+            if start.tzinfo is None:
+                start = start.replace(tzinfo=timezone.utc)
+            if now < start + self.expected_duration(sport, league):
+                continue
+
+            next_poll, gave_up = state.get(str(external_id), (None, 0))
+            if gave_up or (next_poll is not None and now.isoformat() < next_poll):
+                continue
+            due.append(game)
+        return due
+
+    def record_polls(
+        self, cursor, polled, outcomes: Dict[str, int], now: datetime, failed: Set[str] = frozenset()
+    ):
+        """
+        updates the poll state after polling, must run in a write transaction
+
+        Args:
+            cursor: database cursor
+            polled: the games that were polled, as returned by due_games
+            outcomes: externalId -> outcome of the polled games that were resolved
+            now: time of the poll
+            failed: externalIds of the polled games whose results could not be
+                fetched, they are not counted as attempts
+        """
+        unresolved = [
+            str(game[0])
+            for game in polled
+            if str(game[0]) not in outcomes and str(game[0]) not in failed
+        ]
+        attempts = {}
+        for chunk in chunks(unresolved):
+            cursor.execute(
+                f"SELECT externalId, attempts FROM outcome_polls WHERE externalId IN ({placeholders(chunk)})",
+                chunk,
+            )
+            attempts.update(cursor.fetchall())
+
+        rows = []
+        for external_id in unresolved:
+            count = attempts.get(external_id, 0) + 1
+            gave_up = count >= self.max_attempts
+            if gave_up:
+                bt.logging.warning(
+                    f"Giving up on the outcome of game {external_id} after {count} polls"
+                )
+            rows.append(
+                (
+                    external_id,
+                    count,
+                    now.isoformat(),
+                    (now + self.interval(count)).isoformat(),
+                    int(gave_up),
+                )
+            )
+        cursor.executemany(
+            """
+            INSERT INTO outcome_polls (externalId, attempts, lastPollDate, nextPollDate, gaveUp)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT (externalId) DO UPDATE SET
+                attempts = excluded.attempts,
+                lastPollDate = excluded.lastPollDate,
+                nextPollDate = excluded.nextPollDate,
+                gaveUp = excluded.gaveUp
+            """,
+            rows,
+        )
+
+        # resolved games and games that left the window are not polled anymore
+        cursor.execute(
+            """
+            DELETE FROM outcome_polls WHERE NOT EXISTS (
+                SELECT 1 FROM game_data g
+                WHERE g.externalId = outcome_polls.externalId
+                    AND g.outcome = 'Unfinished' AND g.eventStartDate >= ?
+            )
+            """,
+            ((now - WINDOW).isoformat(),),
+        )
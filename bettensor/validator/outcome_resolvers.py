@@ -0,0 +1,194 @@
+"""
+outcome resolvers per sport.
+
+instead of asking the api about every unfinished game on its own, a resolver
+fetches the results of all games of a sport played on a date in one call and
+the games are matched to game_data in memory by externalId. dates are utc
+dates, the api is asked for the same timezone.
+
+a resolver only reports games that are over, as numeric outcomes: 0 home team
+won, 1 away team won, 2 tie. new sports are supported by adding a resolver to
+default_resolvers.
+"""
+
+import asyncio
+from abc import ABC, abstractmethod
+from collections import defaultdict
+from datetime import timezone
+from typing import Dict, Set, Tuple
+
+import aiohttp
+import bittensor as bt
+from dateutil import parser
+
+from bettensor.utils.sports_data import API_HOSTS, api_base_url
+
+REQUEST_TIMEOUT_SECONDS = 30
+
+
+def numeric_outcome(home_score, away_score) -> int:
+    if home_score > away_score:
+        return 0
+    if away_score > home_score:
+        return 1
+    return 2
+
+
+class OutcomeResolver(ABC):
+    """resolves the outcomes of the games of one sport"""
+
+    sport = None
+    api_host = None
+    path = None
+
+    def __init__(self, base_url=None):
+        # see bettensor.utils.sports_data.API_BASE_URL_ENV
+        self.base_url = base_url
+
+    def request_key(self, league, start) -> str:
+        """games with the same key are resolved by the same api call"""
+        return start.astimezone(timezone.utc).date().isoformat()
+
+    def querystring(self, key) -> dict:
+        return {"date": key, "timezone": "UTC"}
+
+    async def fetch(self, session, key) -> dict:
+        """returns the decoded api response for a request key"""
+        url = f"{api_base_url(self.api_host, self.base_url)}{self.path}"
+        headers = {"X-RapidAPI-Host": self.api_host}
+        async with session.get(url, headers=headers, params=self.querystring(key)) as response:
+            response.raise_for_status()
+            return await response.json(content_type=None)
+
+    @abstractmethod
+    def outcomes(self, data) -> Dict[str, int]:
+        """returns externalId -> numeric outcome of the finished games of a response"""
+
+
+class BaseballOutcomeResolver(OutcomeResolver):
+    sport = "baseball"
+    api_host = API_HOSTS["baseball"]
+    path = "/games"
+
+    def outcomes(self, data):
+        outcomes = {}
+        for game in data.get("response", []):
+            if game["status"]["long"] != "Finished":
+                continue
+            home_score = game["scores"]["home"]["total"]
+            away_score = game["scores"]["away"]["total"]
+            if home_score is None or away_score is None:
+                bt.logging.trace(f"Score data is incomplete for game {game['id']}")
+                continue
+            outcomes[str(game["id"])] = numeric_outcome(home_score, away_score)
+        return outcomes
+
+
+class SoccerOutcomeResolver(OutcomeResolver):
+    sport = "soccer"
+    api_host = API_HOSTS["soccer"]
+    path = "/v3/fixtures"
+    # finished in regular time, after extra time, after penalties
+    finished_statuses = ("FT", "AET", "PEN")
+
+    def querystring(self, key):
+        return {
+            "date": key,
+            "timezone": "UTC",
+            "status": "-".join(self.finished_statuses),
+        }
+
+    def outcomes(self, data):
+        outcomes = {}
+        for fixture in data.get("response", []):
+            if fixture["fixture"]["status"]["short"] not in self.finished_statuses:
+                continue
+            # match winner odds settle on the score after regular time
+            fulltime = fixture["score"]["fulltime"]
+            if fulltime["home"] is None or fulltime["away"] is None:
+                bt.logging.trace(f"Score data is incomplete for game {fixture['fixture']['id']}")
+                continue
+            outcomes[str(fixture["fixture"]["id"])] = numeric_outcome(
+                fulltime["home"], fulltime["away"]
+            )
+        return outcomes
+
+
+def default_resolvers(base_url=None) -> Dict[str, OutcomeResolver]:
+    return {
+        resolver.sport: resolver
+        for resolver in (
+            BaseballOutcomeResolver(base_url),
+            SoccerOutcomeResolver(base_url),
+        )
+    }
+
+
+async def resolve_outcomes(games, resolvers, api_key) -> Tuple[Dict[str, int], Set[str]]:
+    """
+    fetches the results of the given games, one api call per sport and request key
+
+    Args:
+        games: (externalId, sport, league, eventStartDate) tuples
+        resolvers: sport -> OutcomeResolver
+        api_key: RapidAPI key
+
+    Returns:
+        tuple: (outcomes, failed) where outcomes is externalId -> numeric outcome
+        of the games that are over, and failed the externalIds of the games whose
+        results could not be fetched
+    """
+    groups = defaultdict(set)
+    for external_id, sport, league, start in games:
+        resolver = resolvers.get(sport)
+        if resolver is None:
+            bt.logging.trace(f"No outcome resolver for sport {sport}, game {external_id}")
+            continue
+        try:
+            key = resolver.request_key(league, parser.isoparse(start))
+        except (TypeError, ValueError) as e:
+            bt.logging.warning(f"Invalid start date of game {external_id}: {e}")
+            continue
+        groups[(sport, key)].add(str(external_id))
+    if not groups:
+        return {}, set()
+
+    async def resolve(session, sport, key):
+        resolver = resolvers[sport]
+        try:
+            data = await resolver.fetch(session, key)
+            # the api answers errors like a missing key with status 200
+            if isinstance(data, dict) and data.get("errors"):
+                raise ValueError(f"api errors: {data['errors']}")
+            return resolver.outcomes(data)
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+            bt.logging.error(f"Failed to fetch {sport} results of {key}: {e!r}")
+        except (KeyError, TypeError) as e:
+            bt.logging.error(f"Unexpected {sport} results format for {key}: {e!r}")
+        return None
+
+    headers = {"X-RapidAPI-Key": api_key} if api_key else None
+    async with aiohttp.ClientSession(
+        headers=headers,
+        timeout=aiohttp.ClientTimeout(total=REQUEST_TIMEOUT_SECONDS),
+    ) as session:
+        results = await asyncio.gather(
+            *(resolve(session, sport, key) for sport, key in groups)
+        )
+
+    outcomes = {}
+    failed = set()
+    for external_ids, result in zip(groups.values(), results):
+        if result is None:
+            failed.update(external_ids)
+            continue
+        outcomes.update(
+            (external_id, result[external_id])
+            for external_id in external_ids
+            if external_id in result
+        )
+    bt.logging.debug(
+        f"Resolved {len(outcomes)} of {len(games)} games with {len(groups)} api calls, "
+        f"{len(failed)} games not fetched"
+    )
+    return outcomes, failed
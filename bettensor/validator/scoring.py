@@ -0,0 +1,237 @@
+"""
+columnar scoring engine for the validator.
+
+the scoring window is loaded into numpy arrays once, the time window and
+validity rules of calculate_miner_scores are applied as boolean masks and the
+earnings per miner are summed with a single bincount. the rules are the same as
+the row-by-row implementation it replaces:
+
+- predictions with an unparsable prediction or game start date are skipped
+- predictions dated in the future are skipped
+- predictions made at or after the game start are skipped
+- games that started more than 48 hours ago are skipped
+- a correct prediction earns wager * odds of the predicted outcome, where the
+  predicted outcome is "0" (team a), "1" (team b) or "tie" (any casing)
+"""
+
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+
+import bittensor as bt
+import numpy as np
+
+SCORING_WINDOW = timedelta(hours=48)
+PREDICTION_WINDOW = timedelta(days=8)
+
+PREDICTION_WINDOW_QUERY = """
+    SELECT p.minerId, p.predictedOutcome, p.outcome, p.wager,
+        p.teamAodds, p.teamBodds, p.tieOdds, p.predictionDate, g.eventStartDate
+    FROM predictions p
+    JOIN game_data g ON p.teamGameID = g.externalId
+    WHERE p.predictionDate >= ? AND p.predictionDate <= ? AND g.eventStartDate >= ?
+"""
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_MICROSECOND = timedelta(microseconds=1)
+_INVALID_TIME = np.iinfo(np.int64).min
+
+# predicted outcome kinds, used as column index into the odds matrix
+TEAM_A = 0
+TEAM_B = 1
+TIE = 2
+INVALID_OUTCOME = -1
+
+
+def to_microseconds(value: datetime) -> int:
+    """converts an aware datetime to microseconds since the epoch"""
+    return (value - _EPOCH) // _MICROSECOND
+
+
+def _parse_timestamps(values) -> np.ndarray:
+    """
+    parses iso timestamps the way the row based scoring did, i.e. the wall clock
+    time is taken as utc. every distinct string is parsed once. unparsable values
+    are returned as _INVALID_TIME
+    """
+    parsed = {}
+    for value in set(values):
+        try:
+            parsed[value] = to_microseconds(
+                datetime.fromisoformat(value).replace(tzinfo=timezone.utc)
+            )
+        except (TypeError, ValueError):
+            parsed[value] = _INVALID_TIME
+    return _encode(values, parsed)
+
+
+def _encode(values, mapping) -> np.ndarray:
+    """maps every value through `mapping` into an int64 array"""
+    return np.fromiter(map(mapping.__getitem__, values), dtype=np.int64, count=len(values))
+
+
+def _outcome_kind(value) -> int:
+    if value == "0":
+        return TEAM_A
+    if value == "1":
+        return TEAM_B
+    if isinstance(value, str) and value.lower() == "tie":
+        return TIE
+    return INVALID_OUTCOME
+
+
+def _to_float(values) -> np.ndarray:
+    return np.array(values, dtype=np.float64)
+
+
+@dataclass
+class PredictionColumns:
+    """the scoring window in columnar form, one entry per prediction"""
+
+    miner_index: np.ndarray  # uid of the miner, -1 if the hotkey is not in the metagraph
+    predicted_kind: np.ndarray  # TEAM_A, TEAM_B, TIE or INVALID_OUTCOME
+    correct: np.ndarray  # predicted outcome equals the stored outcome
+    wager: np.ndarray
+    odds: np.ndarray  # shape (n, 3): team a, team b and tie odds
+    prediction_time: np.ndarray  # microseconds since the epoch
+    event_start_time: np.ndarray  # microseconds since the epoch
+
+    def __len__(self):
+        return len(self.miner_index)
+
+    @classmethod
+    def from_rows(cls, rows, hotkeys) -> "PredictionColumns":
+        """
+        builds the columns from rows selected with PREDICTION_WINDOW_QUERY
+
+        Args:
+            rows: list of (minerId, predictedOutcome, outcome, wager, teamAodds,
+                teamBodds, tieOdds, predictionDate, eventStartDate) tuples
+            hotkeys: hotkeys of the metagraph, the position is the uid
+        """
+        if not rows:
+            return cls.empty()
+
+        def column(i):
+            return [row[i] for row in rows]
+
+        miner_id_to_index = {miner_id: idx for idx, miner_id in enumerate(hotkeys)}
+        miner_ids = column(0)
+        miner_index = _encode(
+            miner_ids,
+            {miner_id: miner_id_to_index.get(miner_id, -1) for miner_id in set(miner_ids)},
+        )
+
+        # dictionary encode both outcome columns into one code space, so that
+        # comparing codes is the same as comparing the original values
+        predicted = column(1)
+        outcomes = column(2)
+        codes = {value: code for code, value in enumerate(set(predicted) | set(outcomes))}
+        predicted_codes = _encode(predicted, codes)
+        outcome_codes = _encode(outcomes, codes)
+        kind_by_code = np.empty(len(codes), dtype=np.int64)
+        for value, code in codes.items():
+            kind_by_code[code] = _outcome_kind(value)
+
+        return cls(
+            miner_index=miner_index,
+            predicted_kind=kind_by_code[predicted_codes],
+            correct=predicted_codes == outcome_codes,
+            wager=_to_float(column(3)),
+            odds=np.column_stack(
+                (_to_float(column(4)), _to_float(column(5)), _to_float(column(6)))
+            ),
+            prediction_time=_parse_timestamps(column(7)),
+            event_start_time=_parse_timestamps(column(8)),
+        )
+
+    @classmethod
+    def empty(cls) -> "PredictionColumns":
+        return cls(
+            miner_index=np.empty(0, dtype=np.int64),
+            predicted_kind=np.empty(0, dtype=np.int64),
+            correct=np.empty(0, dtype=bool),
+            wager=np.empty(0, dtype=np.float64),
+            odds=np.empty((0, 3), dtype=np.float64),
+            prediction_time=np.empty(0, dtype=np.int64),
+            event_start_time=np.empty(0, dtype=np.int64),
+        )
+
+
+def load_prediction_window(cursor, hotkeys, now: datetime) -> PredictionColumns:
+    """loads the predictions relevant for scoring at `now` into columns"""
+    cursor.execute(
+        PREDICTION_WINDOW_QUERY,
+        (
+            (now - PREDICTION_WINDOW).isoformat(),
+            now.isoformat(),
+            (now - SCORING_WINDOW).isoformat(),
+        ),
+    )
+    return PredictionColumns.from_rows(cursor.fetchall(), hotkeys)
+
+
+def scoring_mask(columns: PredictionColumns, now: datetime) -> np.ndarray:
+    """returns the mask of predictions that count towards the miner earnings"""
+    now_us = to_microseconds(now)
+    window_start_us = to_microseconds(now - SCORING_WINDOW)
+
+    valid_dates = (columns.prediction_time != _INVALID_TIME) & (
+        columns.event_start_time != _INVALID_TIME
+    )
+    future = valid_dates & (columns.prediction_time > now_us)
+    after_start = valid_dates & ~future & (
+        columns.prediction_time >= columns.event_start_time
+    )
+    in_window = valid_dates & ~future & ~after_start & (
+        columns.event_start_time >= window_start_us
+    )
+    unexpected = in_window & columns.correct & (columns.predicted_kind == INVALID_OUTCOME)
+
+    skipped = {
+        "invalid date": int(np.count_nonzero(~valid_dates)),
+        "future prediction date": int(np.count_nonzero(future)),
+        "made after the game started": int(np.count_nonzero(after_start)),
+        "unexpected outcome": int(np.count_nonzero(unexpected)),
+    }
+    if any(skipped.values()):
+        bt.logging.warning(
+            "skipped predictions while scoring: "
+            + ", ".join(f"{reason}: {count}" for reason, count in skipped.items() if count)
+        )
+
+    return (
+        in_window
+        & columns.correct
+        & (columns.predicted_kind != INVALID_OUTCOME)
+        & (columns.miner_index >= 0)
+    )
+
+
+def scored_predictions(columns: PredictionColumns, now: datetime):
+    """
+    returns the positions of the predictions that earn something at `now`
+    together with the amount each of them earned
+    """
+    rows = np.flatnonzero(scoring_mask(columns, now))
+    earned = columns.wager[rows] * columns.odds[rows, columns.predicted_kind[rows]]
+
+    # rows with missing wager or odds can't be scored
+    finite = np.isfinite(earned)
+    if not finite.all():
+        bt.logging.warning(
+            f"skipped {np.count_nonzero(~finite)} correct predictions with missing wager or odds"
+        )
+        rows, earned = rows[finite], earned[finite]
+
+    return rows, earned
+
+
+def compute_earnings(columns: PredictionColumns, num_miners: int, now: datetime) -> np.ndarray:
+    """
+    computes the earnings of every miner over the scoring window
+
+    Returns:
+        np.ndarray: float64 array of length num_miners, indexed by uid
+    """
+    rows, earned = scored_predictions(columns, now)
+    return np.bincount(columns.miner_index[rows], weights=earned, minlength=num_miners)
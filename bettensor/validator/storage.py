@@ -0,0 +1,210 @@
+"""
+storage layer of the validator database.
+
+all writes go through a single long-lived connection owned by a dedicated writer
+thread. jobs are queued and the writer drains the queue into one transaction, so
+a burst of writes costs a single commit (group commit). every job runs inside its
+own savepoint, a failing job is rolled back without affecting the other jobs of
+the same commit.
+
+reads run on a small pool of read connections. the database is in WAL mode, so
+readers never block the writer and always see the last committed state. every
+connection keeps a cache of prepared statements.
+
+the async methods never block the event loop, the *_sync variants are meant for
+code that already runs in a worker thread.
+"""
+
+import asyncio
+import concurrent.futures
+import queue
+import sqlite3
+import threading
+
+import bittensor as bt
+
+# wait this long for locks held by other processes, e.g. SportsData or the website handler
+BUSY_TIMEOUT_MS = 30_000
+CACHED_STATEMENTS = 256
+
+
+def _configure(conn, query_only=False):
+    conn.execute(f"PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}")
+    conn.execute("PRAGMA synchronous = NORMAL")
+    conn.execute("PRAGMA foreign_keys = ON")
+    if query_only:
+        conn.execute("PRAGMA query_only = ON")
+    return conn
+
+
+class ValidatorStorage:
+    """single writer, multiple reader access to the validator database"""
+
+    def __init__(self, db_path, read_connections=4, max_batch=256):
+        self.db_path = db_path
+        self.max_batch = max_batch
+        self.commits = 0
+        self.committed_jobs = 0
+
+        self._jobs = queue.SimpleQueue()
+        self._closed = False
+        self._close_lock = threading.Lock()
+
+        # connections are opened in the threads that use them
+        self._read_local = threading.local()
+        self._read_conns = []
+        self._read_conns_lock = threading.Lock()
+        self._read_executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=read_connections, thread_name_prefix="db-read"
+        )
+
+        writer_ready = concurrent.futures.Future()
+        self._writer = threading.Thread(
+            target=self._write_loop, args=(writer_ready,), name="db-writer", daemon=True
+        )
+        self._writer.start()
+        # surface errors opening the database to the caller
+        writer_ready.result()
+
+    def _connect(self, **kwargs):
+        return sqlite3.connect(
+            self.db_path,
+            isolation_level=None,
+            check_same_thread=False,
+            cached_statements=CACHED_STATEMENTS,
+            **kwargs,
+        )
+
+    # writes
+
+    def submit_write(self, fn) -> concurrent.futures.Future:
+        """
+        queues fn(cursor) for the writer thread
+
+        Returns:
+            concurrent.futures.Future: resolves to the return value of fn once its
+            transaction is committed
+        """
+        if self._closed:
+            raise RuntimeError(f"storage of {self.db_path} is closed")
+        future = concurrent.futures.Future()
+        self._jobs.put((fn, future))
+        return future
+
+    async def write(self, fn):
+        """runs fn(cursor) on the writer connection and waits for the commit"""
+        return await asyncio.wrap_future(self.submit_write(fn))
+
+    def write_sync(self, fn):
+        """blocking variant of write, for code running in worker threads"""
+        return self.submit_write(fn).result()
+
+    def _write_loop(self, ready):
+        try:
+            conn = _configure(self._connect())
+            mode = conn.execute("PRAGMA journal_mode = WAL").fetchone()[0]
+            if mode != "wal":
+                bt.logging.warning(f"{self.db_path} is in {mode} journal mode, not WAL")
+        except Exception as e:
+            ready.set_exception(e)
+            return
+        ready.set_result(None)
+
+        try:
+            while True:
+                job = self._jobs.get()
+                if job is None:
+                    break
+
+                # group every job that is already queued into the same commit
+                batch = [job]
+                stop = False
+                while len(batch) < self.max_batch:
+                    try:
+                        job = self._jobs.get_nowait()
+                    except queue.Empty:
+                        break
+                    if job is None:
+                        stop = True
+                        break
+                    batch.append(job)
+
+                self._commit_batch(conn, batch)
+                if stop:
+                    break
+        finally:
+            conn.close()
+
+    def _commit_batch(self, conn, batch):
+        cursor = conn.cursor()
+        results = []
+        try:
+            cursor.execute("BEGIN IMMEDIATE")
+            for fn, future in batch:
+                if not future.set_running_or_notify_cancel():
+                    continue
+                cursor.execute("SAVEPOINT job")
+                try:
+                    results.append((future, fn(cursor)))
+                    cursor.execute("RELEASE job")
+                except Exception as e:
+                    cursor.execute("ROLLBACK TO job")
+                    cursor.execute("RELEASE job")
+                    future.set_exception(e)
+            cursor.execute("COMMIT")
+        except Exception as e:
+            bt.logging.error(f"group commit of {len(batch)} writes failed: {e}")
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            for fn, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        finally:
+            cursor.close()
+
+        self.commits += 1
+        self.committed_jobs += len(results)
+        for future, result in results:
+            future.set_result(result)
+
+    # reads
+
+    def _read_connection(self):
+        conn = getattr(self._read_local, "conn", None)
+        if conn is None:
+            conn = _configure(self._connect(), query_only=True)
+            self._read_local.conn = conn
+            with self._read_conns_lock:
+                self._read_conns.append(conn)
+        return conn
+
+    def _run_read(self, fn):
+        cursor = self._read_connection().cursor()
+        try:
+            return fn(cursor)
+        finally:
+            cursor.close()
+
+    async def read(self, fn):
+        """runs fn(cursor) on one of the read connections"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._read_executor, self._run_read, fn)
+
+    def read_sync(self, fn):
+        """blocking variant of read, for code running in worker threads"""
+        return self._read_executor.submit(self._run_read, fn).result()
+
+    def close(self):
+        """waits for the queued writes and closes all connections"""
+        with self._close_lock:
+            if self._closed:
+                return
+            self._closed = True
+        self._jobs.put(None)
+        self._writer.join()
+        self._read_executor.shutdown(wait=True)
+        with self._read_conns_lock:
+            for conn in self._read_conns:
+                conn.close()
+            self._read_conns.clear()
@@ -59,11 +59,12 @@ def main(miner: BettensorMiner):
     axon = bt.axon(wallet=miner.wallet, config=miner.neuron_config)
     bt.logging.info(f"Linked miner to Axon: {axon}")
 
-    # Attach the miner functions to the Axon
+    # Attach the miner functions to the Axon, the database work runs on the
+    # executor of the miner so the event loop of the axon is never blocked
     axon.attach(
-        forward_fn=miner.forward,
-        blacklist_fn=miner.blacklist,
-        priority_fn=miner.priority,
+        forward_fn=miner.forward_async,
+        blacklist_fn=miner.blacklist_async,
+        priority_fn=miner.priority_async,
     )
     bt.logging.info(f"Attached functions to Axon: {axon}")
 
@@ -85,22 +86,21 @@ def main(miner: BettensorMiner):
 
     # When we init, set last_updated_block to current_block
     miner.last_updated_block = miner.subtensor.block
+
+    # Keep our knowledge of the network graph up to date in the background
+    miner.start_metagraph_sync()
     while True:
         try:
-            # Below: Periodically update our knowledge of the network graph.
+            # Pick up the metagraph synced in the background, never waits on the chain
+            if miner.apply_metagraph_snapshot():
+                bt.logging.debug(f"Metagraph updated: {miner.metagraph}")
+
             if miner.step % 20 == 0:
                 # if miner.step % 300 == 0:
                 # Check if the miners hotkey is on the remote blacklist
                 # miner.check_remote_blacklist()
 
-                if miner.step % 600 == 0:
-                    bt.logging.debug(
-                        f"Syncing metagraph: {miner.metagraph} with subtensor: {miner.subtensor}"
-                    )
-
-                    miner.metagraph.sync(subtensor=miner.subtensor)
-
-                miner.metagraph = miner.subtensor.metagraph(miner.neuron_config.netuid)
+                bt.logging.debug(f"Metagraph sync: {miner.metagraph_sync.stats()}")
                 log = (
                     f"Version:{version} | "
                     f"Blacklist:{miner.hotkey_blacklisted} | "
@@ -124,7 +124,9 @@ def main(miner: BettensorMiner):
 
         # If someone intentionally stops the miner, it'll safely terminate operations.
         except KeyboardInterrupt:
+            miner.metagraph_sync.stop()
             axon.stop()
+            miner.db_executor.shutdown(wait=False)
             bt.logging.success("Miner killed by keyboard interrupt.")
             break
         # In case of unforeseen errors, the miner will log the error and continue operations.
@@ -152,6 +154,13 @@ if __name__ == "__main__":
         help="Determines if miner should set weights or not",
     )
 
+    parser.add_argument(
+        "--metagraph_sync_interval",
+        type=float,
+        default=120.0,
+        help="Seconds between two metagraph syncs in the background",
+    )
+
     parser.add_argument(
         "--validator_min_stake",
         type=float,
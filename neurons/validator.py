@@ -17,7 +17,6 @@
 # OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
 # DEALINGS IN THE SOFTWARE.
 import torch
-import time
 import sys
 import os
 
@@ -78,6 +77,7 @@ async def main(validator: BettensorValidator):
 
     validator.serve_axon()
     await validator.initialize_connection()
+    validator.start_metagraph_sync()
 
     while True:
 
@@ -88,18 +88,17 @@ async def main(validator: BettensorValidator):
                 all_games = await validator.run_sync_in_async(lambda: sports_data.get_multiple_game_data(sports_config))
                 last_api_call = current_time
 
-            # Periodically sync subtensor status and save the state file
-            if validator.step % 5 == 0:
-                # Sync metagraph
-                try:
-                    validator.metagraph = await validator.sync_metagraph()
-                    bt.logging.debug(f"Metagraph synced: {validator.metagraph}")
-                except TimeoutError as e:
-                    bt.logging.error(f"Metagraph sync timed out: {e}")
+            # Pick up the metagraph synced in the background, never waits on the chain
+            if validator.apply_metagraph_snapshot():
+                bt.logging.debug(f"Metagraph updated: {validator.metagraph}")
 
                 # Update local knowledge of the hotkeys
                 validator.check_hotkeys()
 
+            # Periodically save the state file
+            if validator.step % 5 == 0:
+                bt.logging.debug(f"Metagraph sync: {validator.metagraph_sync.stats()}")
+
                 # Save state
                 validator.save_state()
 
@@ -152,58 +151,18 @@ async def main(validator: BettensorValidator):
             bt.logging.debug(
                 f"Synapse: {synapse.metadata.synapse_id} , {synapse.metadata.timestamp}, type: {synapse.metadata.synapse_type}, origin: {synapse.metadata.neuron_uid}"
             )
-            responses = validator.dendrite.query(
+            # Query the miners and ingest their predictions as the responses arrive
+            responses = await validator.query_and_process(
                 axons=uids_to_query,
+                processed_uids=list_of_uids,
                 synapse=synapse,
-                timeout=validator.timeout,
-                deserialize=True,
             )
 
-            # Process blacklisted UIDs (set scores to 0)
-            bt.logging.debug(f"blacklisted_uids: {blacklisted_uids}")
-            for uid in blacklisted_uids:
-                if uid is not None:
-                    bt.logging.debug(
-                        f"Setting score for blacklisted UID: {uid}. Old score: {validator.scores[uid]}"
-                    )
-                    validator.scores[uid] = (
-                        validator.neuron_config.alpha * validator.scores[uid]
-                        + (1 - validator.neuron_config.alpha) * 0.0
-                    )
-                    bt.logging.debug(
-                        f"Set score for blacklisted UID: {uid}. New score: {validator.scores[uid]}"
-                    )
-
-            # Process UIDs we did not query (set scores to 0)
-            bt.logging.debug(f"uids_not_to_query: {uids_not_to_query}")
-            for uid in uids_not_to_query:
-                if uid is not None:
-                    bt.logging.trace(
-                        f"Setting score for not queried UID: {uid}. Old score: {validator.scores[uid]}"
-                    )
-
-                    validator_alpha_type = type(validator.neuron_config.alpha)
-                    validator_scores_type = type(validator.scores[uid])
-
-                    bt.logging.debug(
-                        f"validator_alpha_type: {validator_alpha_type}, validator_scores_type: {validator_scores_type}"
-                    )
-                    validator.scores[uid] = (
-                        validator.neuron_config.alpha * validator.scores[uid]
-                        + (1 - validator.neuron_config.alpha) * 0.0
-                    )
-                    bt.logging.trace(
-                        f"Set score for not queried UID: {uid}. New score: {validator.scores[uid]}"
-                    )
+            # Decay the scores of the blacklisted UIDs and the UIDs we did not query
+            validator.decay_scores(blacklisted_uids + uids_not_to_query)
             if not responses:
                 print("No responses received. Sleeping for 18 seconds.")
-                time.sleep(18)
-
-            # Process the responses
-            if responses and any(responses):
-                validator.process_prediction(
-                    processed_uids=list_of_uids, predictions=responses
-                )
+                await asyncio.sleep(18)
 
             current_block = await validator.run_sync_in_async(lambda: validator.subtensor.block)
 
@@ -225,7 +184,7 @@ async def main(validator: BettensorValidator):
 
             if current_block - validator.last_updated_block > 298:
                 # Update results before setting weights next block
-                await validator.run_sync_in_async(validator.update_recent_games)
+                await validator.update_recent_games()
                 
             if current_block - validator.last_updated_block > 300:
                 # Periodically update the weights on the Bittensor blockchain.
@@ -283,6 +242,12 @@ if __name__ == "__main__":
         default=128,
         help="Sets the value for the number of targets to query at once",
     )
+    parser.add_argument(
+        "--metagraph_sync_interval",
+        type=float,
+        default=120.0,
+        help="Seconds between two metagraph syncs in the background",
+    )
     parser.add_argument(
         "--load_state",
         type=str,
@@ -300,4 +265,9 @@ if __name__ == "__main__":
         bt.logging.error("Unable to initialize Validator. Exiting.")
         sys.exit()
 
-    asyncio.get_event_loop().run_until_complete(main(validator))
+    try:
+        asyncio.get_event_loop().run_until_complete(main(validator))
+    finally:
+        if validator.metagraph_sync is not None:
+            validator.metagraph_sync.stop()
+        validator.close_database()
@@ -0,0 +1,112 @@
+"""
+test script for the database connection pool, run against a temporary sqlite file
+"""
+
+import sqlite3
+import threading
+import time
+
+import pytest
+
+from bettensor.utils.database_manager import DatabaseManager
+
+
+@pytest.fixture
+def db(tmp_path):
+    db = DatabaseManager(str(tmp_path / "pool.db"), max_readers=4)
+    with db.write_cursor() as cursor:
+        cursor.execute("CREATE TABLE predictions (predictionID TEXT PRIMARY KEY, minerID TEXT, wager REAL)")
+    yield db
+    db.close()
+
+
+def test_concurrent_forwards_never_see_a_locked_database(db):
+    errors = []
+    barrier = threading.Barrier(32)
+
+    def forward(n):
+        barrier.wait()
+        try:
+            for i in range(20):
+                if i % 4 == 0:
+                    with db.write_cursor() as cursor:
+                        cursor.execute(
+                            "INSERT INTO predictions VALUES (?, ?, ?)", (f"{n}-{i}", str(n), 1.0)
+                        )
+                else:
+                    with db.read_cursor() as cursor:
+                        cursor.execute("SELECT COUNT(*) FROM predictions WHERE minerID = ?", (str(n),))
+                        cursor.fetchone()
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=forward, args=(n,)) for n in range(32)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert db.read(lambda cursor: cursor.execute("SELECT COUNT(*) FROM predictions").fetchone()[0]) == 32 * 5
+
+    stats = db.stats()
+    # one writer and at most max_readers readers, however many threads there are
+    assert stats["connections_opened"] <= db.max_readers + 1
+    assert stats["idle_readers"] <= db.max_readers
+    assert stats["write"]["acquired"] == 32 * 5 + 1
+    assert stats["read"]["acquired"] == 32 * 15 + 1
+    assert stats["read"]["timeouts"] == stats["write"]["timeouts"] == 0
+    assert stats["write"]["max_wait_ms"] >= stats["write"]["mean_wait_ms"] >= 0
+
+
+def test_write_cursor_rolls_back_on_error(db):
+    with pytest.raises(ValueError):
+        with db.write_cursor() as cursor:
+            cursor.execute("INSERT INTO predictions VALUES ('p1', '7', 1.0)")
+            raise ValueError("bad prediction")
+
+    assert db.read(lambda cursor: cursor.execute("SELECT COUNT(*) FROM predictions").fetchone()[0]) == 0
+
+
+def test_nested_write_cursor_uses_a_savepoint(db):
+    with db.write_cursor() as outer:
+        outer.execute("INSERT INTO predictions VALUES ('p1', '7', 1.0)")
+        with pytest.raises(sqlite3.IntegrityError):
+            with db.write_cursor() as inner:
+                inner.execute("INSERT INTO predictions VALUES ('p2', '7', 2.0)")
+                inner.execute("INSERT INTO predictions VALUES ('p1', '7', 3.0)")
+        with db.write_cursor() as inner:
+            inner.execute("UPDATE predictions SET wager = 5.0 WHERE predictionID = 'p1'")
+        # nothing is visible to readers before the outer block commits
+        assert db.read(lambda cursor: cursor.execute("SELECT COUNT(*) FROM predictions").fetchone()[0]) == 0
+
+    rows = db.read(lambda cursor: cursor.execute("SELECT predictionID, wager FROM predictions").fetchall())
+    assert rows == [("p1", 5.0)]
+
+
+def test_read_cursor_is_query_only(db):
+    with pytest.raises(sqlite3.OperationalError):
+        with db.read_cursor() as cursor:
+            cursor.execute("INSERT INTO predictions VALUES ('p1', '7', 1.0)")
+
+
+def test_begin_retries_while_another_process_writes(tmp_path):
+    db = DatabaseManager(str(tmp_path / "pool.db"), busy_timeout=0.01)
+    with db.write_cursor() as cursor:
+        cursor.execute("CREATE TABLE predictions (predictionID TEXT PRIMARY KEY)")
+
+    # e.g. the cli, holding the write lock for a moment
+    other = sqlite3.connect(db.db_path, isolation_level=None, check_same_thread=False)
+    other.execute("BEGIN IMMEDIATE")
+    releaser = threading.Timer(0.1, lambda: other.execute("COMMIT"))
+    releaser.start()
+
+    start = time.monotonic()
+    db.write(lambda cursor: cursor.execute("INSERT INTO predictions VALUES ('p1')"))
+    assert time.monotonic() - start >= 0.05
+    assert db.stats()["retries"] >= 1
+    releaser.join()
+    other.close()
+
+    assert db.read(lambda cursor: cursor.execute("SELECT predictionID FROM predictions").fetchall()) == [("p1",)]
+    db.close()
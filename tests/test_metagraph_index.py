@@ -0,0 +1,108 @@
+"""
+test script for the metagraph index, the target selection built on it and the
+score decay of the uids that are left out
+"""
+
+from types import SimpleNamespace
+
+import numpy as np
+import torch
+
+from bettensor.utils.metagraph_index import MetagraphIndex
+from bettensor.validator.bettensor_validator import BettensorValidator
+
+
+def make_metagraph(n, unserved=(), negative_stake=()):
+    return SimpleNamespace(
+        hotkeys=[f"hotkey-{uid}" for uid in range(n)],
+        S=torch.tensor(
+            [-1.0 if uid in negative_stake else float(uid) for uid in range(n)]
+        ),
+        axons=[
+            SimpleNamespace(
+                hotkey=f"hotkey-{uid}",
+                ip="0.0.0.0" if uid in unserved else f"10.0.0.{uid % 250}",
+            )
+            for uid in range(n)
+        ],
+        validator_permit=torch.tensor([uid % 2 == 0 for uid in range(n)]),
+    )
+
+
+def make_validator(metagraph, blacklist=None, max_targets=256):
+    validator = BettensorValidator.__new__(BettensorValidator)
+    validator.metagraph = metagraph
+    validator.metagraph_index = None
+    validator.blacklisted_miner_hotkeys = blacklist
+    validator.max_targets = max_targets
+    validator.target_group = 0
+    return validator
+
+
+def test_index_lookups():
+    index = MetagraphIndex.from_metagraph(
+        make_metagraph(6, unserved={1}), ["hotkey-4", "unknown", "hotkey-2"]
+    )
+
+    assert len(index) == 6
+    assert index.uid("hotkey-3") == 3
+    assert index.uid("unknown") is None
+    assert "hotkey-5" in index and "unknown" not in index
+    assert index.stake_of("hotkey-5") == 5.0
+    assert index.blacklisted_uids == [4, 2]
+    assert index.unknown_blacklisted_hotkeys == ["unknown"]
+    assert index.validator_permit.tolist() == [True, False, True, False, True, False]
+    assert index.queryable().tolist() == [True, False, False, True, False, True]
+
+
+def test_get_uids_to_query():
+    metagraph = make_metagraph(8, unserved={1}, negative_stake={6})
+    validator = make_validator(metagraph, blacklist=["hotkey-3", "unknown"])
+
+    axons, uids, blacklisted, not_queried = validator.get_uids_to_query(metagraph.axons)
+
+    assert uids == [0, 2, 4, 5, 7]
+    assert [axon.hotkey for axon in axons] == [f"hotkey-{uid}" for uid in uids]
+    assert blacklisted == [3]
+    assert not_queried == [1, 3, 6]
+
+    # a changed blacklist rebuilds the index
+    validator.blacklisted_miner_hotkeys = ["hotkey-0"]
+    _, uids, blacklisted, not_queried = validator.get_uids_to_query(metagraph.axons)
+    assert uids == [2, 3, 4, 5, 7]
+    assert blacklisted == [0]
+    assert not_queried == [0, 1, 6]
+
+
+def test_get_uids_to_query_target_groups():
+    metagraph = make_metagraph(10)
+    validator = make_validator(metagraph, max_targets=4)
+
+    groups = [validator.get_uids_to_query(metagraph.axons)[1] for _ in range(4)]
+
+    assert groups == [[0, 1, 2, 3], [4, 5, 6, 7], [8, 9], [0, 1, 2, 3]]
+
+
+def test_index_large_metagraph():
+    metagraph = make_metagraph(4096, unserved=set(range(0, 4096, 7)))
+    index = MetagraphIndex.from_metagraph(metagraph, [f"hotkey-{uid}" for uid in range(0, 4096, 5)])
+
+    expected = np.array(
+        [uid % 7 != 0 and uid % 5 != 0 for uid in range(4096)]
+    )
+    assert np.array_equal(index.queryable(), expected)
+    assert all(index.uid(hotkey) == uid for uid, hotkey in enumerate(metagraph.hotkeys))
+
+
+def test_decay_scores():
+    validator = make_validator(make_metagraph(5))
+    validator.neuron_config = SimpleNamespace(alpha=0.5)
+    validator.scores = torch.tensor([1.0, 2.0, 4.0, 8.0, 16.0])
+
+    # blacklisted uids are also not queried, they are decayed once per list
+    blacklisted, not_queried = [3], [1, 3, None]
+    assert validator.decay_scores(blacklisted + not_queried) == 2
+    assert validator.scores.tolist() == [1.0, 1.0, 4.0, 2.0, 16.0]
+
+    assert validator.decay_scores([]) == 0
+    assert validator.scores.tolist() == [1.0, 1.0, 4.0, 2.0, 16.0]
@@ -0,0 +1,132 @@
+"""
+test script for the background metagraph sync
+"""
+
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+import torch
+
+from bettensor.utils.metagraph_sync import MetagraphSync
+from bettensor.validator.bettensor_validator import BettensorValidator
+
+
+def make_metagraph(block, hotkeys):
+    return SimpleNamespace(
+        block=torch.tensor(block),
+        hotkeys=list(hotkeys),
+        S=torch.ones(len(hotkeys)),
+        axons=[SimpleNamespace(hotkey=hotkey, ip="10.0.0.1") for hotkey in hotkeys],
+        validator_permit=torch.ones(len(hotkeys), dtype=torch.bool),
+    )
+
+
+class FakeSubtensor:
+    def __init__(self, hotkeys, fail=0, delay=0.0):
+        self.hotkeys = hotkeys
+        self.fail = fail
+        self.delay = delay
+        self.block = 100
+        self.calls = []
+        self.released = threading.Event()
+        self.released.set()
+
+    def metagraph(self, netuid, lite=True):
+        self.calls.append((netuid, lite))
+        self.released.wait()
+        time.sleep(self.delay)
+        if self.fail:
+            self.fail -= 1
+            raise ConnectionError("endpoint down")
+        self.block += 1
+        return make_metagraph(self.block, self.hotkeys)
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.005)
+
+
+def test_sync_once_publishes_snapshots():
+    subtensor = FakeSubtensor(["a", "b"])
+    factory_calls = []
+    sync = MetagraphSync(
+        lambda: factory_calls.append(1) or subtensor,
+        netuid=30,
+        initial=make_metagraph(100, ["a"]),
+    )
+
+    initial = sync.snapshot
+    assert initial.version == 0 and initial.block == 100
+    assert initial.index.uid("a") == 0 and initial.index.uid("b") is None
+    assert sync.newer_than(0) is None
+
+    snapshot = sync.sync_once()
+    assert subtensor.calls == [(30, True)]
+    assert snapshot.version == 1 and snapshot.block == 101
+    assert snapshot.index.uid("b") == 1
+    assert sync.newer_than(0) is snapshot
+    # the old snapshot is left untouched for readers still holding it
+    assert initial.index.uid("b") is None
+    assert len(factory_calls) == 1
+
+    stats = sync.stats()
+    assert stats["version"] == 1 and stats["syncs"] == 1 and stats["failures"] == 0
+    assert stats["staleness_seconds"] < 1
+
+
+def test_failed_sync_keeps_snapshot_and_reconnects():
+    subtensor = FakeSubtensor(["a"], fail=1)
+    factory_calls = []
+    sync = MetagraphSync(
+        lambda: factory_calls.append(1) or subtensor,
+        netuid=30,
+        interval=0.01,
+        initial=make_metagraph(100, ["a"]),
+    )
+
+    sync.start()
+    try:
+        wait_for(lambda: sync.syncs >= 1)
+    finally:
+        sync.stop()
+
+    assert sync.failures == 1
+    assert sync.snapshot.version >= 1
+    # the connection is recreated after a failure
+    assert len(factory_calls) == 2
+    assert sync.staleness(now=sync.snapshot.synced_at + 30) == pytest.approx(30)
+
+
+def test_readers_never_wait_on_the_chain():
+    subtensor = FakeSubtensor(["a", "b"])
+    subtensor.released.clear()
+    sync = MetagraphSync(lambda: subtensor, netuid=30, interval=0, initial=make_metagraph(100, ["a"]))
+
+    validator = BettensorValidator.__new__(BettensorValidator)
+    validator.metagraph_sync = sync
+    validator.metagraph_version = None
+    assert validator.apply_metagraph_snapshot()
+    assert validator.metagraph_index.uid("b") is None
+
+    sync.start()
+    try:
+        wait_for(lambda: subtensor.calls)
+        # the sync thread is blocked on the chain, reads return immediately
+        start = time.monotonic()
+        assert not validator.apply_metagraph_snapshot()
+        assert time.monotonic() - start < 0.1
+
+        subtensor.released.set()
+        wait_for(lambda: sync.syncs >= 1)
+    finally:
+        sync.stop()
+
+    assert validator.apply_metagraph_snapshot()
+    assert validator.metagraph.hotkeys == ["a", "b"]
+    assert validator.metagraph_index.uid("b") == 1
+    assert validator.metagraph_version == sync.snapshot.version
@@ -37,6 +37,7 @@ def test_blacklist(mock_bettensor_miner):
     mock_bettensor_miner.metagraph.hotkeys = ["test_hotkey"]
     mock_bettensor_miner.metagraph.validator_permit = [True]
     mock_bettensor_miner.metagraph.S = [2000.0]
+    mock_bettensor_miner.refresh_metagraph_index()
 
     result, reason = mock_bettensor_miner.blacklist(mock_synapse)
     assert result == False
@@ -46,6 +47,7 @@ def test_priority(mock_bettensor_miner):
     mock_synapse = MagicMock(dendrite=MagicMock(hotkey="test_hotkey"))
     mock_bettensor_miner.metagraph.hotkeys = ["test_hotkey"]
     mock_bettensor_miner.metagraph.S = [2000.0]
+    mock_bettensor_miner.refresh_metagraph_index()
 
     priority = mock_bettensor_miner.priority(mock_synapse)
     assert priority == 2000.0
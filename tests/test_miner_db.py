@@ -0,0 +1,286 @@
+"""
+test script for the miner database paths, run against a temporary sqlite file
+"""
+
+import asyncio
+import datetime
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+import bittensor as bt
+import pytest
+
+from bettensor import __version__ as version
+from bettensor.miner import bettensor_miner
+from bettensor.miner.bettensor_miner import BettensorMiner
+from bettensor.protocol import GameData, Metadata, TeamGame
+from bettensor.miner.response_cache import ResponseCache
+from bettensor.utils import wire_encoding
+from bettensor.utils.database_manager import DatabaseManager
+
+
+@pytest.fixture
+def miner(tmp_path):
+    miner = BettensorMiner.__new__(BettensorMiner)
+    miner.db_path = str(tmp_path / "miner.db")
+    miner.db_manager = DatabaseManager(miner.db_path)
+    miner.miner_uid = 7
+    miner.stored_games = None
+    miner.game_data_lock = threading.Lock()
+    miner.initialize_database()
+    return miner
+
+
+def insert_game(miner, external_id, start):
+    with miner.db_manager.get_cursor() as cursor:
+        cursor.execute(
+            "INSERT INTO games (gameID, teamA, teamAodds, teamB, teamBodds, sport, league, externalID, eventStartDate, active, outcome, tieOdds, canTie) VALUES (?, 'home', 1.5, 'away', 2.5, 'soccer', '253', ?, ?, 1, 'Unfinished', 3.2, 1)",
+            (f"game-{external_id}", external_id, start.isoformat()),
+        )
+
+
+def insert_prediction(miner, prediction_id, external_id, date):
+    with miner.db_manager.get_cursor() as cursor:
+        cursor.execute(
+            "INSERT INTO predictions VALUES (?, ?, '7', ?, '0', 'home', 'away', 10.0, 1.5, 2.5, 3.2, 1, 'Unfinished')",
+            (prediction_id, external_id, date.isoformat()),
+        )
+
+
+def test_response_predictions(miner):
+    now = datetime.datetime.now(datetime.timezone.utc)
+    insert_game(miner, "upcoming", now + datetime.timedelta(hours=2))
+    insert_game(miner, "started", now - datetime.timedelta(hours=1))
+    insert_prediction(miner, "p1", "upcoming", now - datetime.timedelta(hours=1))
+    insert_prediction(miner, "p2", "upcoming", now - datetime.timedelta(days=4))
+    insert_prediction(miner, "p3", "started", now - datetime.timedelta(hours=2))
+    insert_prediction(miner, "p4", "unknown", now - datetime.timedelta(hours=2))
+
+    predictions = miner.get_response_predictions(now)
+
+    assert list(predictions) == ["p1"]
+    prediction = predictions["p1"]
+    assert prediction.teamGameID == "upcoming"
+    assert prediction.minerID == "7"
+    assert prediction.predictedOutcome == "0"
+    assert (prediction.wager, prediction.teamAodds, prediction.teamBodds, prediction.tieOdds) == (10.0, 1.5, 2.5, 3.2)
+    assert prediction.can_overwrite is True
+    assert prediction.outcome == "Unfinished"
+
+
+def test_response_predictions_query_uses_indexes(miner):
+    with miner.db_manager.get_cursor() as cursor:
+        cursor.execute("SELECT name FROM sqlite_master WHERE type = 'index'")
+        indexes = {row[0] for row in cursor.fetchall()}
+    assert {"idx_predictions_game_date", "idx_games_start"} <= indexes
+
+
+def test_response_cache_invalidation(miner):
+    now = datetime.datetime.now(datetime.timezone.utc).replace(second=0, microsecond=0)
+    insert_game(miner, "upcoming", now + datetime.timedelta(hours=2))
+    insert_prediction(miner, "p1", "upcoming", now - datetime.timedelta(hours=1))
+    maintained = []
+    cache = ResponseCache(
+        miner.db_path, miner.get_response_predictions, maintain=lambda: maintained.append(1)
+    )
+
+    first = cache.get(now)
+    assert list(first.predictions) == ["p1"]
+    assert cache.get(now + datetime.timedelta(seconds=30)) is first
+    assert (cache.rebuilds, cache.hits, len(maintained)) == (1, 1, 1)
+    assert wire_encoding.decode(first.blob, type(first.predictions["p1"]), wire_encoding.PREDICTION_FIELDS) == first.predictions
+
+    # a write from another connection, e.g. the cli, invalidates the payload
+    conn = sqlite3.connect(miner.db_path)
+    with conn:
+        conn.execute(
+            "INSERT INTO predictions VALUES ('p2', 'upcoming', '7', ?, '1', 'home', 'away', 5.0, 1.5, 2.5, 3.2, 1, 'Unfinished')",
+            ((now - datetime.timedelta(minutes=5)).isoformat(),),
+        )
+    conn.close()
+    second = cache.get(now)
+    assert second is not first
+    assert set(second.predictions) == {"p1", "p2"}
+
+    # so does the next minute, the forward query is cut at minutes
+    assert cache.get(now + datetime.timedelta(minutes=1)) is not second
+    cache.invalidate()
+    assert cache.get(now + datetime.timedelta(minutes=1)).key[1] == 1
+    assert cache.rebuilds == 4
+    cache.close()
+
+
+def test_response_cache_single_flight(miner):
+    now = datetime.datetime.now(datetime.timezone.utc).replace(second=0, microsecond=0)
+    builds = []
+
+    def build(now):
+        builds.append(now)
+        time.sleep(0.1)
+        return {}
+
+    cache = ResponseCache(miner.db_path, build)
+    barrier = threading.Barrier(8)
+    payloads = []
+
+    def forward():
+        barrier.wait()
+        payloads.append(cache.get(now))
+
+    threads = [threading.Thread(target=forward) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(builds) == 1
+    assert len(payloads) == 8 and all(payload is payloads[0] for payload in payloads)
+    cache.close()
+
+
+def make_team_game(external_id, start, odds=1.5, outcome="Unfinished"):
+    return TeamGame(
+        id=f"game-{external_id}",
+        teamA="home",
+        teamB="away",
+        sport="soccer",
+        league="253",
+        externalId=external_id,
+        createDate=start.isoformat(),
+        lastUpdateDate=start.isoformat(),
+        eventStartDate=start.isoformat(),
+        active=False,
+        outcome=outcome,
+        teamAodds=odds,
+        teamBodds=2.5,
+        tieOdds=3.2,
+        canTie=True,
+    )
+
+
+def test_add_game_data_skips_unchanged_games(miner):
+    start = datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(days=1)
+    games = {f"game-{i}": make_team_game(str(i), start, odds=1.6) for i in range(3)}
+    # stored with older odds
+    insert_game(miner, "0", start)
+
+    assert miner.add_game_data(games) == (2, 1, 0)
+    # every validator sends the same games again
+    assert miner.add_game_data(dict(games)) == (0, 0, 3)
+
+    changed = dict(games)
+    changed["game-1"] = make_team_game("1", start, odds=1.7)
+    changed["game-2"] = make_team_game("2", start, odds=1.6, outcome="0")
+    assert miner.add_game_data(changed) == (0, 2, 1)
+
+    with miner.db_manager.get_cursor() as cursor:
+        cursor.execute("SELECT externalID, teamAodds, outcome FROM games ORDER BY externalID")
+        rows = cursor.fetchall()
+    assert rows == [("0", 1.6, "Unfinished"), ("1", 1.7, "Unfinished"), ("2", 1.6, "0")]
+
+    # a restarted miner knows the stored games from the database
+    miner.stored_games = None
+    assert miner.add_game_data(changed) == (0, 0, 3)
+
+
+def make_wallet():
+    return SimpleNamespace(hotkey=bt.Keypair.create_from_mnemonic(bt.Keypair.generate_mnemonic()))
+
+
+def setup_responses(miner, maintain=None):
+    """sets what forward needs beyond the database"""
+    miner.wallet = make_wallet()
+    miner.subnet_version = version
+    miner.validator_game_versions = {}
+    miner.response_cache = ResponseCache(miner.db_path, miner.get_response_predictions, maintain=maintain)
+    miner.db_executor = ThreadPoolExecutor(max_workers=4)
+    miner.maintenance_pending = False
+
+
+def make_synapse(wallet, games):
+    synapse = GameData(
+        metadata=Metadata.create(wallet, version, 0, "game_data"),
+        gamedata_dict=dict(games),
+        prediction_dict=None,
+    )
+    synapse.dendrite.hotkey = wallet.hotkey.ss58_address
+    return synapse
+
+
+def test_failed_ingest_is_not_reported_as_held(miner, monkeypatch):
+    setup_responses(miner)
+    validator_wallet = make_wallet()
+    start = datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(hours=2)
+    synapse = make_synapse(validator_wallet, {"game-1": make_team_game("1", start)})
+    synapse.metadata.gamedata_version = "v1"
+
+    def broken_game_row(game_id, game):
+        raise sqlite3.OperationalError("disk I/O error")
+
+    monkeypatch.setattr(bettensor_miner, "game_row", broken_game_row)
+    response = miner.respond(synapse)
+    # the validator sends all games again with the next request
+    assert response.metadata.gamedata_version is None
+    assert miner.validator_game_versions == {}
+
+    monkeypatch.undo()
+    synapse = make_synapse(validator_wallet, {"game-1": make_team_game("1", start)})
+    synapse.metadata.gamedata_version = "v1"
+    assert miner.respond(synapse).metadata.gamedata_version == "v1"
+    miner.db_executor.shutdown()
+
+
+def test_response_cache_maintenance_after_response(miner):
+    now = datetime.datetime.now(datetime.timezone.utc).replace(second=0, microsecond=0)
+    maintained = []
+
+    def maintain():
+        maintained.append(1)
+        # maintenance writes, which must not call for another one
+        insert_game(miner, f"maintained-{len(maintained)}", now)
+
+    cache = ResponseCache(miner.db_path, miner.get_response_predictions, maintain=maintain)
+    cache.get(now, maintain=False)
+    assert maintained == [] and cache.needs_maintenance(now)
+
+    assert cache.run_maintenance(now)
+    assert not cache.run_maintenance(now)
+    assert not cache.run_maintenance(now + datetime.timedelta(seconds=30))
+    assert cache.run_maintenance(now + datetime.timedelta(minutes=1))
+    assert len(maintained) == 2
+    cache.close()
+
+
+def test_forward_async_maintains_after_the_responses(miner, monkeypatch):
+    monkeypatch.setattr(bettensor_miner, "MAINTENANCE_DELAY", 0.05)
+    now = datetime.datetime.now(datetime.timezone.utc)
+    insert_game(miner, "upcoming", now + datetime.timedelta(hours=2))
+    insert_prediction(miner, "p1", "upcoming", now - datetime.timedelta(hours=1))
+
+    maintained = []
+    setup_responses(miner, maintain=lambda: maintained.append(1))
+    validator_wallet = make_wallet()
+    games = {"game-upcoming": make_team_game("upcoming", now + datetime.timedelta(hours=2))}
+
+    async def burst():
+        responses = await asyncio.gather(
+            *(miner.forward_async(make_synapse(validator_wallet, games)) for _ in range(16))
+        )
+        # answered before the database was maintained
+        assert maintained == []
+        await asyncio.sleep(0.5)
+        return responses
+
+    responses = asyncio.run(burst())
+    miner.db_executor.shutdown()
+
+    for response in responses:
+        response.decode_compact()
+    assert all(list(response.prediction_dict) == ["p1"] for response in responses)
+    assert all(response.metadata.synapse_type == "prediction" for response in responses)
+    # the burst shares one maintenance
+    assert maintained == [1]
+    assert not miner.maintenance_pending
@@ -2,10 +2,13 @@
 test script for protocol functions and files
 """
 
+import base64
+import msgpack
 import pytest
 from unittest.mock import MagicMock, patch
 from datetime import datetime, timezone
 from bettensor.protocol import MinerStats, Metadata, TeamGamePrediction, TeamGame, GameData
+from bettensor.utils import wire_encoding
 import bittensor as bt
 import uuid
 
@@ -136,4 +139,54 @@ def test_game_data_deserialize():
     
     assert deserialized_gamedata == gamedata_dict
     assert deserialized_predictions == prediction_dict
-    assert deserialized_metadata == metadata
\ No newline at end of file
+    assert deserialized_metadata == metadata
+
+
+def test_game_data_compact_encoding_round_trip():
+    game = TeamGame(
+        id="4f9c7f3e-6d2b-4c1a-9a53-2f0e1c9b7d11", teamA="TeamA", teamB="TeamB", sport="soccer", league="253",
+        externalId="1186412", createDate="2024-07-01T10:15:42.123456+00:00", lastUpdateDate="2024-07-01T10:15:42.123456+00:00",
+        eventStartDate="2024-07-03T19:30:00-03:00", active=False, outcome="Unfinished", teamAodds=1.85, teamBodds=4.1, tieOdds=3.4, canTie=True
+    )
+    # ids that aren't uuids and timestamps that don't round trip through datetime fall back to strings
+    other_game = game.copy(update={"id": "game2", "eventStartDate": "2024-07-03T19:30:00Z", "active": True})
+    prediction = TeamGamePrediction(
+        predictionID="pred1", teamGameID="1186412", minerID="7", predictionDate="not a date", predictedOutcome="TeamA",
+        wager=12.5, teamAodds=1.85, teamBodds=4.1, tieOdds=3.4, outcome="Unfinished", can_overwrite=False
+    )
+    metadata = Metadata(
+        synapse_id="synapse", neuron_uid="1", timestamp="2024-07-01T10:15:42+00:00", signature="signature",
+        subnet_version="1.0", synapse_type="game_data", wire_encoding=1
+    )
+    gamedata_dict = {game.id: game, "key-other-than-the-id": other_game}
+    prediction_dict = {"pred1": prediction}
+
+    game_data = GameData(metadata=metadata, gamedata_dict=gamedata_dict, prediction_dict=prediction_dict)
+    game_data.encode_compact()
+    assert game_data.gamedata_dict is None and game_data.prediction_dict is None
+
+    received = GameData.parse_raw(game_data.json())
+    deserialized_gamedata, deserialized_predictions, _ = received.deserialize()
+
+    assert deserialized_gamedata == gamedata_dict
+    assert list(deserialized_gamedata) == list(gamedata_dict)
+    assert deserialized_predictions == prediction_dict
+    assert received.gamedata_blob is None and received.prediction_blob is None
+
+
+def test_game_data_compact_encoding_rejects_malformed_data():
+    with pytest.raises(ValueError):
+        wire_encoding.decode("bm90IG1zZ3BhY2s=", TeamGame, wire_encoding.GAME_FIELDS)
+
+    # string fallbacks must point into the string table
+    prediction = TeamGamePrediction(
+        predictionID="pred1", teamGameID="1186412", minerID="7", predictionDate="not a date", predictedOutcome="0",
+        wager=12.5, teamAodds=1.85, teamBodds=4.1, tieOdds=3.4, outcome="Unfinished", can_overwrite=False
+    )
+    blob = wire_encoding.encode({"pred1": prediction}, wire_encoding.PREDICTION_FIELDS)
+    encoded = msgpack.unpackb(base64.b64decode(blob), raw=False)
+    position = [name for name, _ in wire_encoding.PREDICTION_FIELDS].index("predictionDate")
+    encoded[4][position][2][0] = -1
+    tampered = base64.b64encode(msgpack.packb(encoded)).decode()
+    with pytest.raises(ValueError):
+        wire_encoding.decode(tampered, TeamGamePrediction, wire_encoding.PREDICTION_FIELDS)
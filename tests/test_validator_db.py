@@ -0,0 +1,975 @@
+"""
+test script for the validator database paths, run against a temporary sqlite file
+"""
+
+import asyncio
+import concurrent.futures
+import sqlite3
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from types import SimpleNamespace
+
+import aiohttp
+import pytest
+import torch
+
+from benchmarks.rapid_api_server import RapidApiStandIn, running
+from bettensor.protocol import GameData, Metadata, TeamGame, TeamGamePrediction
+from bettensor.utils import game_data_cache
+from bettensor.utils.sports_data import SportsData
+from bettensor.utils.wire_encoding import WIRE_ENCODING_VERSION
+from bettensor.validator.bettensor_validator import BettensorValidator
+from bettensor.validator.game_data_versions import (
+    DELTA,
+    FULL,
+    NOT_MODIFIED,
+    GameDataVersions,
+)
+from bettensor.validator import earnings, migrations
+from bettensor.validator.migrations import LATEST_VERSION, migrate
+from bettensor.validator.outcome_polling import OutcomePollScheduler
+from bettensor.validator.outcome_resolvers import (
+    BaseballOutcomeResolver,
+    OutcomeResolver,
+    SoccerOutcomeResolver,
+    default_resolvers,
+)
+from bettensor.validator.storage import ValidatorStorage
+
+
+def make_game(external_id, start, outcome="Unfinished"):
+    now = datetime.now(timezone.utc).isoformat()
+    return (
+        f"id-{external_id}",
+        f"home-{external_id}",
+        f"away-{external_id}",
+        "soccer",
+        "253",
+        external_id,
+        now,
+        now,
+        start.isoformat(),
+        0,
+        outcome,
+        1.5,
+        2.5,
+        3.2,
+        True,
+    )
+
+
+def make_prediction(prediction_id, game_id, predicted, wager=10.0):
+    return TeamGamePrediction(
+        predictionID=prediction_id,
+        teamGameID=game_id,
+        minerID="0",
+        predictionDate=datetime.now(timezone.utc).isoformat(),
+        predictedOutcome=predicted,
+        wager=wager,
+        teamAodds=1.5,
+        teamBodds=2.5,
+        tieOdds=3.2,
+        outcome="Unfinished",
+        can_overwrite=True,
+    )
+
+
+@pytest.fixture
+def validator(tmp_path):
+    db_path = str(tmp_path / "validator.db")
+    validator = BettensorValidator.__new__(BettensorValidator)
+    validator.db_path = db_path
+    validator.rapid_api_key = None
+    validator.outcome_polls = OutcomePollScheduler()
+    validator.metagraph = SimpleNamespace(hotkeys=["hotkey0", "hotkey1"])
+    validator.thread_executor = concurrent.futures.ThreadPoolExecutor()
+    validator.initialize_database()
+
+    future = datetime.now(timezone.utc) + timedelta(days=1)
+    past = datetime.now(timezone.utc) - timedelta(hours=1)
+    conn = sqlite3.connect(db_path)
+    conn.executemany(
+        "INSERT INTO game_data VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        [make_game("g1", future), make_game("g2", past)],
+    )
+    conn.commit()
+    conn.close()
+    yield validator
+    validator.close_database()
+    validator.thread_executor.shutdown()
+
+
+class FakeResolver(OutcomeResolver):
+    """resolves soccer games from a fixed externalId -> outcome dict"""
+
+    sport = "soccer"
+
+    def __init__(self, results):
+        self.results = results
+        self.keys = []
+
+    async def fetch(self, session, key):
+        self.keys.append(key)
+        return self.results
+
+    def outcomes(self, data):
+        return data
+
+
+def insert(validator, processed_uids, predictions):
+    asyncio.run(validator.insert_predictions(processed_uids, predictions))
+
+
+def stored_predictions(validator):
+    conn = sqlite3.connect(validator.db_path)
+    rows = conn.execute(
+        "SELECT predictionID, minerId, predictedOutcome FROM predictions ORDER BY rowid"
+    ).fetchall()
+    conn.close()
+    return rows
+
+
+def test_insert_predictions_accepts_and_rejects(validator):
+    predictions = {
+        0: {
+            "p1": make_prediction("p1", "g1", "home-g1"),
+            "p2": make_prediction("p2", "g1", "Tie"),
+            "p3": make_prediction("p3", "g1", "somebody else"),
+            "p4": make_prediction("p4", "g2", "home-g2"),
+            "p5": make_prediction("p5", "unknown", "home-g1"),
+        },
+        1: {"p6": make_prediction("p6", "g1", "away-g1")},
+    }
+
+    insert(validator, [0], predictions)
+
+    assert stored_predictions(validator) == [
+        ("p1", "hotkey0", "0"),
+        ("p2", "hotkey0", "2"),
+    ]
+
+
+def test_insert_predictions_skips_duplicates(validator):
+    insert(validator, [0], {0: {"p1": make_prediction("p1", "g1", "home-g1")}})
+    insert(
+        validator,
+        [0, 1],
+        {
+            0: {"p1": make_prediction("p1", "g1", "away-g1")},
+            1: {"p1": make_prediction("p1", "g1", "away-g1")},
+        },
+    )
+
+    assert stored_predictions(validator) == [("p1", "hotkey0", "0")]
+
+
+def test_insert_predictions_enforces_daily_wager_limit(validator):
+    insert(validator, [0], {0: {"p1": make_prediction("p1", "g1", "home-g1", wager=600)}})
+    insert(
+        validator,
+        [0, 1],
+        {
+            0: {
+                "p2": make_prediction("p2", "g1", "home-g1", wager=300),
+                "p3": make_prediction("p3", "g1", "home-g1", wager=200),
+                "p4": make_prediction("p4", "g1", "home-g1", wager=100),
+            },
+            1: {"p5": make_prediction("p5", "g1", "home-g1", wager=1000)},
+        },
+    )
+
+    assert [row[0] for row in stored_predictions(validator)] == ["p1", "p2", "p4", "p5"]
+
+
+def index_names(db_path):
+    conn = sqlite3.connect(db_path)
+    names = {
+        row[0]
+        for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")
+    }
+    conn.close()
+    return names
+
+
+def test_migrate_creates_schema_and_indexes(tmp_path):
+    db_path = str(tmp_path / "validator.db")
+
+    assert migrate(db_path) == LATEST_VERSION
+    assert {
+        "idx_predictions_prediction_id",
+        "idx_predictions_game_outcome",
+        "idx_predictions_miner_date",
+        "idx_game_data_external_id",
+    } <= index_names(db_path)
+
+    # a second run is a no-op
+    assert migrate(db_path) == LATEST_VERSION
+
+
+def test_migrate_upgrades_existing_database_in_place(tmp_path):
+    db_path = str(tmp_path / "validator.db")
+    SportsData(db_name=db_path)
+    legacy = BettensorValidator.__new__(BettensorValidator)
+    legacy.db_path = db_path
+    legacy.create_table()
+
+    conn = sqlite3.connect(db_path)
+    conn.executemany(
+        "INSERT INTO predictions (predictionID, minerId, wager) VALUES (?, ?, ?)",
+        [("p1", "hotkey0", 1.0), ("p1", "hotkey0", 2.0), ("p2", "hotkey1", 3.0)],
+    )
+    conn.commit()
+    conn.close()
+
+    assert migrate(db_path) == LATEST_VERSION
+
+    conn = sqlite3.connect(db_path)
+    rows = conn.execute(
+        "SELECT predictionID, wager FROM predictions ORDER BY rowid"
+    ).fetchall()
+    conn.close()
+    assert rows == [("p1", 1.0), ("p2", 3.0)]
+    assert "idx_predictions_prediction_id" in index_names(db_path)
+
+
+def test_migration_backfills_earnings_like_the_scoring(tmp_path):
+    db_path = str(tmp_path / "validator.db")
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    cursor = conn.cursor()
+    migrations.MIGRATIONS[0][2](cursor)
+    cursor.execute("PRAGMA user_version = 1")
+
+    now = datetime.now(timezone.utc)
+    started = now - timedelta(hours=3)
+    cursor.executemany(
+        "INSERT INTO game_data VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        [
+            make_game("g1", started, outcome="0"),
+            make_game("g2", started - timedelta(hours=1), outcome="tie"),
+            make_game("old", now - timedelta(days=3), outcome="1"),
+        ],
+    )
+    before = (started - timedelta(hours=1)).isoformat()
+    after = (started + timedelta(minutes=5)).isoformat()
+    cursor.executemany(
+        """INSERT INTO predictions (predictionID, teamGameID, minerId, predictionDate, predictedOutcome,
+        wager, teamAodds, teamBodds, tieOdds, outcome) VALUES (?, ?, ?, ?, ?, ?, 1.5, 2.5, 3.2, ?)""",
+        [
+            ("p1", "g1", "hotkey0", before, "0", 10.0, "0"),
+            ("p2", "g1", "hotkey0", before, "0", 2.0, "0"),
+            ("p3", "g1", "hotkey1", before, "1", 10.0, "0"),
+            ("p4", "g1", "hotkey1", after, "0", 10.0, "0"),
+            ("p5", "g2", "hotkey1", (started - timedelta(hours=2)).isoformat(), "tie", 5.0, "tie"),
+            ("p6", "old", "hotkey1", (now - timedelta(days=4)).isoformat(), "1", 5.0, "1"),
+            ("p7", "g1", None, before, "0", 5.0, "0"),
+        ],
+    )
+    conn.close()
+
+    assert migrate(db_path) == LATEST_VERSION
+
+    conn = sqlite3.connect(db_path)
+    query = "SELECT minerId, eventStartDate, earnings FROM miner_earnings ORDER BY minerId"
+    migrated = conn.execute(query).fetchall()
+    earnings.rebuild_earnings(conn.cursor(), datetime.now(timezone.utc))
+    rebuilt = conn.execute(query).fetchall()
+    conn.close()
+    assert migrated == rebuilt
+    assert [(miner_id, amount) for miner_id, _, amount in migrated] == [
+        ("hotkey0", 18.0),
+        ("hotkey1", 16.0),
+    ]
+
+
+def test_calculate_miner_scores(validator):
+    validator.metagraph = SimpleNamespace(
+        hotkeys=["hotkey0", "hotkey1", "hotkey2"], S=torch.zeros(3)
+    )
+    now = datetime.now(timezone.utc)
+    started = now - timedelta(hours=3)
+    conn = sqlite3.connect(validator.db_path)
+    conn.executemany(
+        "INSERT INTO game_data VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        [
+            make_game("g3", started, outcome="0"),
+            make_game("g4", now - timedelta(days=3), outcome="1"),
+        ],
+    )
+    made = (started - timedelta(hours=1)).isoformat()
+    conn.executemany(
+        """
+        INSERT INTO predictions (predictionID, teamGameID, minerId, predictionDate, predictedOutcome, wager, teamAodds, teamBodds, tieOdds, outcome)
+        VALUES (?, ?, ?, ?, ?, ?, 1.5, 2.5, 3.2, ?)
+    """,
+        [
+            # correct predictions
+            ("p1", "g3", "hotkey0", made, "0", 10.0, "0"),
+            ("p2", "g3", "hotkey0", made, "0", 20.0, "0"),
+            ("p3", "g3", "hotkey2", made, "0", 4.0, "0"),
+            # wrong prediction
+            ("p4", "g3", "hotkey1", made, "1", 10.0, "0"),
+            # made after the game started
+            ("p5", "g3", "hotkey1", (started + timedelta(minutes=1)).isoformat(), "0", 10.0, "0"),
+            # game started more than 48 hours ago
+            ("p6", "g4", "hotkey1", (now - timedelta(days=4)).isoformat(), "1", 10.0, "1"),
+            # miner is no longer in the metagraph
+            ("p7", "g3", "hotkey9", made, "0", 10.0, "0"),
+        ],
+    )
+    conn.commit()
+    conn.close()
+
+    earnings = asyncio.run(validator.calculate_miner_scores())
+
+    assert torch.equal(earnings, torch.tensor([45.0, 0.0, 6.0]))
+
+
+def test_resolved_games_materialize_miner_earnings(validator):
+    validator.metagraph = SimpleNamespace(
+        hotkeys=["hotkey0", "hotkey1"], S=torch.zeros(2)
+    )
+    now = datetime.now(timezone.utc)
+    started = now - timedelta(hours=3)
+    made = (started - timedelta(hours=1)).isoformat()
+    conn = sqlite3.connect(validator.db_path)
+    conn.execute(
+        "INSERT INTO game_data VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        make_game("g3", started),
+    )
+    conn.executemany(
+        """
+        INSERT INTO predictions (predictionID, teamGameID, minerId, predictionDate, predictedOutcome, wager, teamAodds, teamBodds, tieOdds, outcome)
+        VALUES (?, ?, ?, ?, ?, ?, 1.5, 2.5, 3.2, 'Unfinished')
+    """,
+        [
+            ("p1", "g3", "hotkey0", made, "1", 10.0),
+            ("p2", "g3", "hotkey1", made, "0", 10.0),
+            ("p3", "g3", "hotkey1", made, "1", 2.0),
+        ],
+    )
+    conn.commit()
+    conn.close()
+
+    validator.outcome_resolvers = {"soccer": FakeResolver({"g3": 1})}
+    asyncio.run(validator.update_recent_games())
+
+    earnings = asyncio.run(validator.get_miner_earnings())
+    assert torch.equal(earnings, torch.tensor([25.0, 5.0]))
+    assert torch.equal(earnings, asyncio.run(validator.calculate_miner_scores()))
+
+    # resolving again doesn't add the earnings twice
+    asyncio.run(validator.update_recent_games())
+    assert torch.equal(asyncio.run(validator.get_miner_earnings()), earnings)
+
+
+def test_storage_group_commit_isolates_failing_writes(tmp_path):
+    db_path = str(tmp_path / "validator.db")
+    migrate(db_path)
+    storage = ValidatorStorage(db_path)
+
+    def insert(prediction_id):
+        return lambda cursor: cursor.execute(
+            "INSERT INTO predictions (predictionID) VALUES (?)", (prediction_id,)
+        ).rowcount
+
+    def fail(cursor):
+        cursor.execute("INSERT INTO predictions (predictionID) VALUES ('p2')")
+        raise ValueError("rejected")
+
+    async def write_all():
+        return await asyncio.gather(
+            storage.write(insert("p1")),
+            storage.write(fail),
+            storage.write(insert("p3")),
+            return_exceptions=True,
+        )
+
+    try:
+        first, failed, third = asyncio.run(write_all())
+        ids = asyncio.run(
+            storage.read(
+                lambda cursor: cursor.execute(
+                    "SELECT predictionID FROM predictions ORDER BY rowid"
+                ).fetchall()
+            )
+        )
+        journal_mode = asyncio.run(
+            storage.read(lambda cursor: cursor.execute("PRAGMA journal_mode").fetchone()[0])
+        )
+    finally:
+        storage.close()
+
+    assert (first, third) == (1, 1)
+    assert isinstance(failed, ValueError)
+    assert ids == [("p1",), ("p3",)]
+    assert journal_mode == "wal"
+
+
+def make_team_game(game_id, team_a_odds=1.5):
+    start = datetime.now(timezone.utc).isoformat()
+    return TeamGame(
+        id=game_id,
+        teamA=f"home-{game_id}",
+        teamB=f"away-{game_id}",
+        sport="soccer",
+        league="253",
+        externalId=game_id,
+        createDate=start,
+        lastUpdateDate=start,
+        eventStartDate=start,
+        active=False,
+        outcome="Unfinished",
+        teamAodds=team_a_odds,
+        teamBodds=2.5,
+        tieOdds=3.2,
+        canTie=True,
+    )
+
+
+def game_data_synapse(games):
+    metadata = Metadata(
+        synapse_id="synapse",
+        neuron_uid="0",
+        timestamp=datetime.now(timezone.utc).isoformat(),
+        signature="signature",
+        subnet_version="1",
+        synapse_type="game_data",
+        gamedata_version=game_data_cache.game_data_version(games),
+    )
+    return GameData(metadata=metadata, gamedata_dict=games, prediction_dict=None)
+
+
+def test_game_data_versions_send_only_changed_games():
+    versions = GameDataVersions()
+    games = {"g1": make_team_game("g1"), "g2": make_team_game("g2")}
+    synapse = game_data_synapse(games)
+
+    request, kind = versions.synapse_for("miner", synapse)
+    assert kind == FULL
+    assert request.gamedata_dict == games
+    assert request.metadata.gamedata_base_version is None
+    versions.acknowledge("miner", request.metadata)
+
+    request, kind = versions.synapse_for("miner", game_data_synapse(dict(games)))
+    assert kind == NOT_MODIFIED
+    assert request.gamedata_dict == {}
+    assert request.is_not_modified()
+
+    changed = dict(games, g2=make_team_game("g2", team_a_odds=1.9))
+    request, kind = versions.synapse_for("miner", game_data_synapse(changed))
+    assert kind == DELTA
+    assert request.gamedata_dict == {"g2": changed["g2"]}
+    assert request.metadata.gamedata_base_version == synapse.metadata.gamedata_version
+    assert not request.is_not_modified()
+
+    # a miner that doesn't report a version gets all games
+    versions.acknowledge("miner", SimpleNamespace())
+    assert versions.synapse_for("miner", game_data_synapse(changed))[1] == FULL
+    # the original synapse is never modified
+    assert synapse.gamedata_dict == games
+
+
+def miner_response(uid, predictions, **metadata):
+    metadata = Metadata(
+        synapse_id=f"response-{uid}",
+        neuron_uid=str(uid),
+        timestamp=datetime.now(timezone.utc).isoformat(),
+        signature="signature",
+        subnet_version="1",
+        synapse_type="prediction",
+        **metadata,
+    )
+    response = GameData(metadata=metadata, gamedata_dict=None, prediction_dict=predictions)
+    response.dendrite.status_code = 200
+    return response
+
+
+def test_query_and_process_ingests_responses_as_they_arrive(validator):
+    responses = {
+        "slow": miner_response(0, {"p1": make_prediction("p1", "g1", "home-g1")}),
+        "fast": miner_response(1, {"p2": make_prediction("p2", "g1", "away-g1")}),
+        "empty": miner_response(1, None),
+    }
+    ingested_before_slow_response = []
+
+    class Dendrite:
+        async def call(self, target_axon, synapse, timeout, deserialize):
+            assert not deserialize
+            if target_axon.hotkey == "broken":
+                raise ConnectionError("unreachable")
+            if target_axon.hotkey == "slow":
+                await asyncio.sleep(0.2)
+                ingested_before_slow_response.extend(stored_predictions(validator))
+            return responses[target_axon.hotkey]
+
+    validator.dendrite = Dendrite()
+    validator.timeout = 12
+    validator.uid = 9
+    validator.game_data_versions = GameDataVersions()
+    axons = [SimpleNamespace(hotkey=name) for name in ["slow", "fast", "empty", "broken"]]
+
+    responded = asyncio.run(
+        validator.query_and_process(axons, [0, 1], game_data_synapse({}))
+    )
+
+    assert responded == 2
+    assert ingested_before_slow_response == [("p2", "hotkey1", "1")]
+    assert stored_predictions(validator) == [
+        ("p2", "hotkey1", "1"),
+        ("p1", "hotkey0", "0"),
+    ]
+
+
+def test_query_and_process_forgets_miners_that_time_out(validator):
+    games = {"g1": make_team_game("g1")}
+    answers = {"legacy": [], "compact": []}
+
+    class Dendrite:
+        async def call(self, target_axon, synapse, timeout, deserialize):
+            answers[target_axon.hotkey].append(synapse)
+            if target_axon.hotkey == "compact" and len(answers["compact"]) == 1:
+                return miner_response(
+                    1,
+                    None,
+                    gamedata_version=synapse.metadata.gamedata_version,
+                    wire_encoding=WIRE_ENCODING_VERSION,
+                )
+            # on a timeout, bittensor returns the request with the status set
+            synapse.dendrite.status_code = "408"
+            return synapse
+
+    validator.dendrite = Dendrite()
+    validator.timeout = 12
+    validator.uid = 9
+    validator.game_data_versions = versions = GameDataVersions()
+    axons = [SimpleNamespace(hotkey=name) for name in ["legacy", "compact"]]
+
+    for _ in range(3):
+        asyncio.run(validator.query_and_process(axons, [0, 1], game_data_synapse(games)))
+
+    # the echoed request carries the version and wire encoding of the validator,
+    # they are not taken as the miner's
+    assert not versions.accepts_compact("legacy")
+    assert all(request.gamedata_dict == games for request in answers["legacy"])
+    assert all(request.gamedata_blob is None for request in answers["legacy"])
+
+    # a miner that answered once and then timed out gets all games, as json
+    assert answers["compact"][1].gamedata_blob is not None
+    assert answers["compact"][1].gamedata_dict is None
+    assert answers["compact"][2].gamedata_dict == games
+    assert not versions.accepts_compact("compact")
+
+
+def test_game_data_snapshot_is_cached_until_game_data_changes(validator):
+    now = datetime.now(timezone.utc).isoformat()
+
+    snapshot = GameData.game_data_snapshot(now, validator.db_path)
+    assert set(snapshot.by_external_id) == {"g1", "g2"}
+    assert GameData.game_data_snapshot(now, validator.db_path) is snapshot
+    assert GameData.fetch_game_data(now, validator.db_path) is snapshot.games
+
+    # games that leave the 15 day window are dropped without a reload
+    later = (datetime.now(timezone.utc) + timedelta(days=15)).isoformat()
+    narrowed = GameData.game_data_snapshot(later, validator.db_path)
+    assert set(narrowed.by_external_id) == {"g1"}
+    assert narrowed.generation == snapshot.generation
+
+    # writing an outcome invalidates the snapshot
+    asyncio.run(validator.update_game_outcomes({"g2": 1}))
+    updated = GameData.game_data_snapshot(now, validator.db_path)
+    assert updated is not snapshot
+    assert updated.by_external_id["g2"].outcome == "1"
+    assert updated.version != snapshot.version
+
+
+def test_sports_data_fetches_leagues_and_odds_concurrently(tmp_path):
+    db_path = str(tmp_path / "validator.db")
+    sports_data = SportsData(db_name=db_path)
+    start = (datetime.now(timezone.utc) + timedelta(days=2)).isoformat()
+    in_flight = peak = 0
+
+    async def fake_get_json(session, url, querystring, sport):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.05)
+        in_flight -= 1
+
+        if "fixture" in querystring:
+            fixture = querystring["fixture"]
+            values = [
+                {"value": "Home", "odd": "2.0"},
+                {"value": "Away", "odd": "3.0"},
+                {"value": "Draw", "odd": "3.5"},
+            ]
+            if fixture.endswith("-bad"):
+                return None
+            return {"response": [{"bookmakers": [{"bets": [{"name": "Match Winner", "values": values}]}]}]}
+        league = querystring["league"]
+        return {
+            "response": [
+                {
+                    "teams": {"home": {"name": "home"}, "away": {"name": "away"}},
+                    "fixture": {"id": f"{league}-{suffix}", "date": start},
+                }
+                for suffix in ("a", "b", "bad")
+            ]
+        }
+
+    sports_data._get_json = fake_get_json
+    sports_config = {"soccer": [{"id": league} for league in ("253", "140", "78")]}
+    games = sports_data.get_multiple_game_data(sports_config)
+
+    # the odds calls of all leagues overlap instead of running one after the other
+    assert peak >= 6
+    assert sorted(game["game_id"] for game in games) == [
+        "140-a", "140-b", "253-a", "253-b", "78-a", "78-b"
+    ]
+    conn = sqlite3.connect(db_path)
+    rows = conn.execute(
+        "SELECT externalId, league, teamAodds, tieOdds FROM game_data ORDER BY externalId"
+    ).fetchall()
+    conn.close()
+    assert rows[0] == ("140-a", "140", 2.0, 3.5)
+    assert len(rows) == 6
+
+
+def test_sports_data_caches_odds_and_skips_unchanged_writes(tmp_path):
+    db_path = str(tmp_path / "validator.db")
+    sports_data = SportsData(db_name=db_path)
+    now = datetime.now(timezone.utc)
+    starts = {"far": now + timedelta(days=5), "near": now + timedelta(hours=2)}
+    home_odds = {"far": "2.0", "near": "1.8"}
+    odds_calls = []
+
+    async def fake_get_json(session, url, querystring, sport):
+        if "fixture" in querystring:
+            fixture = querystring["fixture"]
+            odds_calls.append(fixture)
+            values = [
+                {"value": "Home", "odd": home_odds[fixture]},
+                {"value": "Away", "odd": "3.0"},
+                {"value": "Draw", "odd": "3.5"},
+            ]
+            return {"response": [{"bookmakers": [{"bets": [{"name": "Match Winner", "values": values}]}]}]}
+        return {
+            "response": [
+                {
+                    "teams": {"home": {"name": "home"}, "away": {"name": "away"}},
+                    "fixture": {"id": game_id, "date": start.isoformat()},
+                }
+                for game_id, start in starts.items()
+            ]
+        }
+
+    def stored_odds():
+        conn = sqlite3.connect(db_path)
+        rows = conn.execute(
+            "SELECT externalId, teamAodds, lastUpdateDate FROM game_data ORDER BY externalId"
+        ).fetchall()
+        conn.close()
+        return rows
+
+    sports_data._get_json = fake_get_json
+    sports_config = {"soccer": [{"id": "253"}]}
+
+    assert sports_data.odds_cache.ttl(starts["far"], now) == timedelta(hours=12)
+    assert sports_data.odds_cache.ttl(starts["near"], now) == timedelta(0)
+
+    sports_data.get_multiple_game_data(sports_config)
+    assert sorted(odds_calls) == ["far", "near"]
+    first = stored_odds()
+
+    # unchanged odds: the far game is served from the cache, nothing is written
+    odds_calls.clear()
+    generation = game_data_cache.get_generation(db_path)
+    sports_data.get_multiple_game_data(sports_config)
+    assert odds_calls == ["near"]
+    assert stored_odds() == first
+    assert game_data_cache.get_generation(db_path) == generation
+
+    # changed odds of the near game are written
+    home_odds["near"] = "1.7"
+    sports_data.get_multiple_game_data(sports_config)
+    far, near = stored_odds()
+    assert far == first[0]
+    assert near[1] == 1.7 and near[2] != first[1][2]
+    assert game_data_cache.get_generation(db_path) > generation
+
+    # a fresh process compares with the stored odds
+    conn = sqlite3.connect(db_path)
+    rows = conn.execute("SELECT * FROM game_data ORDER BY externalId").fetchall()
+    conn.close()
+    generation = game_data_cache.get_generation(db_path)
+    assert SportsData(db_name=db_path).upsert_games(rows) == (0, 0, len(rows))
+    assert stored_odds() == [far, near]
+    assert game_data_cache.get_generation(db_path) == generation
+
+
+def test_migration_deduplicates_games_for_upserts(tmp_path):
+    db_path = str(tmp_path / "validator.db")
+    conn = sqlite3.connect(db_path)
+    conn.execute(
+        "CREATE TABLE game_data (id TEXT PRIMARY KEY, teamA TEXT, teamB TEXT, sport TEXT, league TEXT, externalId TEXT, createDate TEXT, lastUpdateDate TEXT, eventStartDate TEXT, active INTEGER, outcome TEXT, teamAodds REAL, teamBodds REAL, tieOdds REAL, canTie BOOLEAN)"
+    )
+    start = datetime.now(timezone.utc) + timedelta(days=1)
+    duplicate = list(make_game("g1", start))
+    duplicate[0], duplicate[10] = "id-g1-resolved", "0"
+    conn.executemany(
+        "INSERT INTO game_data VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        [make_game("g1", start), tuple(duplicate), make_game("g2", start)],
+    )
+    conn.commit()
+    conn.close()
+
+    assert migrate(db_path) == LATEST_VERSION
+    sports_data = SportsData(db_name=db_path)
+
+    conn = sqlite3.connect(db_path)
+    assert conn.execute("SELECT id FROM game_data ORDER BY externalId").fetchall() == [
+        ("id-g1-resolved",),
+        ("id-g2",),
+    ]
+    conn.close()
+
+    new_game = list(make_game("g3", start))
+    changed_odds = list(make_game("g2", start))
+    changed_odds[0], changed_odds[11], changed_odds[13] = "ignored", 1.25, None
+    generation = game_data_cache.get_generation(db_path)
+    assert sports_data.upsert_games(
+        [make_game("g1", start), tuple(changed_odds), tuple(new_game)]
+    ) == (1, 1, 1)
+    assert game_data_cache.get_generation(db_path) > generation
+
+    conn = sqlite3.connect(db_path)
+    rows = conn.execute(
+        "SELECT id, externalId, outcome, teamAodds, tieOdds FROM game_data ORDER BY externalId"
+    ).fetchall()
+    conn.close()
+    # the odds update keeps the id, outcome and the tie odds when none are given
+    assert rows == [
+        ("id-g1-resolved", "g1", "0", 1.5, 3.2),
+        ("id-g2", "g2", "Unfinished", 1.25, 3.2),
+        ("id-g3", "g3", "Unfinished", 1.5, 3.2),
+    ]
+
+
+def test_update_recent_games_resolves_games_per_date(validator):
+    now = datetime.now(timezone.utc)
+    conn = sqlite3.connect(validator.db_path)
+    conn.executemany(
+        "INSERT INTO game_data VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        [
+            make_game("g3", now - timedelta(hours=2)),
+            make_game("g4", now - timedelta(hours=26)),
+            make_game("g5", now - timedelta(hours=25)),
+        ],
+    )
+    conn.commit()
+    conn.close()
+
+    resolver = FakeResolver({"g2": 0, "g4": 2, "g9": 1})
+    validator.outcome_resolvers = {"soccer": resolver}
+    asyncio.run(validator.update_recent_games())
+
+    # one call per start date instead of one per game
+    assert len(resolver.keys) == len(set(resolver.keys)) <= 2
+    conn = sqlite3.connect(validator.db_path)
+    outcomes = dict(conn.execute("SELECT externalId, outcome FROM game_data").fetchall())
+    polls = conn.execute(
+        "SELECT externalId, attempts, gaveUp FROM outcome_polls ORDER BY externalId"
+    ).fetchall()
+    conn.close()
+    # g2 started an hour ago and can't be over yet, it is not polled
+    assert outcomes == {
+        "g1": "Unfinished",
+        "g2": "Unfinished",
+        "g3": "Unfinished",
+        "g4": "2",
+        "g5": "Unfinished",
+    }
+    assert polls == [("g3", 1, 0), ("g5", 1, 0)]
+
+    # games polled without a result wait for the backoff interval
+    resolver.keys.clear()
+    asyncio.run(validator.update_recent_games())
+    assert resolver.keys == []
+
+    # and are given up on after the last attempt
+    conn = sqlite3.connect(validator.db_path)
+    conn.execute("UPDATE outcome_polls SET nextPollDate = ?", (now.isoformat(),))
+    conn.commit()
+    validator.outcome_polls = OutcomePollScheduler(base_interval=timedelta(0), max_attempts=3)
+    for _ in range(3):
+        asyncio.run(validator.update_recent_games())
+    # two polls, the third run skips the games that were given up on
+    assert len(resolver.keys) == 2 * len(set(resolver.keys))
+    polls = conn.execute(
+        "SELECT externalId, attempts, gaveUp FROM outcome_polls ORDER BY externalId"
+    ).fetchall()
+    conn.close()
+    assert polls == [("g3", 3, 1), ("g5", 3, 1)]
+
+
+def test_failed_fetches_are_not_counted_as_poll_attempts(validator):
+    now = datetime.now(timezone.utc)
+    conn = sqlite3.connect(validator.db_path)
+    conn.execute(
+        "INSERT INTO game_data VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        make_game("g3", now - timedelta(hours=4)),
+    )
+    conn.execute(
+        "INSERT INTO game_data VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        make_game("b1", now - timedelta(hours=4)),
+    )
+    conn.execute("UPDATE game_data SET sport = 'baseball' WHERE externalId = 'b1'")
+    conn.commit()
+
+    class DownResolver(FakeResolver):
+        async def fetch(self, session, key):
+            self.keys.append(key)
+            raise aiohttp.ClientConnectionError("api down")
+
+    class BaseballResolver(FakeResolver):
+        sport = "baseball"
+
+    soccer = DownResolver({})
+    # e.g. a missing api key, answered with status 200
+    baseball = BaseballResolver({"errors": {"token": "missing application key"}})
+    validator.outcome_resolvers = {"soccer": soccer, "baseball": baseball}
+    validator.outcome_polls = OutcomePollScheduler(base_interval=timedelta(0), max_attempts=2)
+    for _ in range(3):
+        asyncio.run(validator.update_recent_games())
+
+    # every run polls again, none of them counts towards giving up
+    assert len(soccer.keys) == len(baseball.keys) == 3
+    assert conn.execute("SELECT COUNT(*) FROM outcome_polls").fetchone()[0] == 0
+
+    # once the api is back the games resolve
+    validator.outcome_resolvers = {
+        "soccer": FakeResolver({"g3": 1}),
+        "baseball": BaseballResolver({"b1": 0}),
+    }
+    asyncio.run(validator.update_recent_games())
+    outcomes = dict(
+        conn.execute("SELECT externalId, outcome FROM game_data WHERE externalId IN ('g3', 'b1')").fetchall()
+    )
+    conn.close()
+    assert outcomes == {"g3": "1", "b1": "0"}
+
+
+def test_outcome_resolver_without_outcomes_fails_on_construction():
+    class IncompleteResolver(OutcomeResolver):
+        sport = "hockey"
+
+    with pytest.raises(TypeError):
+        IncompleteResolver()
+
+
+def test_outcome_resolvers_parse_finished_games():
+    soccer = {
+        "response": [
+            {
+                "fixture": {"id": 1, "status": {"short": "FT"}},
+                "score": {"fulltime": {"home": 2, "away": 1}},
+            },
+            # decided on penalties, a tie after regular time
+            {
+                "fixture": {"id": 2, "status": {"short": "PEN"}},
+                "score": {"fulltime": {"home": 1, "away": 1}},
+            },
+            {
+                "fixture": {"id": 3, "status": {"short": "2H"}},
+                "score": {"fulltime": {"home": None, "away": None}},
+            },
+        ]
+    }
+    assert SoccerOutcomeResolver().outcomes(soccer) == {"1": 0, "2": 2}
+
+    baseball = {
+        "response": [
+            {
+                "id": 7,
+                "status": {"long": "Finished"},
+                "scores": {"home": {"total": 3}, "away": {"total": 5}},
+            },
+            {
+                "id": 8,
+                "status": {"long": "Inning 7"},
+                "scores": {"home": {"total": 1}, "away": {"total": 0}},
+            },
+        ]
+    }
+    assert BaseballOutcomeResolver().outcomes(baseball) == {"7": 1}
+
+
+def test_update_game_outcomes_propagates_outcomes_per_game(validator):
+    made = (datetime.now(timezone.utc) - timedelta(hours=2)).isoformat()
+    conn = sqlite3.connect(validator.db_path)
+    conn.executemany(
+        """
+        INSERT INTO predictions (predictionID, teamGameID, minerId, predictionDate, predictedOutcome, wager, teamAodds, teamBodds, tieOdds, outcome)
+        VALUES (?, ?, 'hotkey0', ?, '0', 1.0, 1.5, 2.5, 3.2, ?)
+    """,
+        [
+            ("p1", "g1", made, "Unfinished"),
+            ("p2", "g2", made, "Unfinished"),
+            ("p3", "g2", made, "Unfinished"),
+            ("p4", "g2", made, "1"),
+        ],
+    )
+    conn.commit()
+    conn.close()
+
+    assert asyncio.run(validator.update_game_outcomes({"g2": 0, "g9": 1})) == {"g2": 2}
+    assert asyncio.run(validator.update_game_outcomes({"g2": 1})) == {}
+
+    conn = sqlite3.connect(validator.db_path)
+    outcomes = conn.execute(
+        "SELECT predictionID, outcome FROM predictions ORDER BY predictionID"
+    ).fetchall()
+    conn.close()
+    assert outcomes == [("p1", "Unfinished"), ("p2", "0"), ("p3", "0"), ("p4", "1")]
+
+
+def test_ingestion_and_resolution_against_rapid_api_stand_in(validator, tmp_path):
+    fixtures = str(Path(__file__).parent.parent / "benchmarks" / "fixtures" / "rapid_api_sample.json")
+    sports_config = {"soccer": [{"id": "253"}], "baseball": [{"id": "1"}]}
+
+    # every call fails: nothing is stored, the refresh doesn't raise
+    failing = RapidApiStandIn(fixtures, error_rate=1.0)
+    with running(failing) as base_url:
+        sports_data = SportsData(db_name=str(tmp_path / "failing.db"), api_base_url=base_url)
+        assert sports_data.get_multiple_game_data(sports_config) == []
+    assert failing.errors == failing.requests == 8
+
+    stand_in = RapidApiStandIn(fixtures, latency=0.01)
+    with running(stand_in) as base_url:
+        sports_data = SportsData(db_name=validator.db_path, api_base_url=base_url)
+        games = sports_data.get_multiple_game_data(sports_config)
+        assert sorted(game["game_id"] for game in games) == [
+            118321, 118322, 1150841, 1150842, 1150843
+        ]
+
+        # the replayed games start today or tomorrow, poll them as if they were over
+        validator.outcome_resolvers = default_resolvers(base_url)
+        validator.outcome_polls = OutcomePollScheduler(
+            durations={"soccer": -timedelta(days=2), "baseball": -timedelta(days=2)}
+        )
+        asyncio.run(validator.update_recent_games())
+    assert stand_in.errors == 0
+
+    conn = sqlite3.connect(validator.db_path)
+    outcomes = dict(
+        conn.execute(
+            "SELECT externalId, outcome FROM game_data WHERE externalId NOT IN ('g1', 'g2')"
+        ).fetchall()
+    )
+    conn.close()
+    assert outcomes == {
+        "1150841": "0",
+        "1150842": "2",
+        "1150843": "1",
+        "118321": "0",
+        "118322": "1",
+    }